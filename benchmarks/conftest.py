@@ -0,0 +1,67 @@
+import os
+import gc
+import tracemalloc
+
+from pytest import fixture, importorskip
+
+importorskip("pytest_benchmark")
+
+from fake_c360 import FakeC360Server
+
+
+MB = 1024 * 1024
+
+
+@fixture(scope="session")
+def fake_c360(tmp_path_factory):
+    """
+    A local c360 API and object server, which the shared client is pointed
+    at for the whole session.
+    """
+    server = FakeC360Server(str(tmp_path_factory.mktemp("fake_c360"))).start()
+
+    os.environ.setdefault("C360_TENANT", "bench")
+    import c360_client
+    api = c360_client.api
+    previous = (api.url, api.api_key)
+    api.url = server.url
+    api.api_key = "bench-api-key"
+    api.clear_cache()
+
+    yield server
+
+    api.url, api.api_key = previous
+    api.clear_cache()
+    server.stop()
+
+
+@fixture
+def workdir(tmp_path, monkeypatch):
+    # downloads and caches go under a fresh folder for every benchmark
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("C360_FILE_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path
+
+
+def measure_peak_memory(func, *args, **kwargs):
+    """
+    Calls `func` once, and returns the peak of memory allocated by Python
+    during the call, in MB. Allocations made outside of the interpreter
+    (e.g. by pyarrow) are not included.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / MB, 2)
+
+
+def record_throughput(benchmark, nbytes):
+    benchmark.extra_info["bytes"] = nbytes
+    if benchmark.stats is None:
+        # not timed, e.g. with `--benchmark-disable`
+        return
+    benchmark.extra_info["MB/s"] = round(nbytes / MB / benchmark.stats.stats.mean, 1)
@@ -0,0 +1,232 @@
+import os
+import json
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+READ_BLOCK_SIZE = 1024 * 1024
+USER_SCOPE = "bench_user"
+
+
+class FakeC360Handler(BaseHTTPRequestHandler):
+    """
+    A keep-alive HTTP/1.1 stand-in for the c360 API and for the presigned
+    object URLs it hands out.
+
+    - `GET /entity/user/scope`, `GET /dataset/get`, `GET /dataset/list`
+      return small JSON documents.
+    - `GET /dataset/table/get_presigned_url` returns a URL per file under
+      `<root>/objects/<dataset>/<table>/`, served by `GET /objects/...` with
+      an ETag and support for `Range` requests.
+    - uploads (`dataset/table/upload`, its chunked `initiate`/`complete`
+      calls and parts, `dataset/initialize`, `pipelines`) are read and
+      discarded, counting the bytes received.
+    """
+    protocol_version = "HTTP/1.1"
+    # headers and bodies are written separately: without TCP_NODELAY, kept
+    # alive connections would wait for delayed ACKs (~40ms) on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers={}):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode())
+
+    def _drain_body(self):
+        remaining = int(self.headers.get("Content-Length") or 0)
+        received = remaining
+        while remaining:
+            block = self.rfile.read(min(remaining, READ_BLOCK_SIZE))
+            if not block:
+                break
+            remaining -= len(block)
+        self.server.record_received(received)
+        return received
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        return parts.path.strip("/"), {
+            key: values[0] for key, values in parse_qs(parts.query).items()
+        }
+
+    def do_GET(self):
+        path, params = self._route()
+        if path.startswith("objects/"):
+            return self._send_object(path)
+        if path == "entity/user/scope":
+            return self._send_json(200, {"scope": USER_SCOPE})
+        if path == "dataset/get":
+            return self._send_json(200, {
+                "name": params.get("name"),
+                "tables": sorted(self.server.list_tables(params.get("name", ""))),
+            })
+        if path == "dataset/list":
+            return self._send_json(200, {"datasets": sorted(self.server.list_datasets())})
+        if path == "dataset/table/get_presigned_url":
+            files = self.server.list_files(params["dataset"], params["table"])
+            return self._send_json(200, {"presigned_urls": [
+                f"{self.server.url}/objects/{params['dataset']}/{params['table']}/{name}"
+                "?X-Amz-Signature=bench"
+                for name in files
+            ]})
+        return self._send_json(404, {"error": f"unknown endpoint {path}"})
+
+    def do_POST(self):
+        path, params = self._route()
+        if path == "dataset/table/upload/initiate":
+            payload = self._read_json()
+            upload_id = hashlib.sha1(os.urandom(8)).hexdigest()
+            return self._send_json(200, {
+                "upload_id": upload_id,
+                "urls": {
+                    str(number): f"{self.server.url}/parts/{upload_id}/{number}?X-Amz-Signature=bench"
+                    for number in payload["part_numbers"]
+                },
+            })
+        if path == "dataset/table/upload/complete":
+            payload = self._read_json()
+            return self._send_json(200, {"parts": len(payload["parts"])})
+        if path in ("dataset/table/upload", "dataset/initialize"):
+            return self._send_json(200, {"received": self._drain_body()})
+        self._drain_body()
+        return self._send_json(404, {"error": f"unknown endpoint {path}"})
+
+    def do_PUT(self):
+        path, params = self._route()
+        received = self._drain_body()
+        if path.startswith("parts/"):
+            # a fixed ETag, the parts are not kept
+            return self._send(200, b"", headers={"ETag": f'"{path.rsplit("/", 1)[-1]}"'})
+        if path == "pipelines":
+            return self._send_json(200, {"received": received})
+        return self._send_json(404, {"error": f"unknown endpoint {path}"})
+
+    def _send_object(self, path):
+        filepath = os.path.join(self.server.root, path)
+        if not os.path.isfile(filepath):
+            return self._send_json(404, {"error": "not found"})
+
+        total = os.path.getsize(filepath)
+        start, end = 0, total - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header:
+            first, last = range_header.split("=", 1)[1].split("-")
+            start = int(first)
+            end = min(int(last) if last else total - 1, total - 1)
+            if start >= total:
+                return self._send(416, b"", headers={"Content-Range": f"bytes */{total}"})
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", f'"{self.server.etag(filepath)}"')
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.end_headers()
+
+        with open(filepath, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                block = f.read(min(remaining, READ_BLOCK_SIZE))
+                if not block:
+                    break
+                self.wfile.write(block)
+                remaining -= len(block)
+
+
+class FakeC360Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root):
+        super().__init__(("127.0.0.1", 0), FakeC360Handler)
+        self.root = root
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._etags = {}
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record_received(self, nbytes):
+        with self._lock:
+            self.bytes_received += nbytes
+
+    def etag(self, filepath):
+        # computed once per file version, so that serving stays cheap
+        stat = os.stat(filepath)
+        key = (filepath, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            etag = self._etags.get(key)
+        if etag is None:
+            md5 = hashlib.md5()
+            with open(filepath, "rb") as f:
+                for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+                    md5.update(block)
+            etag = md5.hexdigest()
+            with self._lock:
+                self._etags[key] = etag
+        return etag
+
+    def _objects(self, *path):
+        return os.path.join(self.root, "objects", *path)
+
+    def list_datasets(self):
+        path = self._objects()
+        return os.listdir(path) if os.path.isdir(path) else []
+
+    def list_tables(self, dataset):
+        path = self._objects(dataset)
+        return os.listdir(path) if os.path.isdir(path) else []
+
+    def list_files(self, dataset, table):
+        path = self._objects(dataset, table)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def add_table(self, dataset, table, parts):
+        """
+        Serves a table made of the given parts, each either bytes or a
+        callable writing the part to the path it is given.
+        """
+        path = self._objects(dataset, table)
+        os.makedirs(path, exist_ok=True)
+        for index, part in enumerate(parts):
+            filepath = os.path.join(path, f"part-{index:05d}.parquet")
+            if callable(part):
+                part(filepath)
+            else:
+                with open(filepath, "wb") as f:
+                    f.write(part)
+        return path
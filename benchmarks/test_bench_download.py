@@ -0,0 +1,91 @@
+import os
+import shutil
+
+from pytest import importorskip, mark
+
+from conftest import MB, measure_peak_memory, record_throughput
+from c360_client.dataset_cls import DatalakeClientDataset
+
+
+TABLE_SHAPES = [
+    # (parts, part size)
+    (1, 64 * MB),
+    (16, 4 * MB),
+    (256, 256 * 1024),
+]
+
+
+def _shape_id(shape):
+    parts, part_size = shape
+    return f"{parts}x{part_size // 1024}KB"
+
+
+@mark.parametrize("shape", TABLE_SHAPES, ids=_shape_id)
+def test_download_table(benchmark, fake_c360, workdir, shape):
+    parts, part_size = shape
+    table = f"raw_{_shape_id(shape)}"
+    fake_c360.add_table("bench", table, [os.urandom(part_size) for _ in range(parts)])
+    client = DatalakeClientDataset(defaults={})
+    target = str(workdir / "bench")
+
+    def download():
+        return client.download_table("bench", table, target=target)
+
+    benchmark.pedantic(
+        download, setup=lambda: shutil.rmtree(target, ignore_errors=True), rounds=3,
+    )
+    record_throughput(benchmark, parts * part_size)
+
+    shutil.rmtree(target)
+    benchmark.extra_info["peak_memory_mb"] = measure_peak_memory(download)
+
+
+def test_download_table_from_cache(benchmark, fake_c360, workdir):
+    table = "cached"
+    fake_c360.add_table("bench", table, [os.urandom(4 * MB) for _ in range(16)])
+    client = DatalakeClientDataset(defaults={})
+    target = str(workdir / "bench")
+    client.download_table("bench", table, target=target, cache=True)
+
+    benchmark.pedantic(
+        client.download_table, args=("bench", table),
+        kwargs=dict(target=target, cache=True),
+        setup=lambda: shutil.rmtree(target, ignore_errors=True),
+        rounds=5,
+    )
+    record_throughput(benchmark, 16 * 4 * MB)
+
+
+def _write_parquet(rows):
+    pa = importorskip("pyarrow")
+    pq = importorskip("pyarrow.parquet")
+
+    def write(path):
+        pq.write_table(pa.table({
+            "id": pa.array(range(rows), pa.int64()),
+            "country": pa.array(["SG", "ID", "MY", "TH"] * (rows // 4)),
+            "value": pa.array([i * 0.5 for i in range(rows)]),
+        }), path, row_group_size=64 * 1024)
+
+    return write
+
+
+@mark.parametrize("format", ["pandas", "arrow"])
+def test_get_table(benchmark, fake_c360, workdir, format):
+    importorskip("pandas")
+    table = "parquet"
+    if table not in fake_c360.list_tables("bench"):
+        fake_c360.add_table("bench", table, [_write_parquet(250_000)] * 8)
+    client = DatalakeClientDataset(defaults={})
+    target = str(workdir / "bench")
+
+    def load():
+        return client.get_table("bench", table, target=target, format=format)
+
+    result = benchmark.pedantic(
+        load, setup=lambda: shutil.rmtree(target, ignore_errors=True), rounds=3,
+    )
+
+    assert len(result) == 2_000_000
+    shutil.rmtree(target)
+    benchmark.extra_info["peak_memory_mb"] = measure_peak_memory(load)
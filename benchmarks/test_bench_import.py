@@ -0,0 +1,28 @@
+import os
+import sys
+import subprocess
+
+from pytest import importorskip
+
+
+def _run(*args):
+    env = dict(os.environ, C360_TENANT=os.getenv("C360_TENANT", "bench"))
+    subprocess.run([sys.executable, *args], env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def test_import(benchmark):
+    # includes the interpreter start up, measured alone below
+    benchmark.pedantic(_run, args=("-c", "import c360_client"), rounds=10)
+
+
+def test_import_with_api(benchmark):
+    benchmark.pedantic(_run, args=("-c", "import c360_client; c360_client.api"), rounds=10)
+
+
+def test_cli_help(benchmark):
+    importorskip("click")
+    benchmark.pedantic(_run, args=("-m", "c360_client.cli", "--help"), rounds=10)
+
+
+def test_interpreter(benchmark):
+    benchmark.pedantic(_run, args=("-c", "pass"), rounds=10)
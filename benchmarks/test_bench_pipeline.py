@@ -0,0 +1,52 @@
+from pytest import fixture
+
+from c360_client.pipeline_cls import DatalakeClientPipeline
+from c360_client.pipeline_cls.compiler import compile_pipelines
+
+
+PIPELINES = 500
+
+
+@fixture
+def pipelines_dir(workdir):
+    path = workdir / "pipelines"
+    (path / "queries").mkdir(parents=True)
+    for index in range(PIPELINES):
+        tasks = []
+        for task in range(3):
+            query_file = f"queries/p{index}_t{task}.sql"
+            (path / query_file).write_text(
+                f"SELECT * FROM source_{index} WHERE task = {task}\n" * 20
+            )
+            depends_on = f"\n    depends_on: [t{task - 1}]" if task else ""
+            tasks.append(
+                f"  - name: t{task}{depends_on}\n"
+                f"    steps:\n"
+                f"      - query_file: {query_file}\n"
+            )
+        (path / f"pipeline_{index}.yml").write_text("tasks:\n" + "".join(tasks))
+    return str(path)
+
+
+def test_validate(benchmark, pipelines_dir):
+    pipelines = benchmark(compile_pipelines, pipelines_dir)
+
+    assert len(pipelines.pipelines) == PIPELINES
+
+
+def test_full_deploy(benchmark, fake_c360, pipelines_dir):
+    client = DatalakeClientPipeline()
+
+    response = benchmark.pedantic(client.deploy, args=(pipelines_dir,), kwargs=dict(force=True), rounds=3)
+
+    assert response.status_code == 200
+
+
+def test_unchanged_deploy(benchmark, fake_c360, pipelines_dir):
+    client = DatalakeClientPipeline()
+    client.deploy(pipelines_dir)
+
+    response = benchmark(client.deploy, pipelines_dir)
+
+    # nothing to upload
+    assert response is None
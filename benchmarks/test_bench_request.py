@@ -0,0 +1,33 @@
+from c360_client.request_cls import get_default_request
+from c360_client.dataset_cls import DatalakeClientDataset
+
+
+def test_request_latency(benchmark, fake_c360):
+    api = get_default_request()
+
+    response = benchmark(api.request, "dataset/get", method="GET", params={"name": "sales"})
+
+    assert response.status_code == 200
+
+
+def test_cached_metadata_latency(benchmark, fake_c360):
+    client = DatalakeClientDataset(defaults={})
+    client.get("sales")
+
+    response = benchmark(client.get, "sales")
+
+    assert response.status_code == 200
+
+
+def test_request_latency_without_keep_alive(benchmark, fake_c360):
+    # what every call used to cost before connections were pooled
+    import requests
+
+    api = get_default_request()
+    url = f"{api.url}/dataset/get"
+
+    response = benchmark(
+        requests.get, url, params={"name": "sales"}, headers={"Authorization": api.api_key},
+    )
+
+    assert response.status_code == 200
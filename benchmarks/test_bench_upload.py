@@ -0,0 +1,42 @@
+import os
+
+from pytest import mark
+
+from conftest import MB, measure_peak_memory, record_throughput
+from c360_client.dataset_cls import DatalakeClientDataset
+
+
+@mark.parametrize("chunked", [False, True], ids=["single", "chunked"])
+def test_upload_table(benchmark, fake_c360, workdir, chunked):
+    path = workdir / "table.parquet"
+    path.write_bytes(os.urandom(64 * MB))
+    client = DatalakeClientDataset(defaults={})
+
+    def upload():
+        return client.upload_table("bench", str(path), table="uploaded", chunked=chunked)
+
+    response = benchmark.pedantic(upload, rounds=3)
+
+    assert response.status_code == 200
+    record_throughput(benchmark, 64 * MB)
+    benchmark.extra_info["peak_memory_mb"] = measure_peak_memory(upload)
+
+
+def test_initialize(benchmark, fake_c360, workdir):
+    local_dir = workdir / "dataset"
+    total = 0
+    for index in range(200):
+        table_dir = local_dir / f"table_{index % 20}"
+        table_dir.mkdir(parents=True, exist_ok=True)
+        # mostly small files, with a few large ones
+        size = 16 * MB if index % 50 == 0 else 64 * 1024
+        (table_dir / f"part-{index}.parquet").write_bytes(os.urandom(size))
+        total += size
+    client = DatalakeClientDataset(defaults={})
+
+    response = benchmark.pedantic(
+        client.initialize, args=("bench_initialized", str(local_dir)), rounds=3,
+    )
+
+    assert response.status_code == 200
+    record_throughput(benchmark, total)
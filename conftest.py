@@ -0,0 +1,161 @@
+import os
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pytest import fixture
+
+
+class LocalRequestHandler(BaseHTTPRequestHandler):
+    """
+    A keep-alive HTTP/1.1 handler that echoes the request back as JSON.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _echo(self):
+        body = self._read_body()
+        self._send_json(200, {
+            "method": self.command,
+            "path": self.path,
+            "authorization": self.headers.get("Authorization"),
+            "body_size": len(body),
+        })
+
+    do_GET = _echo
+    do_POST = _echo
+    do_PUT = _echo
+    do_DELETE = _echo
+
+
+class FileRequestHandler(LocalRequestHandler):
+    """
+    Serves the files under `server.root` like a presigned object store:
+    with an ETag (the MD5 of the file, unless `server.etag_func` is
+    changed) that `If-None-Match` is checked against, and with support for
+    single `Range: bytes=a-b` requests unless `server.accept_ranges` is
+    turned off.
+    """
+    def do_GET(self):
+        server = self.server
+        path = os.path.join(server.root, self.path.split("?")[0].lstrip("/"))
+        range_header = self.headers.get("Range")
+        with server.lock:
+            server.requests.append((self.path, range_header))
+
+        if not os.path.isfile(path):
+            return self._send_json(404, {"error": "not found"})
+
+        with open(path, "rb") as f:
+            data = f.read()
+        total = len(data)
+        etag = server.etag_func(data)
+        if self.headers.get("If-None-Match") == f'"{etag}"':
+            self.send_response(304)
+            self.send_header("ETag", f'"{etag}"')
+            self.end_headers()
+            return
+
+        status = 200
+        if range_header and server.accept_ranges:
+            start, end = range_header.split("=", 1)[1].split("-")
+            start = int(start)
+            end = min(int(end) if end else total - 1, total - 1)
+            if start >= total:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+            data = data[start:end + 1]
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", f'"{etag}"')
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class LocalServer:
+    def __init__(self, handler_cls=LocalRequestHandler, root=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.httpd.root = root
+        self.httpd.accept_ranges = True
+        self.httpd.etag_func = lambda data: hashlib.md5(data).hexdigest()
+        self.httpd.requests = []
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def set_accept_ranges(self, accept_ranges):
+        self.httpd.accept_ranges = accept_ranges
+
+    def set_etag_func(self, etag_func):
+        self.httpd.etag_func = etag_func
+
+    def url_for(self, filename):
+        return f"{self.url}/{filename}?X-Amz-Signature=test"
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@fixture
+def local_server():
+    server = LocalServer().start()
+    yield server
+    server.stop()
+
+
+@fixture
+def file_server(tmp_path):
+    """
+    A local stand-in for presigned object URLs, serving files written to
+    `file_server.root`.
+    """
+    root = tmp_path / "served"
+    root.mkdir()
+    server = LocalServer(FileRequestHandler, root=str(root)).start()
+    server.root = root
+    yield server
+    server.stop()
+
+
+# benchmarks are only run when asked for, with `pytest benchmarks`
+collect_ignore = ["benchmarks"]
@@ -5,22 +5,26 @@ install_requires = [
     "boto3",
     "requests",
     "getpass3",
-    "wget"
 ]
 
 extras_require = {
     "cli": ["click"],
+    "aio": ["aiohttp"],
+    "speedups": ["orjson"],
     "test": [
         "pytest",
         "pytest-mock",
+        "pytest-benchmark",
+        "moto[s3]>=5",
         "flake8",
         "black",
     ],
     "notebook": [
         "protobuf==3.19.5",  # for discreetly -> google-cloud-kms
         "discreetly[aws,gcp]",
-        "pyathena",
+        "pyathena[pandas]>=2.20",
         "pandas",
+        "pyarrow",
     ]
 }
 
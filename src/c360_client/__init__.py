@@ -1,8 +1,6 @@
 import os
-from .request_cls import DatalakeClientRequest
-from .dataset_cls import DatalakeClientDataset
-from .model_cls import DatalakeClientModel
 from .utils import _get_tenant, _get_stage, _get_default_api_url
+from .cache import DEFAULT_TTL
 
 
 def get_project_config():
@@ -11,6 +9,10 @@ def get_project_config():
         stage=_get_stage(),
         api_key=os.getenv("C360_API_KEY"),
         api_url=os.getenv("C360_API_URL", _get_default_api_url()),
+        cache_options=dict(
+            ttl=float(os.getenv("C360_CACHE_TTL", DEFAULT_TTL)),
+            persist_dir=os.getenv("C360_CACHE_DIR"),
+        ),
     )
 
 
@@ -27,7 +29,62 @@ def set_default_space(default_space):
     global _DEFAULTS
     _DEFAULTS["space"] = default_space
 
-api = DatalakeClientRequest(**get_project_config(), defaults=_DEFAULTS)
 
-dataset = DatalakeClientDataset(defaults=_DEFAULTS)
-model = DatalakeClientModel(defaults=_DEFAULTS)
+def set_typed_responses(enabled=True):
+    """
+    Have `dataset.get`, `dataset.list_datasets`, `model.get` and
+    `pipeline.get` return `c360_client.responses.ApiResponse`s. They are
+    used like `requests.Response`s, but decode their body once, with orjson
+    when it is installed, and give it as compact records in `data`.
+    """
+    global _DEFAULTS
+    _DEFAULTS["typed_responses"] = enabled
+
+
+def set_direct_s3(enabled=True, **options):
+    """
+    Download tables straight from their S3 bucket, for workers with IAM
+    access to it, instead of through presigned URLs. Can also be enabled
+    with `C360_DIRECT_S3=1`.
+
+    options - passed to `c360_client.s3_downloader.S3Downloader`, e.g.
+        `max_concurrency` or `multipart_chunksize`.
+    """
+    global _DEFAULTS
+    _DEFAULTS["direct_s3"] = dict(options, enabled=enabled)
+
+
+# The client objects below, and the classes they are made of, are only
+# created (and their dependencies imported) the first time they are
+# accessed, which keeps `import c360_client` cheap.
+
+_LAZY_CLASSES = {
+    "DatalakeClientRequest": "c360_client.request_cls",
+    "DatalakeClientDataset": "c360_client.dataset_cls",
+    "DatalakeClientModel": "c360_client.model_cls",
+}
+
+
+def _create_client(name):
+    if name == "api":
+        from .request_cls import DatalakeClientRequest
+        return DatalakeClientRequest(**get_project_config(), defaults=_DEFAULTS)
+    elif name == "dataset":
+        from .dataset_cls import DatalakeClientDataset
+        return DatalakeClientDataset(defaults=_DEFAULTS)
+    elif name == "model":
+        from .model_cls import DatalakeClientModel
+        return DatalakeClientModel(defaults=_DEFAULTS)
+
+
+def __getattr__(name):
+    if name in ("api", "dataset", "model"):
+        value = _create_client(name)
+    elif name in _LAZY_CLASSES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_CLASSES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
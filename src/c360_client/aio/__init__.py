@@ -0,0 +1,19 @@
+import c360_client
+from c360_client.aio.request_cls import AsyncDatalakeClientRequest
+from c360_client.aio.dataset_cls import AsyncDatalakeClientDataset
+from c360_client.aio.model_cls import AsyncDatalakeClientModel
+from c360_client.aio.pipeline_cls import AsyncDatalakeClientPipeline
+
+
+api = AsyncDatalakeClientRequest(request_inst=c360_client.api)
+
+dataset = AsyncDatalakeClientDataset(request_inst=api)
+model = AsyncDatalakeClientModel(request_inst=api)
+pipeline = AsyncDatalakeClientPipeline(request_inst=api)
+
+
+async def close():
+    """
+    Closes the connection pool of the running event loop.
+    """
+    await api.close()
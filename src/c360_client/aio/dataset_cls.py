@@ -0,0 +1,126 @@
+from c360_client.aio.request_cls import AsyncDatalakeClientRequest, gather_limited
+from c360_client.responses import Record, DatasetRecord
+
+
+class AsyncDatalakeClientDataset:
+    """
+    The asyncio counterpart of `DatalakeClientDataset` for metadata calls.
+    The object `c360_client.aio.dataset` is an instance of this class.
+    """
+    def __init__(self, request_inst=None):
+        self.request_inst = request_inst or AsyncDatalakeClientRequest()
+
+    async def _request(self, endpoint, **kwargs):
+        return await self.request_inst.request(endpoint, **kwargs)
+
+    def _invalidate(self, dataset):
+        cache = self.request_inst.request_inst.cache
+        cache.invalidate("dataset/get", dataset)
+        cache.invalidate("dataset/list")
+
+    async def _cached_request(
+        self, cache_key, endpoint, refresh=False, record_type=Record, many=False, **kwargs
+    ):
+        # as in `DatalakeClientDataset._cached_request`, typed responses are
+        # cached as such
+        typed_response = self.request_inst.request_inst.typed_response
+
+        async def make_request():
+            response = await self._request(endpoint, **kwargs)
+            return typed_response(response, record_type, many=many)
+
+        response = await self.request_inst.cached_response(
+            cache_key, make_request, refresh=refresh,
+        )
+        return typed_response(response, record_type, many=many)
+
+    async def get_groups(self, groups):
+        return await self.request_inst.get_groups(groups=groups)
+
+    async def get(self, name, groups=[], refresh=False):
+        endpoint = "dataset/get"
+        payload = {
+            "name": name,
+            "groups": ",".join(await self.get_groups(groups)),
+            # comma-separated values for get
+        }
+        return await self._cached_request(
+            ("dataset/get", name, payload["groups"]),
+            endpoint,
+            refresh=refresh,
+            record_type=DatasetRecord,
+            params=payload,
+            method="GET",
+        )
+
+    async def get_many(self, names, groups=[], refresh=False, limit=None):
+        """
+        Gets the metadata of many datasets concurrently. Returns the
+        responses in the same order as `names`, with exceptions in place of
+        the calls that failed.
+        """
+        # resolve the groups once, so that it is not fetched for every call
+        await self.get_groups(groups)
+        return await gather_limited(
+            (self.get(name, groups=groups, refresh=refresh) for name in names),
+            limit=limit or self.request_inst.max_concurrency,
+        )
+
+    async def create(self, name, groups=[]):
+        endpoint = "dataset"
+        payload = {
+            "name": name,
+            "groups": await self.get_groups(groups),
+        }
+        response = await self._request(endpoint, json=payload, method="POST")
+        self._invalidate(name)
+        return response
+
+    async def register_table(self, dataset, table, s3_path, zone=None, metadata={}, groups=[]):
+        endpoint = "dataset/table/register"
+        payload = {
+            "dataset_name": dataset,
+            "groups": await self.get_groups(groups),
+            "table_name": table,
+            "zone": zone,
+            "s3_path": s3_path,
+            "table_details": metadata,
+        }
+        response = await self._request(endpoint, json=payload, method="POST")
+        self._invalidate(dataset)
+        return response
+
+    async def load_to_viztool(self, dataset, table, zone=None, groups=[]):
+        endpoint = "dataset/table/load_to_viztool"
+        payload = {
+            "dataset": dataset,
+            "groups": await self.get_groups(groups),
+            "table": table,
+            "zone": zone,
+        }
+        return await self._request(endpoint, json=payload, method="POST")
+
+    async def get_presigned_urls(self, dataset, table, groups=[]):
+        endpoint = "dataset/table/get_presigned_url"
+        payload = {
+            "dataset": dataset,
+            "table": table,
+            "groups": groups,
+        }
+        response = await self._request(endpoint, params=payload, method="GET")
+        return response.json()["presigned_urls"]
+
+    async def list_datasets(self, search_filter="", refresh=False):
+        endpoint = "dataset/list"
+        payload = {
+            "filter": search_filter,
+        }
+        return await self._cached_request(
+            ("dataset/list", search_filter),
+            endpoint,
+            refresh=refresh,
+            record_type=DatasetRecord,
+            many=True,
+            json=payload,
+            method="GET",
+        )
@@ -0,0 +1,76 @@
+import asyncio
+
+from c360_client.aio.request_cls import AsyncDatalakeClientRequest, gather_limited
+from c360_client.model_cls.waiter import Backoff, is_experiment_done
+
+
+class AsyncDatalakeClientModel:
+    """
+    The asyncio counterpart of `DatalakeClientModel` for metadata calls.
+    The object `c360_client.aio.model` is an instance of this class.
+    """
+    def __init__(self, request_inst=None):
+        self.request_inst = request_inst or AsyncDatalakeClientRequest()
+
+    async def _request(self, endpoint, **kwargs):
+        return await self.request_inst.request(endpoint, **kwargs)
+
+    async def get(self, name, groups=[]):
+        endpoint = f"models/{name}"
+        return await self._request(endpoint, method="GET", route="models/{name}")
+
+    async def get_many(self, names, limit=None):
+        return await gather_limited(
+            (self.get(name) for name in names),
+            limit=limit or self.request_inst.max_concurrency,
+        )
+
+    async def experiment_train(
+        self, name, data_source, label, model_type="CLASSIFICATION", description=""
+    ):
+        endpoint = "model/exp_train"
+
+        data_source["groups"] = await self.request_inst.get_groups(
+            groups=data_source.get("groups", [])
+        )
+
+        payload = dict(
+            model_name=name,
+            data_source=data_source,
+            label=label,
+            model_type=model_type,
+            description=description,
+        )
+        return await self._request(endpoint, method="POST", json=payload)
+
+    async def experiment_status(self, name):
+        endpoint = f"model/exp_train/{name}"
+        return await self._request(endpoint, method="GET", route="model/exp_train/{name}")
+
+    async def experiment_status_many(self, names, limit=None):
+        return await gather_limited(
+            (self.experiment_status(name) for name in names),
+            limit=limit or self.request_inst.max_concurrency,
+        )
+
+    async def experiment_wait(self, name, timeout=None):
+        """
+        Waits until the experiment is no longer in progress, backing off
+        exponentially between polls. Raises `asyncio.TimeoutError` after
+        `timeout` seconds.
+        """
+        async def wait():
+            backoff = Backoff()
+            while True:
+                response = await self.experiment_status(name=name)
+                if is_experiment_done(response):
+                    return response
+                await asyncio.sleep(backoff.next_delay())
+
+        return await asyncio.wait_for(wait(), timeout=timeout)
+
+    async def experiment_wait_many(self, names, timeout=None):
+        responses = await asyncio.gather(
+            *(self.experiment_wait(name, timeout=timeout) for name in names)
+        )
+        return dict(zip(names, responses))
@@ -0,0 +1,27 @@
+from c360_client.aio.request_cls import AsyncDatalakeClientRequest, gather_limited
+
+
+class AsyncDatalakeClientPipeline:
+    """
+    The asyncio counterpart of `DatalakeClientPipeline` for metadata calls.
+    The object `c360_client.aio.pipeline` is an instance of this class.
+    """
+    def __init__(self, request_inst=None):
+        self.request_inst = request_inst or AsyncDatalakeClientRequest()
+
+    async def _request(self, endpoint, **kwargs):
+        return await self.request_inst.request(endpoint, **kwargs)
+
+    async def get(self, name, groups=[]):
+        endpoint = f"pipelines/{name}"
+        return await self._request(endpoint, method="GET", route="pipelines/{name}")
+
+    async def get_many(self, names, limit=None):
+        return await gather_limited(
+            (self.get(name) for name in names),
+            limit=limit or self.request_inst.max_concurrency,
+        )
+
+    async def delete(self, name, groups=[]):
+        endpoint = f"pipelines/{name}"
+        return await self._request(endpoint, method="DELETE", route="pipelines/{name}")
@@ -0,0 +1,255 @@
+import json
+import asyncio
+import weakref
+
+try:
+    import aiohttp
+except ImportError:
+    raise ImportError(
+        "The asyncio client requires aiohttp. Install it with"
+        " `pip install c360-python-client[aio]`."
+    )
+
+from c360_client import instrumentation
+from c360_client.request_cls import get_default_request
+from c360_client.request_cls.transport import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_BACKOFF_FACTOR,
+    RETRY_STATUS_FORCELIST,
+)
+
+
+DEFAULT_MAX_CONCURRENCY = 100
+DEFAULT_LIMIT_PER_HOST = 100
+
+# methods that are safe to retry on a retryable status code
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class AsyncResponse:
+    """
+    The fully-read response of an asyncio request, with the parts of the
+    `requests.Response` interface the clients use.
+    """
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self._json = None
+
+    def __repr__(self):
+        return f"<AsyncResponse [{self.status_code}]>"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        if self._json is None:
+            self._json = json.loads(self.content)
+        return self._json
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code} for {self.url}: {self.text}")
+
+
+class AsyncDatalakeClientRequest:
+    """
+    The asyncio counterpart of `DatalakeClientRequest`. Credentials, groups,
+    the default space and the metadata cache are all shared with the
+    synchronous client, so logging in once works for both.
+
+    At most `max_concurrency` requests are in flight at a time, over a
+    connection pool of `limit_per_host` kept-alive connections per host.
+    A connection pool is created for each event loop it is used from.
+    """
+    def __init__(
+        self,
+        request_inst=None,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        limit_per_host=DEFAULT_LIMIT_PER_HOST,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    ):
+        self.request_inst = request_inst or get_default_request()
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # per event loop: (session, semaphore, user scope lock)
+        self._loop_state = weakref.WeakKeyDictionary()
+
+    def _get_loop_state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None or state[0].closed:
+            connect_timeout, read_timeout = _split_timeout(self.request_inst.transport.timeout)
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, limit_per_host=self.limit_per_host,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout, sock_read=read_timeout,
+                ),
+            )
+            state = (session, asyncio.Semaphore(self.max_concurrency), asyncio.Lock())
+            self._loop_state[loop] = state
+        return state
+
+    async def close(self):
+        """
+        Closes the connection pool of the running event loop.
+        """
+        state = self._loop_state.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(self, endpoint, method="GET", headers=None, route=None, **kwargs):
+        """
+        Makes a request to the API. Accepts the keyword arguments of
+        `aiohttp.ClientSession.request` (`params`, `json`, `data`, ...).
+
+        route - labels the instrumentation events, see
+            `DatalakeClientRequest.request`.
+        """
+        headers = dict(headers or {})
+        if not headers.get("Authorization"):
+            headers["Authorization"] = self.request_inst._get_auth_header()
+
+        if isinstance(kwargs.get("params"), dict):
+            kwargs["params"] = _encode_params(kwargs["params"])
+
+        session, semaphore, _ = self._get_loop_state()
+        url = f"{self.request_inst.url}/{endpoint}"
+        method = method.upper()
+
+        if not instrumentation.has_hooks():
+            return await self._send(session, semaphore, method, url, headers, kwargs)
+
+        timer = instrumentation.Timer()
+        event = instrumentation.RequestEvent(
+            kind="api", method=method, endpoint=route or endpoint, url=url,
+            started_at=timer.started_at,
+        )
+        try:
+            response = await self._send(session, semaphore, method, url, headers, kwargs, event)
+            event.status_code = response.status_code
+            event.bytes_received = len(response.content)
+            return response
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.duration = timer.elapsed
+            instrumentation.emit(event)
+
+    async def _send(self, session, semaphore, method, url, headers, kwargs, event=None):
+        for attempt in range(self.max_retries + 1):
+            if event is not None:
+                event.retries = attempt
+            is_last_attempt = attempt == self.max_retries
+            try:
+                async with semaphore:
+                    async with session.request(method, url, headers=headers, **kwargs) as resp:
+                        content = await resp.read()
+                        response = AsyncResponse(resp.status, dict(resp.headers), content, url)
+            except aiohttp.ClientConnectorError:
+                # the request was never sent, so it is safe to retry any method
+                if is_last_attempt:
+                    raise
+            else:
+                retryable = (
+                    response.status_code in RETRY_STATUS_FORCELIST
+                    and method in IDEMPOTENT_METHODS
+                )
+                if not retryable or is_last_attempt:
+                    return response
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+
+    async def cached_response(self, cache_key, make_request, refresh=False):
+        """
+        The asyncio counterpart of `DatalakeClientRequest.cached_response`,
+        where `make_request` is a coroutine function. Entries are kept next
+        to the synchronous ones, so they are invalidated together.
+        """
+        key = tuple(cache_key) + ("async", self.request_inst._get_identity())
+        cache = self.request_inst.cache
+
+        if not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await make_request()
+        if response.status_code == 200:
+            cache.set(key, response)
+        return response
+
+    async def _get_user_scope(self, refresh=False):
+        cache = self.request_inst.cache
+        key = self.request_inst._user_scope_cache_key()
+        _, _, lock = self._get_loop_state()
+
+        # only let one coroutine fetch the scope, the others wait for it
+        async with lock:
+            user_scope = None if refresh else cache.get(key)
+            if user_scope is None:
+                response = await self.request("entity/user/scope", method="GET")
+                user_scope = response.json().get("scope")
+                cache.set(key, user_scope)
+        return user_scope
+
+    async def get_groups(self, groups=None):
+        user_scope = None
+        if self.request_inst._is_user_scoped:
+            user_scope = await self._get_user_scope()
+        return self.request_inst._merge_groups(user_scope, groups)
+
+
+def _encode_params(params):
+    """
+    Encodes query parameters the way `requests` does: lists become repeated
+    keys and None values are dropped.
+    """
+    encoded = []
+    for key, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        encoded.extend((key, str(v)) for v in values if v is not None)
+    return encoded
+
+
+def _split_timeout(timeout):
+    if isinstance(timeout, (tuple, list)):
+        return timeout[0], timeout[1]
+    return timeout, timeout
+
+
+async def gather_limited(coroutines, limit=DEFAULT_MAX_CONCURRENCY, return_exceptions=True):
+    """
+    Like `asyncio.gather`, but runs at most `limit` of the coroutines at a
+    time. By default, exceptions are returned in place of the results so
+    one failure does not discard the rest.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(
+        *(run(coroutine) for coroutine in coroutines),
+        return_exceptions=return_exceptions,
+    )
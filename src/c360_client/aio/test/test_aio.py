@@ -0,0 +1,71 @@
+import asyncio
+from pytest import fixture, importorskip
+
+importorskip("aiohttp")
+
+import c360_client
+from c360_client.aio import AsyncDatalakeClientRequest, AsyncDatalakeClientDataset
+from c360_client.aio.request_cls import AsyncResponse
+from c360_client.responses import ApiResponse, DatasetRecord
+
+
+@fixture
+def async_dataset(local_server, mocker):
+    request_inst = c360_client.api
+    mocker.patch.object(request_inst, "url", local_server.url)
+    mocker.patch.object(request_inst, "api_key", "test-key")
+    mocker.patch.object(request_inst, "_defaults", {"space": ["common"]})
+    request_inst.clear_cache()
+    yield AsyncDatalakeClientDataset(AsyncDatalakeClientRequest(request_inst))
+    request_inst.clear_cache()
+
+
+def test_request(async_dataset):
+    async def main():
+        async with async_dataset.request_inst:
+            return await async_dataset.get("test_dataset")
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.json()["path"] == "/dataset/get?name=test_dataset&groups=common"
+    assert response.json()["authorization"] == "test-key"
+
+
+def test_get_many_is_cached(async_dataset, local_server):
+    names = [f"dataset_{i}" for i in range(20)]
+
+    async def main():
+        async with async_dataset.request_inst:
+            first = await async_dataset.get_many(names)
+            second = await async_dataset.get_many(names)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert [r.json()["path"].split("&")[0] for r in first] == [
+        f"/dataset/get?name={name}" for name in names
+    ]
+    assert [r.json() for r in second] == [r.json() for r in first]
+    assert c360_client.api.get_cache_stats()["hits"] >= 20
+
+
+def test_typed_responses(async_dataset):
+    c360_client.api._defaults["typed_responses"] = True
+
+    async def main():
+        async with async_dataset.request_inst:
+            first = await async_dataset.get("test_dataset")
+            second = await async_dataset.get("test_dataset")
+            listing = await async_dataset.list_datasets()
+        return first, second, listing
+
+    first, second, listing = asyncio.run(main())
+    assert isinstance(first, ApiResponse)
+    assert isinstance(first.data, DatasetRecord)
+    assert first.data.path == "/dataset/get?name=test_dataset&groups=common"
+    # the cached response is typed too, and only decoded once
+    assert second.json() is first.json()
+    assert isinstance(listing, ApiResponse) and listing.many
+
+    # and unwrapped once typed responses are off
+    c360_client.api._defaults["typed_responses"] = False
+    assert isinstance(asyncio.run(async_dataset.get("test_dataset")), AsyncResponse)
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_BULK_WORKERS = 16
+
+
+class BulkResult:
+    """
+    The outcome of one item of a bulk call: either its `response`, or the
+    `error` raised while processing it.
+    """
+    __slots__ = ("item", "response", "error")
+
+    def __init__(self, item, response=None, error=None):
+        self.item = item
+        self.response = response
+        self.error = error
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.error else f"response={self.response!r}"
+        return f"<BulkResult item={self.item!r} {outcome}>"
+
+    @property
+    def ok(self):
+        if self.error is not None:
+            return False
+        status_code = getattr(self.response, "status_code", None)
+        return status_code is None or status_code < 400
+
+
+def run_bulk(func, items, max_workers=DEFAULT_BULK_WORKERS):
+    """
+    Calls `func(item)` for every item over a pool of `max_workers` threads.
+    Returns a `BulkResult` per item, in the same order as `items`; an
+    exception raised for one item does not stop the others.
+    """
+    items = list(items)
+
+    def run(item):
+        try:
+            return BulkResult(item, response=func(item))
+        except Exception as e:
+            return BulkResult(item, error=e)
+
+    if len(items) <= 1 or max_workers <= 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(run, items))
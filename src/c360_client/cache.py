@@ -0,0 +1,166 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_TTL = 300            # seconds
+DEFAULT_MAX_ENTRIES = 1024
+
+_MISSING = object()
+
+
+class MetadataCache:
+    """
+    A thread-safe in-memory cache with per-entry TTL and LRU eviction, used
+    to avoid repeating metadata lookups (user scope, dataset metadata and
+    listings) against the API.
+
+    Keys are tuples, so related entries can be invalidated together by a
+    key prefix, e.g. `cache.invalidate("dataset/get", "my_dataset")`.
+
+    If `persist_dir` is given, entries are also written there as pickle
+    files, so they are shared across processes until they expire.
+    """
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, persist_dir=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist_dir = persist_dir
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self.persist_dir:
+                entry = self._load(key)
+                if entry is not None:
+                    self._store(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        entry = (time.time() + ttl, value)
+        with self._lock:
+            self._store(key, entry)
+            if self.persist_dir:
+                self._dump(key, entry)
+
+    def get_or_set(self, key, func, ttl=None, refresh=False):
+        """
+        Returns the cached value for `key`, or calls `func()` and caches
+        its result. `refresh` skips the cached value.
+        """
+        if not refresh:
+            value = self.get(key, default=_MISSING)
+            if value is not _MISSING:
+                return value
+
+        value = func()
+        self.set(key, value, ttl=ttl)
+        return value
+
+    def invalidate(self, *prefix):
+        """
+        Removes every entry whose key starts with `prefix`. Without a prefix,
+        the whole cache is cleared.
+        """
+        prefix = tuple(prefix)
+        with self._lock:
+            for key in list(self._entries):
+                if key[:len(prefix)] == prefix:
+                    del self._entries[key]
+
+            if self.persist_dir:
+                for filename in os.listdir(self.persist_dir):
+                    if not filename.endswith(".pkl"):
+                        continue
+                    path = os.path.join(self.persist_dir, filename)
+                    stored = self._read(path)
+                    if stored is None or stored[0][:len(prefix)] == prefix:
+                        self._remove(path)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._entries),
+        )
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    #########
+    #  On-disk persistence
+    #########
+
+    def _path_for(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.persist_dir, f"{digest}.pkl")
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # a missing, corrupted or incompatible entry
+            return None
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _load(self, key):
+        path = self._path_for(key)
+        stored = self._read(path)
+        if stored is None:
+            return None
+
+        stored_key, entry = stored
+        if stored_key != key:
+            return None
+        if entry[0] < time.time():
+            self._remove(path)
+            return None
+        return entry
+
+    def _dump(self, key, entry):
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((key, entry), f)
+            os.replace(tmp_path, path)
+        except Exception:
+            # persistence is best-effort, the entry is still cached in memory
+            self._remove(tmp_path)
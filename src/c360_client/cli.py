@@ -0,0 +1,472 @@
+import sys
+import json
+import contextlib
+
+import click
+
+
+# Only click is imported up front: the client (and requests, boto3, pandas...)
+# is imported by the command that needs it, so that `c360 --help` and typos
+# return immediately.
+
+DEFAULT_BULK_WORKERS = 16    # same as `c360_client.bulk`, without importing it
+
+
+class Output:
+    """
+    Writes the results of a command, either as text for people or as JSON
+    for scripts. In JSON mode, anything the library prints goes to stderr,
+    so that stdout only holds the JSON document.
+    """
+    def __init__(self, as_json=False):
+        self.as_json = as_json
+
+    @contextlib.contextmanager
+    def capture(self):
+        if not self.as_json:
+            yield
+            return
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+
+    def emit(self, data, text=None):
+        if self.as_json:
+            click.echo(json.dumps(data, indent=2, default=str))
+        elif text is not None:
+            click.echo(text)
+        elif isinstance(data, (dict, list)):
+            click.echo(json.dumps(data, indent=2, default=str))
+        else:
+            click.echo(data)
+
+
+def response_data(response):
+    """
+    The body of an API response, decoded from JSON when it is JSON.
+    """
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def check_response(response):
+    if response.status_code >= 400:
+        raise click.ClickException(
+            f"Request failed with status {response.status_code}: {response.text}"
+        )
+    return response
+
+
+def bulk_result_data(result):
+    data = dict(item=result.item, ok=result.ok)
+    if result.error is not None:
+        data["error"] = str(result.error)
+    if result.response is not None:
+        data["status_code"] = result.response.status_code
+        data["response"] = response_data(result.response)
+    return data
+
+
+def emit_bulk_results(output, results):
+    """
+    Writes the results of a bulk command, and exits with status 1 if any
+    item failed.
+    """
+    data = [bulk_result_data(result) for result in results]
+    failed = [item for item in data if not item["ok"]]
+    lines = [
+        "{} {}".format(
+            "ok    " if item["ok"] else "FAILED",
+            json.dumps(item["item"], default=str),
+        ) + ("" if item["ok"] else ": {}".format(item.get("error") or item.get("response")))
+        for item in data
+    ]
+    lines.append(f"{len(data) - len(failed)} succeeded, {len(failed)} failed")
+    output.emit(data, text="\n".join(lines))
+    if failed:
+        sys.exit(1)
+
+
+def read_manifest(path):
+    """
+    Reads a bulk manifest: a JSON list of objects, or one JSON object per
+    line (JSON Lines). `-` reads it from stdin.
+    """
+    with click.open_file(path, "r") as f:
+        content = f.read()
+    try:
+        if content.lstrip().startswith("["):
+            items = json.loads(content)
+        else:
+            items = [json.loads(line) for line in content.splitlines() if line.strip()]
+    except ValueError as e:
+        raise click.BadParameter(f"invalid JSON: {e}", param_hint="MANIFEST")
+    if not all(isinstance(item, dict) for item in items):
+        raise click.BadParameter("expected a list of JSON objects", param_hint="MANIFEST")
+    return items
+
+
+def check_manifest_keys(items, required, optional=()):
+    allowed = set(required) | set(optional)
+    for index, item in enumerate(items):
+        missing = [key for key in required if key not in item]
+        unknown = sorted(set(item) - allowed)
+        if missing or unknown:
+            problems = []
+            if missing:
+                problems.append("missing " + ", ".join(missing))
+            if unknown:
+                problems.append("unknown " + ", ".join(unknown))
+            raise click.BadParameter(
+                f"item {index}: " + "; ".join(problems), param_hint="MANIFEST",
+            )
+
+
+def get_dataset_client():
+    import c360_client
+    return c360_client.dataset
+
+
+def get_model_client():
+    import c360_client
+    return c360_client.model
+
+
+def get_pipeline_client():
+    from c360_client.pipeline_cls import DatalakeClientPipeline
+    return DatalakeClientPipeline()
+
+
+groups_option = click.option(
+    "--group", "groups", multiple=True, help="Group to act as, can be repeated.",
+)
+workers_option = click.option(
+    "--workers", "max_workers", type=int, default=None,
+    help="Number of concurrent transfers.",
+)
+
+
+@click.group()
+@click.option("--json", "as_json", is_flag=True, help="Write results as JSON, for scripts.")
+@click.pass_context
+def cli(ctx, as_json):
+    """
+    Command line interface of the c360 client. Configured with the same
+    environment variables as the library (C360_TENANT, C360_API_KEY...).
+    """
+    ctx.obj = Output(as_json=as_json)
+
+
+#########
+#  Dataset
+#########
+
+
+@cli.group()
+def dataset():
+    """
+    Datasets and their tables.
+    """
+
+
+@dataset.command("get")
+@click.argument("names", nargs=-1, required=True)
+@groups_option
+@click.option("--refresh", is_flag=True, help="Skip the metadata cache.")
+@click.pass_obj
+def dataset_get(output, names, groups, refresh):
+    """
+    Get the metadata of one or more datasets, fetched concurrently.
+    """
+    client = get_dataset_client()
+    if len(names) == 1:
+        with output.capture():
+            response = check_response(
+                client.get(names[0], groups=list(groups), refresh=refresh)
+            )
+        output.emit(response_data(response))
+        return
+    with output.capture():
+        results = client.get_many(names, groups=list(groups), refresh=refresh)
+    emit_bulk_results(output, results)
+
+
+@dataset.command("list")
+@click.option("--filter", "search_filter", default="", help="Only list matching datasets.")
+@click.option("--refresh", is_flag=True, help="Skip the metadata cache.")
+@click.pass_obj
+def dataset_list(output, search_filter, refresh):
+    """
+    List datasets.
+    """
+    client = get_dataset_client()
+    with output.capture():
+        response = check_response(
+            client.list_datasets(search_filter=search_filter, refresh=refresh)
+        )
+    output.emit(response_data(response))
+
+
+@dataset.command("download")
+@click.argument("dataset_name", metavar="DATASET")
+@click.argument("tables", nargs=-1, required=True)
+@groups_option
+@click.option("--target", help="Folder to download to, the dataset name by default.")
+@workers_option
+@click.option("--max-rate", "max_bytes_per_second", type=int, help="Limit in bytes per second.")
+@click.option("--cache", is_flag=True, help="Keep the tables in the local file cache.")
+@click.pass_obj
+def dataset_download(
+    output, dataset_name, tables, groups, target, max_workers, max_bytes_per_second, cache,
+):
+    """
+    Download tables of a dataset as parquet files.
+    """
+    options = {} if max_workers is None else dict(max_workers=max_workers)
+    client = get_dataset_client()
+    with output.capture():
+        files = client.download_tables(
+            [(dataset_name, table) for table in tables],
+            groups=list(groups),
+            target=target,
+            max_bytes_per_second=max_bytes_per_second,
+            cache=cache,
+            **options
+        )
+    emit_downloaded_tables(output, files)
+
+
+@dataset.command("download-many")
+@click.argument("manifest", type=click.Path(allow_dash=True))
+@workers_option
+@click.option("--max-rate", "max_bytes_per_second", type=int, help="Limit in bytes per second.")
+@click.option("--cache", is_flag=True, help="Keep the tables in the local file cache.")
+@click.pass_obj
+def dataset_download_many(output, manifest, max_workers, max_bytes_per_second, cache):
+    """
+    Download the tables listed in MANIFEST, all through one pool of
+    downloads. Each item has a `dataset` and a `table`, and optionally
+    `groups` and a `target` folder.
+    """
+    tables = read_manifest(manifest)
+    check_manifest_keys(tables, ("dataset", "table"), ("groups", "target"))
+    options = {} if max_workers is None else dict(max_workers=max_workers)
+    client = get_dataset_client()
+    with output.capture():
+        files = client.download_tables(
+            tables, max_bytes_per_second=max_bytes_per_second, cache=cache, **options
+        )
+    emit_downloaded_tables(output, files)
+
+
+def emit_downloaded_tables(output, files):
+    data = [
+        dict(dataset=dataset_name, table=table, files=paths)
+        for (dataset_name, table), paths in files.items()
+    ]
+    output.emit(data, text="\n".join(
+        f"{item['dataset']}.{item['table']}: {len(item['files'])} files" for item in data
+    ))
+
+
+@dataset.command("upload")
+@click.argument("dataset_name", metavar="DATASET")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--table", help="Table name.")
+@click.option("--zone", help="Zone of the table.")
+@groups_option
+@click.option("--chunked", is_flag=True, help="Upload in parts, resumable.")
+@workers_option
+@click.pass_obj
+def dataset_upload(output, dataset_name, path, table, zone, groups, chunked, max_workers):
+    """
+    Upload a local file as a table.
+    """
+    options = {} if max_workers is None else dict(max_workers=max_workers)
+    client = get_dataset_client()
+    with output.capture():
+        response = check_response(client.upload_table(
+            dataset_name, path, table=table, zone=zone, groups=list(groups),
+            chunked=chunked, **options
+        ))
+    output.emit(response_data(response))
+
+
+@dataset.command("upload-many")
+@click.argument("manifest", type=click.Path(allow_dash=True))
+@workers_option
+@click.option("--chunked", is_flag=True, help="Upload in parts, resumable.")
+@click.pass_obj
+def dataset_upload_many(output, manifest, max_workers, chunked):
+    """
+    Upload the files listed in MANIFEST as tables, concurrently. Each item
+    has a `dataset` and a `local_path`, and optionally a `table`, `zone`,
+    `metadata` and `groups`.
+    """
+    from c360_client.bulk import run_bulk
+
+    tables = read_manifest(manifest)
+    check_manifest_keys(tables, ("dataset", "local_path"), ("table", "zone", "metadata", "groups"))
+    client = get_dataset_client()
+    with output.capture():
+        results = run_bulk(
+            lambda table: client.upload_table(chunked=chunked, **table),
+            tables,
+            max_workers=max_workers or DEFAULT_BULK_WORKERS,
+        )
+    emit_bulk_results(output, results)
+
+
+@dataset.command("register")
+@click.argument("dataset_name", metavar="DATASET")
+@click.argument("table")
+@click.argument("s3_path")
+@click.option("--zone", help="Zone of the table.")
+@groups_option
+@click.pass_obj
+def dataset_register(output, dataset_name, table, s3_path, zone, groups):
+    """
+    Register a file already in S3 as a table.
+    """
+    client = get_dataset_client()
+    with output.capture():
+        response = check_response(client.register_table(
+            dataset_name, table, s3_path, zone=zone, groups=list(groups),
+        ))
+    output.emit(response_data(response))
+
+
+@dataset.command("register-many")
+@click.argument("manifest", type=click.Path(allow_dash=True))
+@workers_option
+@click.pass_obj
+def dataset_register_many(output, manifest, max_workers):
+    """
+    Register the tables listed in MANIFEST, concurrently. Each item has a
+    `dataset`, `table` and `s3_path`, and optionally a `zone`, `metadata`
+    and `groups`.
+    """
+    tables = read_manifest(manifest)
+    check_manifest_keys(tables, ("dataset", "table", "s3_path"), ("zone", "metadata", "groups"))
+    client = get_dataset_client()
+    with output.capture():
+        results = client.register_many(tables, max_workers=max_workers or DEFAULT_BULK_WORKERS)
+    emit_bulk_results(output, results)
+
+
+#########
+#  Model
+#########
+
+
+@cli.group()
+def model():
+    """
+    Models and their experiments.
+    """
+
+
+@model.command("download")
+@click.argument("name")
+@workers_option
+@click.option("--no-cache", is_flag=True, help="Do not use the local file cache.")
+@click.pass_obj
+def model_download(output, name, max_workers, no_cache):
+    """
+    Download the artifacts of a model into the current folder.
+    """
+    options = {} if max_workers is None else dict(max_workers=max_workers)
+    client = get_model_client()
+    with output.capture():
+        try:
+            paths = client.download(name, cache=not no_cache, **options)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+    output.emit(paths, text="\n".join(paths))
+
+
+@model.command("wait")
+@click.argument("names", nargs=-1, required=True)
+@click.option("--timeout", type=float, help="Give up after that many seconds.")
+@click.pass_obj
+def model_wait(output, names, timeout):
+    """
+    Wait for experiments to finish, polling them together.
+    """
+    client = get_model_client()
+    with output.capture():
+        try:
+            responses = client.experiment_wait_many(names, timeout=timeout)
+        except TimeoutError as e:
+            raise click.ClickException(str(e) or "Timed out waiting for the experiments")
+    data = {name: response_data(response) for name, response in responses.items()}
+    output.emit(data)
+
+
+#########
+#  Pipeline
+#########
+
+
+@cli.group()
+def pipeline():
+    """
+    Pipelines.
+    """
+
+
+@pipeline.command("validate")
+@click.argument("path", default="pipelines/", type=click.Path(exists=True, file_okay=False))
+@click.pass_obj
+def pipeline_validate(output, path):
+    """
+    Check the pipelines under PATH locally.
+    """
+    from c360_client.pipeline_cls.compiler import PipelineValidationError, compile_pipelines
+
+    try:
+        pipelines = compile_pipelines(path)
+    except PipelineValidationError as e:
+        output.emit(dict(ok=False, errors=e.errors), text=str(e))
+        sys.exit(1)
+    output.emit(
+        dict(ok=True, pipelines=sorted(pipelines.pipelines)),
+        text=f"{len(pipelines.pipelines)} pipelines are valid",
+    )
+
+
+@pipeline.command("deploy")
+@click.argument("path", default="pipelines/", type=click.Path(exists=True, file_okay=False))
+@click.option("--force", is_flag=True, help="Upload every file, whatever the manifest says.")
+@click.option("--dry-run", is_flag=True, help="Only show what would be deployed.")
+@click.option(
+    "--manifest", "manifest_path", type=click.Path(dir_okay=False), help="Deploy manifest path.",
+)
+@click.option("--no-validate", is_flag=True, help="Skip the local validation.")
+@click.option("--strict", is_flag=True, help="Do not deploy if the local validation fails.")
+@click.pass_obj
+def pipeline_deploy(output, path, force, dry_run, manifest_path, no_validate, strict):
+    """
+    Deploy the pipeline files under PATH that changed since the last deploy.
+    """
+    from c360_client.pipeline_cls.compiler import PipelineValidationError
+
+    client = get_pipeline_client()
+    with output.capture():
+        try:
+            response = client.deploy(
+                path, force=force, dry_run=dry_run, manifest_path=manifest_path,
+                validate=False if no_validate else (True if strict else "warn"),
+            )
+        except PipelineValidationError as e:
+            raise click.ClickException(str(e))
+    if response is None:
+        output.emit(dict(deployed=False), text="Nothing deployed")
+        return
+    check_response(response)
+    output.emit(dict(deployed=True, response=response_data(response)), text="Deployed")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,11 +1,31 @@
 import os
 import json
-import requests
-import getpass
-import wget
-
-from c360_client.request_cls import DatalakeClientRequest
-from c360_client.utils import get_boto_client
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from c360_client.request_cls import get_default_request
+from c360_client.dataset_cls import table_reader
+from c360_client.bulk import run_bulk, DEFAULT_BULK_WORKERS
+from c360_client.downloader import (
+    ParallelDownloader,
+    DownloadTask,
+    DEFAULT_MAX_WORKERS,
+)
+from c360_client.filecache import FileCache
+from c360_client.s3_downloader import S3Downloader, S3AccessError, key_from_url
+from c360_client.responses import Record, DatasetRecord, parse_json
+from c360_client.uploader import (
+    ChunkedUploader,
+    DirectoryUploader,
+    FileSlice,
+    MultipartFormStream,
+    DEFAULT_PART_SIZE,
+    DEFAULT_MAX_WORKERS as DEFAULT_UPLOAD_WORKERS,
+)
+
+
+DEFAULT_PAGE_SIZE = 100
 
 
 class DatalakeClientDataset:
@@ -14,9 +34,8 @@ class DatalakeClientDataset:
         A configurable client object for hitting c360 dataset endpoints.
         The object `c360_client.dataset` is an instance of this class.
         """
-        self.request_inst = DatalakeClientRequest()
+        self.request_inst = get_default_request()
         self._defaults = defaults
-        # At this point the request class should be instantiated
 
     @property
     def tenant(self):
@@ -47,16 +66,60 @@ class DatalakeClientDataset:
             endpoint=endpoint, **kwargs,
         )
 
-    def get(self, name, groups=[]):
+    def _invalidate(self, dataset):
+        # drop cached metadata that a write to `dataset` makes stale
+        self.request_inst.invalidate_cache("dataset/get", dataset)
+        self.request_inst.invalidate_cache("dataset/list")
+
+    def _cached_request(
+        self, cache_key, endpoint, refresh=False, record_type=Record, many=False, **kwargs
+    ):
+        # typed responses are cached as such, so their body is only decoded
+        # once
+        typed_response = self.request_inst.typed_response
+        response = self.request_inst.cached_response(
+            cache_key,
+            lambda: typed_response(self._request(endpoint, **kwargs), record_type, many=many),
+            refresh=refresh,
+        )
+        return typed_response(response, record_type, many=many)
+
+    def get(self, name, groups=[], refresh=False):
+        """
+        Get the dataset metadata. Responses are cached for a while, pass
+        `refresh=True` to skip the cache.
+        """
+        return self._get(name, ",".join(self.get_groups(groups)), refresh=refresh)
+
+    def _get(self, name, groups, refresh=False):
+        # `groups` is already resolved, as comma-separated values
         endpoint = "dataset/get"
         payload = {
             "name": name,
-            "groups": ",".join(self.get_groups(groups)),
-            # comma-separated values for get
+            "groups": groups,
         }
-        response = self._request(endpoint, params=payload, method="GET")
+        response = self._cached_request(
+            ("dataset/get", name, groups),
+            endpoint,
+            refresh=refresh,
+            record_type=DatasetRecord,
+            params=payload,
+            method="GET",
+        )
         return response
 
+    def get_many(self, names, groups=[], refresh=False, max_workers=DEFAULT_BULK_WORKERS):
+        """
+        Get the metadata of many datasets, `max_workers` requests at a time.
+        Returns a `BulkResult` per name, in the same order as `names`.
+        """
+        groups = ",".join(self.get_groups(groups))
+        return run_bulk(
+            lambda name: self._get(name, groups, refresh=refresh),
+            names,
+            max_workers=max_workers,
+        )
+
     def create(self, name, groups=[], dry_run=False):
         endpoint = "dataset"
         payload = {
@@ -65,6 +128,7 @@ class DatalakeClientDataset:
             # "dry_run": dry_run,
         }
         response = self._request(endpoint, json=payload, method="POST")
+        self._invalidate(name)
 
         return response
 
@@ -119,56 +183,136 @@ class DatalakeClientDataset:
 
 
     def upload_table(
-        self, dataset, local_path, table=None, zone=None, metadata={}, groups=[], dry_run=False
+        self, dataset, local_path, table=None, zone=None, metadata={}, groups=[], dry_run=False,
+        chunked=False, part_size=DEFAULT_PART_SIZE, max_workers=DEFAULT_UPLOAD_WORKERS,
     ):
+        """
+        Uploads a local file as a table. The file is streamed from disk, so
+        memory use does not depend on the file size.
+
+        chunked - upload the file in parts of `part_size` bytes to presigned
+            URLs, `max_workers` parts at a time. An interrupted chunked upload
+            is resumed by calling this method again with the same file.
+        """
         # TODO: Accessing this method is deprecated. This method should eventually
         #       be hidden.
-        with open(local_path, "rb") as contentfile:
-            endpoint = "dataset/table/upload"
-            payload = {
-                "dataset_name": dataset,
-                "table_name": table,
-                "zone": zone,
-                "table_details": metadata,
-                "groups": self.get_groups(groups),
-                "dry_run": dry_run,
-            }
-            # for requests with files, the payload has to be one of the files
-            # named 'json'
-            # see https://stackoverflow.com/a/35946962
-
-            files_to_upload = {
-                "json": (None, json.dumps(payload), 'application/json'),
-                "file": (os.path.basename(local_path), contentfile, 'application/octet-stream')
-            }
+        endpoint = "dataset/table/upload"
+        payload = {
+            "dataset_name": dataset,
+            "table_name": table,
+            "zone": zone,
+            "table_details": metadata,
+            "groups": self.get_groups(groups),
+            "dry_run": dry_run,
+        }
 
+        if chunked:
+            transport = self.request_inst.transport
+            uploader = ChunkedUploader(
+                request_func=self._request,
+                session=transport.session,
+                endpoint=endpoint,
+                part_size=part_size,
+                max_workers=max_workers,
+                timeout=transport.timeout,
+            )
+            response = uploader.upload(local_path, payload)
+            self._invalidate(dataset)
+            return response
+
+        # for requests with files, the payload has to be one of the files
+        # named 'json'
+        # see https://stackoverflow.com/a/35946962
+        fields = [
+            ("json", None, json.dumps(payload), "application/json"),
+            (
+                "file", os.path.basename(local_path), FileSlice(local_path),
+                "application/octet-stream",
+            ),
+        ]
+        with MultipartFormStream(fields) as body:
             response = self._request(
-                endpoint, method="POST", files=files_to_upload
+                endpoint, method="POST", data=body,
+                headers={"Content-Type": body.content_type},
             )
+        self._invalidate(dataset)
 
-            return response
+        return response
 
     def register_table(self, dataset, table, s3_path, zone=None, metadata={}, groups=[]):
         # TODO: Accessing this method is deprecated. This method should eventually
         #       be hidden.
+        print(metadata)
+        response = self._register_table(
+            dataset, table, s3_path, zone=zone, metadata=metadata,
+            groups=self.get_groups(groups),
+        )
+        self._invalidate(dataset)
 
+        return response
+
+    def _register_table(self, dataset, table, s3_path, zone=None, metadata={}, groups=[]):
         # assume that the file is already placed in the appropriate s3 file, and
-        # register them with metadata.
+        # register them with metadata. `groups` is already resolved.
         endpoint = "dataset/table/register"
-        print(metadata)
         payload = {
             "dataset_name": dataset,
-            "groups": self.get_groups(groups),
+            "groups": groups,
             "table_name": table,
             "zone": zone,
             "s3_path": s3_path,
             "table_details": metadata,
         }
-        response = self._request(endpoint, json=payload, method="POST")
+        return self._request(endpoint, json=payload, method="POST")
 
-        return response
+    def register_many(self, tables, max_workers=DEFAULT_BULK_WORKERS):
+        """
+        Registers many tables, `max_workers` requests at a time.
+
+        tables - a list of dicts with the arguments of `register_table`, e.g.
+            `{"dataset": ..., "table": ..., "s3_path": ..., "zone": ...}`.
+
+        Returns a `BulkResult` per table, in the same order as `tables`.
+        """
+        tables = list(tables)
+
+        # resolve every distinct set of groups once for the whole batch
+        resolved_groups = {}
+        for table in tables:
+            key = tuple(table.get("groups", []))
+            if key not in resolved_groups:
+                resolved_groups[key] = self.get_groups(list(key))
+
+        def register(table):
+            kwargs = dict(table)
+            kwargs["groups"] = resolved_groups[tuple(table.get("groups", []))]
+            return self._register_table(**kwargs)
+
+        results = run_bulk(register, tables, max_workers=max_workers)
+
+        for dataset in set(table["dataset"] for table in tables):
+            self._invalidate(dataset)
 
-    def initialize(self, name, local_dir, groups=[], table_details={}, permissions={}):
+        return results
+
+    def initialize(
+        self, name, local_dir, groups=[], table_details={}, permissions={},
+        only=None, max_workers=DEFAULT_UPLOAD_WORKERS, progress=None, batched=False,
+    ):
+        """
+        Creates a dataset from the files under `local_dir`, streamed from
+        disk in a single request whose response is returned.
+
+        batched - split the files over several requests, with large files
+            uploaded in parallel (`max_workers` requests at a time). The
+            server has to accept the `batch` field added to their payload.
+            If some files fail, an `UploadError` is raised whose `failed`
+            attribute lists them; pass that list as `only` to send just
+            those files again.
+
+        progress - optional callable, called with `(uploaded_files,
+            total_files, uploaded_bytes, total_bytes)`.
+        """
         endpoint = "dataset/initialize"
 
         payload = {
@@ -177,33 +321,17 @@ class DatalakeClientDataset:
             "groups": self.get_groups(groups),
         }
 
-        files_to_upload = {}
-
-        # for requests with files, the payload has to be one of the files
-        # named 'json'
-        # see https://stackoverflow.com/a/35946962
-
-        files_to_upload["json"] = (None, json.dumps(payload), 'application/json')
-
-        local_dir_abspath = os.path.abspath(local_dir)
-
-        for root, dirs, files in os.walk(local_dir_abspath):
-            for filename in files:
-                abspath = os.path.join(root, filename)
-                rel_path = abspath.replace(local_dir_abspath, "").strip("/")
-                files_to_upload[rel_path] = (
-                    filename, open(abspath, 'rb'), 'application/octet-stream'
-                )
-
-        # make the request
-        response = self._request(
-            endpoint, method="POST", files=files_to_upload
+        uploader = DirectoryUploader(
+            request_func=self._request,
+            endpoint=endpoint,
+            max_workers=max_workers,
+            batched=batched,
+            progress=progress,
         )
-
-        # close files
-        for key, fileobj in files_to_upload.items():
-            if key != "json":
-                fileobj[1].close()
+        try:
+            response = uploader.upload(local_dir, payload, only=only)
+        finally:
+            self._invalidate(name)
 
         return response
 
@@ -215,10 +343,55 @@ class DatalakeClientDataset:
         else:
             return f"{self.tenant}-c360-{sector}-dev"
 
-    def download_table(self, dataset, table, groups=[], target=None, sector="lake"):
+    def _get_downloader(self, max_workers=DEFAULT_MAX_WORKERS, cache=False, **kwargs):
+        if cache is True:
+            cache = FileCache(namespace="tables")
+        transport = self.request_inst.transport
+        return ParallelDownloader(
+            session=transport.session,
+            timeout=transport.timeout,
+            max_workers=max_workers,
+            cache=cache or None,
+            **kwargs,
+        )
+
+    def _get_direct_s3_options(self, direct):
         """
-        target - target folder to download. If not given, default to dataset name.
+        Returns the `S3Downloader` options if tables are to be downloaded
+        straight from S3, or None.
+        """
+        options = dict(self._defaults.get("direct_s3") or {})
+        enabled = options.pop("enabled", None)
+        if direct is None:
+            direct = enabled
+        if direct is None:
+            direct = os.getenv("C360_DIRECT_S3", "").lower() in ("1", "true", "yes")
+        return options if direct else None
+
+    def _download_table_direct(
+        self, table, presigned_urls, target, sector, max_workers, cache, options,
+    ):
         """
+        Downloads the objects the presigned URLs point to straight from the
+        `sector` bucket: the API picks the objects (e.g. the latest version
+        of the table) and S3 serves them.
+        """
+        bucket = self.get_bucket_name(sector)
+        keys = [key_from_url(url, bucket) for url in presigned_urls]
+        if None in keys:
+            raise S3AccessError(f"Not all the parts of {table} are in s3://{bucket}")
+
+        if cache is True:
+            cache = FileCache(namespace="tables")
+        options.setdefault("max_concurrency", max_workers)
+        downloader = S3Downloader(cache=cache or None, **options)
+        objects = downloader.get_objects(bucket, keys)
+
+        os.makedirs(target, exist_ok=True)
+        paths = [f"{target}/{table}.{i}.parquet" for i in range(len(objects))]
+        return downloader.download_many(bucket, objects, paths)
+
+    def _get_presigned_urls(self, dataset, table, groups=[]):
         endpoint = "dataset/table/get_presigned_url"
         payload = {
             "dataset": dataset,
@@ -227,41 +400,254 @@ class DatalakeClientDataset:
             # comma-separated values for get
         }
         response = self._request(endpoint, params=payload, method="GET")
-        presigned_urls = response.json()["presigned_urls"]
+        return response.json()["presigned_urls"]
 
-        target = target or dataset
+    def _get_table_tasks(self, table, presigned_urls, target):
         os.makedirs(target, exist_ok=True)
+        return [
+            DownloadTask(url, f"{target}/{table}.{i}.parquet")
+            for i, url in enumerate(presigned_urls)
+        ]
+
+    def download_table(
+        self, dataset, table, groups=[], target=None, sector="lake",
+        max_workers=DEFAULT_MAX_WORKERS, cache=False, direct=None,
+    ):
+        """
+        target - target folder to download. If not given, default to dataset name.
+        max_workers - number of parts (or ranges of large parts) downloaded
+            concurrently.
+        cache - if set (or given a `FileCache`), parts are kept in the local
+            file cache by object path and ETag, and taken from there while
+            the table has not changed, whatever the `target`.
+
+        direct - download the parts straight from the `sector` bucket with
+            the current AWS credentials, falling back to presigned URLs when
+            they cannot read it. The parts are still the ones the API hands
+            out presigned URLs for. Defaults to `c360_client.set_direct_s3`, or
+            the `C360_DIRECT_S3` environment variable.
+
+        Parts that are already present in `target` are not downloaded again,
+        and interrupted downloads are resumed on the next call.
+        """
+        target = target or dataset
+        presigned_urls = self._get_presigned_urls(dataset, table, groups=groups)
+
+        options = self._get_direct_s3_options(direct)
+        if options is not None:
+            try:
+                filenames = self._download_table_direct(
+                    table, presigned_urls, target, sector, max_workers, cache, options,
+                )
+            except S3AccessError as e:
+                print(f"{e}, downloading through presigned URLs instead")
+            else:
+                print("Table downloaded under", target)
+                return filenames
 
-        filenames = []
+        tasks = self._get_table_tasks(table, presigned_urls, target)
 
-        for i in range(len(presigned_urls)):
-            filename = f"{target}/{table}.{i}.parquet"
-            wget.download(presigned_urls[i], out=filename)
-            filenames.append(filename)
+        downloader = self._get_downloader(max_workers=max_workers, cache=cache)
+        filenames = downloader.download_many(tasks)
 
         print("Table downloaded under", target)
 
         return filenames
 
 
-    def get_table(self, dataset, table, groups=[], target=None, sector="lake"):
+    def get_table(
+        self, dataset, table, groups=[], target=None, sector="lake",
+        max_workers=DEFAULT_MAX_WORKERS, columns=None, filters=None, cache=False,
+        format="pandas", ipc=False, direct=None,
+    ):
         """
         Downloads a table and load them as pandas DataFrame.
+
+        cache - keep the table in the local file cache, see `download_table`.
+        direct - download the table straight from S3, see `download_table`.
+        columns - only read the given columns.
+        filters - only read the rows matching the filters, either as a pyarrow
+            expression or in the `pd.read_parquet` form, e.g.
+            `[("country", "=", "SG")]`.
+        format - "pandas" for a DataFrame, "arrow" for a pyarrow Table read
+            from memory-mapped files, or "dataset" for a lazily-scanned
+            `pyarrow.dataset.Dataset` (columns and filters are then given
+            when scanning it).
+        ipc - also convert the table, once, to an Arrow IPC (Feather) file
+            in the target folder, which is memory-mapped on later loads
+            instead of decoding the parquet parts again.
         """
-        filenames = self.download_table(dataset, table, groups=groups, target=target, sector=sector)
+        filenames = self.download_table(
+            dataset, table, groups=groups, target=target, sector=sector,
+            max_workers=max_workers, cache=cache, direct=direct,
+        )
+        ipc_path = f"{target or dataset}/{table}.arrow" if ipc else None
+        return table_reader.load_table(
+            filenames, format=format, columns=columns, filters=filters, ipc_path=ipc_path,
+        )
 
-        try:
-            import pandas as pd
-            df = pd.concat(
-                pd.read_parquet(filename)
-                for filename in filenames
+    def iter_table(
+        self, dataset, table, groups=[], target=None, sector="lake",
+        max_workers=DEFAULT_MAX_WORKERS, columns=None, filters=None,
+        batch_size=None, as_arrow=False, cache=False, direct=None,
+    ):
+        """
+        Downloads a table and yields it chunk by chunk (at most one parquet
+        row group or `batch_size` rows at a time), so that tables larger
+        than memory can be processed.
+
+        Yields pandas DataFrames, or pyarrow RecordBatches if `as_arrow` is
+        set. `columns` and `filters` are the same as in `get_table`.
+        """
+        filenames = self.download_table(
+            dataset, table, groups=groups, target=target, sector=sector,
+            max_workers=max_workers, cache=cache, direct=direct,
+        )
+        batches = table_reader.iter_batches(
+            filenames, columns=columns, filters=filters, batch_size=batch_size,
+        )
+        for batch in batches:
+            yield batch if as_arrow else batch.to_pandas()
+
+    def _prepare_tables(self, tables, **defaults):
+        """
+        Normalizes `tables` (see `iter_tables`) to dicts, and adds the
+        download tasks of each table, whose presigned URLs are requested
+        concurrently.
+        """
+        specs = []
+        for table in tables:
+            if isinstance(table, dict):
+                spec = dict(defaults, **table)
+            else:
+                dataset, name = table
+                spec = dict(defaults, dataset=dataset, table=name)
+            specs.append(spec)
+
+        results = run_bulk(
+            lambda spec: self._get_presigned_urls(spec["dataset"], spec["table"], spec["groups"]),
+            specs,
+        )
+        failed = [result for result in results if not result.ok]
+        if failed:
+            raise RuntimeError(
+                f"Failed to get the presigned URLs of {len(failed)} tables: "
+                + "; ".join(
+                    f"{result.item['dataset']}.{result.item['table']}: {result.error}"
+                    for result in failed
+                )
             )
-            return df.reset_index(drop=True)
-        # except ImportError:
-        #     raise RuntimeError("Error importing required libraries: pandas")
-        except Exception as e:
-            raise e
 
+        for spec, result in zip(specs, results):
+            target = spec["target"] or spec["dataset"]
+            spec["tasks"] = self._get_table_tasks(spec["table"], result.response, target)
+        return specs
+
+    def download_tables(
+        self, tables, groups=[], target=None, max_workers=DEFAULT_MAX_WORKERS,
+        max_bytes_per_second=None, cache=False,
+    ):
+        """
+        Downloads many tables at once, without loading them, through a
+        single pool of `max_workers` downloads. Returns a dict of
+        `(dataset, table)` to the downloaded files.
+
+        Arguments are the same as in `iter_tables`.
+        """
+        specs = self._prepare_tables(tables, groups=groups, target=target)
+        downloader = self._get_downloader(
+            max_workers=max_workers,
+            cache=cache,
+            max_bytes_per_second=max_bytes_per_second,
+        )
+        downloader.download_many([task for spec in specs for task in spec["tasks"]])
+        return {
+            (spec["dataset"], spec["table"]): [task.path for task in spec["tasks"]]
+            for spec in specs
+        }
+
+    def get_tables(self, tables, **kwargs):
+        """
+        Downloads and loads many tables at once, see `iter_tables`. Returns
+        a dict of `(dataset, table)` to the loaded table.
+        """
+        return dict(self.iter_tables(tables, **kwargs))
+
+    def iter_tables(
+        self, tables, groups=[], target=None, max_workers=DEFAULT_MAX_WORKERS,
+        max_bytes_per_second=None, cache=False, format="pandas", columns=None,
+        filters=None,
+    ):
+        """
+        Downloads many tables at once, and yields `((dataset, table), loaded
+        table)` as soon as each table is downloaded, in completion order.
+
+        tables - a list of `(dataset, table)` tuples, or of dicts with
+            `dataset` and `table` and, optionally, their own `groups`,
+            `target`, `columns` and `filters`.
+        max_workers - number of parts (or ranges of large parts) downloaded
+            concurrently, across all the tables.
+        max_bytes_per_second - optional limit on the combined download rate.
+
+        The presigned URLs of all the tables are requested concurrently, and
+        their parts are all downloaded through a single pool. Breaking out
+        of the loop stops the downloads of the tables not yet yielded. Other
+        arguments are the same as in `get_table`.
+        """
+        specs = self._prepare_tables(
+            tables, groups=groups, target=target, columns=columns, filters=filters,
+        )
+
+        all_tasks = []
+        task_tables = {}
+        remaining = []
+        completed = queue.Queue()
+        for index, spec in enumerate(specs):
+            for task in spec["tasks"]:
+                task_tables[id(task)] = index
+            all_tasks.extend(spec["tasks"])
+            remaining.append(len(spec["tasks"]))
+            if not spec["tasks"]:
+                completed.put(index)
+
+        def on_complete(task):
+            # called from the downloader's scheduling thread only
+            index = task_tables[id(task)]
+            remaining[index] -= 1
+            if remaining[index] == 0:
+                completed.put(index)
+
+        downloader = self._get_downloader(
+            max_workers=max_workers,
+            cache=cache,
+            max_bytes_per_second=max_bytes_per_second,
+            on_complete=on_complete,
+        )
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        download = executor.submit(downloader.download_many, all_tasks, stop=stop)
+        download.add_done_callback(lambda _: completed.put(None))
+        try:
+            while True:
+                index = completed.get()
+                if index is None:
+                    break
+                spec = specs[index]
+                yield (spec["dataset"], spec["table"]), table_reader.load_table(
+                    [task.path for task in spec["tasks"]],
+                    format=format,
+                    columns=spec["columns"],
+                    filters=spec["filters"],
+                )
+
+            # raises for the tables that failed to download
+            download.result()
+        finally:
+            # when the caller stops early (or the generator is garbage
+            # collected), the remaining downloads are dropped instead of
+            # waited for
+            stop.set()
+            executor.shutdown(wait=False)
 
     def load_to_viztool(self, dataset, table, zone=None, groups=[]):
         # assume that the file is already placed in the appropriate s3 file, and
@@ -277,14 +663,90 @@ class DatalakeClientDataset:
 
         return response
 
-    def list_datasets(self, search_filter=""):
+    def list_datasets(self, search_filter="", refresh=False):
         """
-        List all datasets.
+        List all datasets. Listings are cached for a while, pass
+        `refresh=True` to skip the cache.
         """
         endpoint = "dataset/list"
         payload = {
             "filter": search_filter,
         }
-        response = self._request(endpoint, json=payload, method="GET")
+        response = self._cached_request(
+            ("dataset/list", search_filter),
+            endpoint,
+            refresh=refresh,
+            record_type=DatasetRecord,
+            many=True,
+            json=payload,
+            method="GET",
+        )
 
         return response
+
+    def _list_datasets_page(self, search_filter, page_size, cursor=None, fields=None):
+        endpoint = "dataset/list"
+        payload = {
+            "filter": search_filter,
+            "limit": page_size,
+        }
+        if cursor is not None:
+            payload["cursor"] = cursor
+        if fields:
+            payload["fields"] = list(fields)
+
+        response = self._request(endpoint, json=payload, method="GET")
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to list datasets (status {response.status_code}): {response.text}"
+            )
+        body = parse_json(response)
+        if isinstance(body, list):
+            # an API without pagination returns every dataset at once
+            return body, None
+        return body.get("datasets", []), body.get("next_cursor")
+
+    def iter_datasets(
+        self, search_filter="", fields=None, page_size=DEFAULT_PAGE_SIZE, prefetch=True,
+    ):
+        """
+        Lists datasets page by page, yielding them one at a time, so that
+        listings of any size use little memory and the first datasets come
+        without waiting for the rest.
+
+        fields - only return these fields of each dataset, e.g.
+            `["name", "tables"]`.
+        page_size - the number of datasets requested per page.
+        prefetch - request the next page in the background while the
+            current one is being consumed.
+
+        Pages are requested with a cursor, so the listing is consistent
+        even while datasets are added. Stopping the iteration early (e.g.
+        with `break`) requests no further pages. With typed responses (see
+        `c360_client.set_typed_responses`), datasets are `DatasetRecord`s.
+        """
+        typed = self.request_inst._defaults.get("typed_responses", False)
+
+        def fetch(cursor):
+            return self._list_datasets_page(search_filter, page_size, cursor=cursor, fields=fields)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            items, cursor = fetch(None)
+            while True:
+                next_page = None
+                if cursor is not None and executor is not None:
+                    next_page = executor.submit(fetch, cursor)
+
+                for item in items:
+                    if typed and isinstance(item, dict):
+                        item = DatasetRecord.from_dict(item)
+                    yield item
+
+                if cursor is None:
+                    return
+                items, cursor = next_page.result() if next_page is not None else fetch(cursor)
+        finally:
+            if executor is not None:
+                # a prefetched page that is not needed anymore is dropped
+                executor.shutdown(wait=False)
@@ -0,0 +1,217 @@
+import os
+import json
+
+
+FORMATS = ("pandas", "arrow", "dataset")
+IPC_PARTS_KEY = b"c360_parts"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow.dataset as pa_dataset
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(
+            "Error importing required libraries: pyarrow. Install it with"
+            " `pip install c360-python-client[notebook]`."
+        )
+    return pa_dataset, pq
+
+
+def to_filter_expression(filters):
+    """
+    Converts `filters` to a pyarrow expression. Accepts either an expression
+    already, or the DNF list-of-tuples form used by `pd.read_parquet`, e.g.
+    `[("country", "=", "SG"), ("age", ">", 30)]`.
+    """
+    if filters is None:
+        return None
+
+    pa_dataset, pq = _import_pyarrow()
+    if isinstance(filters, pa_dataset.Expression):
+        return filters
+
+    if hasattr(pq, "filters_to_expression"):
+        return pq.filters_to_expression(filters)
+    # pyarrow < 10
+    return pq._filters_to_expression(filters)
+
+
+def _local_filesystem():
+    from pyarrow.fs import LocalFileSystem
+
+    # memory-mapped reads avoid copying the file contents into Arrow buffers
+    return LocalFileSystem(use_mmap=True)
+
+
+def unify_schemas(filenames):
+    """
+    The union of the schemas of the given parquet files, read from their
+    footers only, so that parts written before or after a column was added
+    are read together (with nulls for the columns they lack).
+    """
+    import pyarrow as pa
+    _, pq = _import_pyarrow()
+
+    schemas = []
+    for filename in filenames:
+        schema = pq.read_schema(filename)
+        if not schemas or schema != schemas[-1]:
+            schemas.append(schema)
+    if len(schemas) == 1:
+        return schemas[0]
+    try:
+        # e.g. int64 and double columns are read as double, like pd.concat
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        # pyarrow < 14
+        return pa.unify_schemas(schemas)
+
+
+def open_dataset(filenames, format="parquet"):
+    """
+    Opens the given files as a lazily-scanned, memory-mapped
+    `pyarrow.dataset.Dataset`. The schema of parquet files is the union of
+    their schemas, see `unify_schemas`.
+    """
+    pa_dataset, _ = _import_pyarrow()
+    schema = None
+    if format == "parquet" and len(filenames) > 1:
+        schema = unify_schemas(filenames)
+    return pa_dataset.dataset(
+        [os.path.abspath(filename) for filename in filenames],
+        schema=schema,
+        format=format,
+        filesystem=_local_filesystem(),
+    )
+
+
+def _parts_fingerprint(filenames):
+    # a part downloaded again is a new file (inode), unlike one left as is
+    parts = []
+    for filename in filenames:
+        stat = os.stat(filename)
+        parts.append([os.path.basename(filename), stat.st_size, stat.st_ino])
+    return json.dumps(parts).encode()
+
+
+def _read_ipc_fingerprint(ipc_path):
+    import pyarrow as pa
+
+    try:
+        with pa.memory_map(ipc_path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(IPC_PARTS_KEY)
+
+
+def convert_to_ipc(filenames, ipc_path):
+    """
+    Converts the given parquet files, once, into a single uncompressed Arrow
+    IPC (Feather v2) file at `ipc_path`, which can then be memory-mapped
+    and read without decoding or copying. The file is converted again only
+    when the parquet parts change.
+    """
+    import pyarrow as pa
+
+    fingerprint = _parts_fingerprint(filenames)
+    if os.path.exists(ipc_path) and _read_ipc_fingerprint(ipc_path) == fingerprint:
+        return ipc_path
+
+    dataset = open_dataset(filenames)
+    metadata = dict(dataset.schema.metadata or {})
+    metadata[IPC_PARTS_KEY] = fingerprint
+    schema = dataset.schema.with_metadata(metadata)
+    tmp_path = f"{ipc_path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            # batch by batch, so the table never has to fit in memory
+            for batch in dataset.to_batches():
+                writer.write_batch(batch)
+    os.replace(tmp_path, ipc_path)
+    return ipc_path
+
+
+def iter_batches(filenames, columns=None, filters=None, batch_size=None):
+    """
+    Yields pyarrow RecordBatches over the given parquet files, reading one
+    row group at a time, so memory stays bounded by the batch size.
+    """
+    if not filenames:
+        return
+
+    scan_options = dict(columns=columns, filter=to_filter_expression(filters))
+    if batch_size:
+        scan_options["batch_size"] = batch_size
+
+    dataset = open_dataset(filenames)
+    for batch in dataset.to_batches(**scan_options):
+        if batch.num_rows:
+            yield batch
+
+
+def read_arrow_table(filenames, columns=None, filters=None):
+    dataset = open_dataset(filenames)
+    return dataset.to_table(columns=columns, filter=to_filter_expression(filters))
+
+
+def read_pandas(filenames, columns=None, filters=None):
+    """
+    Reads the given parquet files into a single pandas DataFrame. The parts
+    are gathered into one Arrow table (without copying) and converted to
+    pandas once, releasing Arrow buffers as the columns are converted.
+    """
+    import pandas as pd
+
+    if not filenames:
+        return pd.DataFrame(columns=columns)
+
+    table = read_arrow_table(filenames, columns=columns, filters=filters)
+    return _to_pandas(table)
+
+
+def _to_pandas(table):
+    import pandas as pd
+
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+
+    # the parts may carry their own index, which is meaningless once concatenated
+    df.index = pd.RangeIndex(len(df))
+    return df
+
+
+def load_table(filenames, format="pandas", columns=None, filters=None, ipc_path=None):
+    """
+    Loads the given parquet files as
+
+    - "pandas": a pandas DataFrame,
+    - "arrow": a pyarrow Table, read from memory-mapped files,
+    - "dataset": a lazily-scanned `pyarrow.dataset.Dataset`, on which columns
+        and filters are given when scanning.
+
+    With `ipc_path`, the files are first converted to an Arrow IPC file
+    there (see `convert_to_ipc`), which is what is read from then on.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}")
+    if format == "dataset" and (columns is not None or filters is not None):
+        raise ValueError(
+            "`columns` and `filters` are given when scanning a dataset,"
+            " e.g. `dataset.to_table(columns=..., filter=...)`"
+        )
+    if format == "pandas" and not filenames:
+        return read_pandas(filenames, columns=columns)
+
+    if ipc_path and filenames:
+        dataset = open_dataset([convert_to_ipc(filenames, ipc_path)], format="ipc")
+    else:
+        dataset = open_dataset(filenames)
+
+    if format == "dataset":
+        return dataset
+    table = dataset.to_table(columns=columns, filter=to_filter_expression(filters))
+    if format == "arrow":
+        return table
+    return _to_pandas(table)
@@ -0,0 +1,112 @@
+import os
+import time
+
+from pytest import importorskip
+
+from c360_client.dataset_cls import DatalakeClientDataset
+
+
+def test_register_many(mocker):
+    client = DatalakeClientDataset()
+    user_scope = mocker.patch.object(
+        client.request_inst, "_get_user_scope", return_value="test_user"
+    )
+    mocker.patch.object(client.request_inst, "_defaults", {})
+
+    def fake_request(endpoint, json, method):
+        if json["table_name"] == "bad":
+            raise RuntimeError("boom")
+        return json
+
+    mocker.patch.object(client, "_request", side_effect=fake_request)
+
+    tables = [
+        dict(dataset="test_dataset", table=f"table_{i}", s3_path=f"s3://b/p={i}")
+        for i in range(20)
+    ]
+    tables.insert(5, dict(dataset="test_dataset", table="bad", s3_path="s3://b/bad"))
+    results = client.register_many(tables, max_workers=4)
+
+    assert [result.item for result in results] == tables
+    assert [result.ok for result in results].count(False) == 1
+    assert isinstance(results[5].error, RuntimeError)
+    assert results[6].response["table_name"] == "table_5"
+    assert results[6].response["groups"] == ["users", "test_user"]
+    assert user_scope.call_count == 1
+
+
+def test_get_many(mocker):
+    client = DatalakeClientDataset()
+    mocker.patch.object(client.request_inst, "_get_user_scope", return_value="test_user")
+    mocker.patch.object(client.request_inst, "_defaults", {})
+    client.request_inst.clear_cache()
+    mocker.patch.object(
+        client, "_request", side_effect=lambda endpoint, params, method: params
+    )
+
+    results = client.get_many(["a", "b", "c"])
+    assert [result.response for result in results] == [
+        {"name": name, "groups": "users,test_user"} for name in ["a", "b", "c"]
+    ]
+
+
+def test_get_tables(file_server, tmp_path, mocker):
+    pa = importorskip("pyarrow")
+    pq = importorskip("pyarrow.parquet")
+
+    urls = {}
+    for name in ["a", "b"]:
+        urls[name] = []
+        for i in range(2):
+            filename = f"{name}.{i}.parquet"
+            pq.write_table(pa.table({"id": [i]}), str(file_server.root / filename))
+            urls[name].append(file_server.url_for(filename))
+    urls["empty"] = []
+
+    client = DatalakeClientDataset()
+
+    def fake_request(endpoint, params, method):
+        response = mocker.Mock()
+        response.json.return_value = {"presigned_urls": urls[params["table"]]}
+        return response
+
+    mocker.patch.object(client, "_request", side_effect=fake_request)
+
+    tables = client.get_tables(
+        [("test_dataset", "a"), dict(dataset="test_dataset", table="b", columns=["id"]),
+         ("test_dataset", "empty")],
+        target=str(tmp_path),
+        format="arrow",
+        max_bytes_per_second=10 ** 9,
+    )
+    assert sorted(tables) == [("test_dataset", "a"), ("test_dataset", "b"), ("test_dataset", "empty")]
+    assert tables["test_dataset", "a"].column("id").to_pylist() == [0, 1]
+    assert tables["test_dataset", "empty"].num_rows == 0
+
+
+def test_iter_tables_stops_early(file_server, tmp_path, mocker):
+    importorskip("pyarrow")
+
+    (file_server.root / "large.parquet").write_bytes(os.urandom(400 * 1024))
+    urls = {"empty": [], "large": [file_server.url_for("large.parquet")]}
+
+    client = DatalakeClientDataset()
+
+    def fake_request(endpoint, params, method):
+        response = mocker.Mock()
+        response.json.return_value = {"presigned_urls": urls[params["table"]]}
+        return response
+
+    mocker.patch.object(client, "_request", side_effect=fake_request)
+
+    # the large table takes about 4 seconds at this rate
+    started = time.monotonic()
+    for key, table in client.iter_tables(
+        [("test_dataset", "empty"), ("test_dataset", "large")],
+        target=str(tmp_path),
+        format="arrow",
+        max_bytes_per_second=100 * 1024,
+    ):
+        assert key == ("test_dataset", "empty")
+        break
+    assert time.monotonic() - started < 2
@@ -0,0 +1,121 @@
+import os
+
+from pytest import fixture, importorskip, raises
+
+moto = importorskip("moto")
+boto3 = importorskip("boto3")
+
+from c360_client.dataset_cls import DatalakeClientDataset
+from c360_client.s3_downloader import S3AccessError, S3Downloader, key_from_url
+
+
+@fixture
+def s3(monkeypatch):
+    for name, value in dict(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_DEFAULT_REGION="us-east-1",
+    ).items():
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        yield boto3.client("s3")
+
+
+def _presigned_url(bucket, key):
+    return f"https://{bucket}.s3.amazonaws.com/{key}?X-Amz-Signature=test"
+
+
+def test_key_from_url():
+    assert key_from_url(_presigned_url("b", "a/part%3D0"), "b") == "a/part=0"
+    path_style = "https://s3.eu-west-1.amazonaws.com/b/a/part-0?X-Amz-Signature=test"
+    assert key_from_url(path_style, "b") == "a/part-0"
+    assert key_from_url(_presigned_url("other", "a/part-0"), "b") is None
+
+
+def test_download_table_from_s3(s3, mocker, tmp_path):
+    client = DatalakeClientDataset(defaults={})
+    bucket = client.get_bucket_name("lake")
+    s3.create_bucket(Bucket=bucket)
+    large = os.urandom(3 * 1024 * 1024 + 7)
+    # an older version of the table sits under the same prefix
+    s3.put_object(Bucket=bucket, Key="sales/orders/v1/part-0.parquet", Body=b"old")
+    s3.put_object(Bucket=bucket, Key="sales/orders/v2/part-0.parquet", Body=b"small")
+    s3.put_object(Bucket=bucket, Key="sales/orders/v2/part-1.parquet", Body=large)
+    mocker.patch.object(client, "_get_presigned_urls", return_value=[
+        _presigned_url(bucket, "sales/orders/v2/part-0.parquet"),
+        _presigned_url(bucket, "sales/orders/v2/part-1.parquet"),
+    ])
+    fallback = mocker.patch.object(client, "_get_downloader")
+
+    target = str(tmp_path / "sales")
+    client._defaults["direct_s3"] = dict(
+        enabled=True, multipart_chunksize=1024 * 1024, multipart_threshold=1024 * 1024,
+    )
+    filenames = client.download_table("sales", "orders", target=target)
+
+    assert filenames == [f"{target}/orders.0.parquet", f"{target}/orders.1.parquet"]
+    assert open(filenames[0], "rb").read() == b"small"
+    assert open(filenames[1], "rb").read() == large
+    fallback.assert_not_called()
+
+    # files already downloaded are not fetched again
+    download = mocker.patch("s3transfer.manager.TransferManager.download")
+    assert client.download_table("sales", "orders", target=target) == filenames
+    download.assert_not_called()
+
+
+def test_download_table_falls_back_to_presigned_urls(s3, mocker, tmp_path):
+    client = DatalakeClientDataset(defaults={})
+    bucket = client.get_bucket_name("lake")
+    url = _presigned_url(bucket, "sales/orders/part-0.parquet")
+    mocker.patch.object(client, "_get_presigned_urls", return_value=[url])
+    downloader = mocker.patch.object(client, "_get_downloader").return_value
+    downloader.download_many.return_value = ["orders.0.parquet"]
+
+    # the bucket does not exist
+    assert client.download_table(
+        "sales", "orders", target=str(tmp_path), direct=True,
+    ) == ["orders.0.parquet"]
+
+    # the object is not where the API says it is
+    s3.create_bucket(Bucket=bucket)
+    s3.put_object(Bucket=bucket, Key="sales/orders/part-1.parquet", Body=b"other")
+    assert client.download_table(
+        "sales", "orders", target=str(tmp_path), direct=True,
+    ) == ["orders.0.parquet"]
+
+    [task], = downloader.download_many.call_args.args
+    assert task.url == url
+
+
+def test_s3_downloader_cache(s3, tmp_path):
+    from c360_client.filecache import FileCache
+
+    s3.create_bucket(Bucket="bucket")
+    s3.put_object(Bucket="bucket", Key="a/part-0", Body=b"content")
+    downloader = S3Downloader(client=s3, cache=FileCache(root=str(tmp_path / "cache")))
+    objects = downloader.list_objects("bucket", "a/")
+
+    downloader.download_many("bucket", objects, [str(tmp_path / "first")])
+    s3.delete_object(Bucket="bucket", Key="a/part-0")
+    downloader.download_many("bucket", objects, [str(tmp_path / "second")])
+
+    assert open(tmp_path / "second", "rb").read() == b"content"
+
+
+def test_get_objects_in_different_folders(s3, mocker):
+    s3.create_bucket(Bucket="bucket")
+    for key in ["a/x", "a/deeper/z", "b/y", "top", "unrelated/w"]:
+        s3.put_object(Bucket="bucket", Key=key, Body=key.encode())
+    downloader = S3Downloader(client=s3)
+    list_objects = mocker.spy(downloader, "list_objects")
+
+    objects = downloader.get_objects("bucket", ["b/y", "top", "a/x"])
+
+    assert [obj["key"] for obj in objects] == ["b/y", "top", "a/x"]
+    assert [obj["size"] for obj in objects] == [3, 3, 3]
+    # only the folders of the keys are listed, never the whole bucket
+    assert sorted(call.args[1] for call in list_objects.call_args_list) == ["a/", "b/"]
+
+    with raises(S3AccessError):
+        downloader.get_objects("bucket", ["a/x", "missing"])
@@ -0,0 +1,68 @@
+import json
+
+import requests
+
+from c360_client.dataset_cls import DatalakeClientDataset
+from c360_client.responses import DatasetRecord
+
+
+PAGES = {
+    None: ([{"name": "a"}, {"name": "b"}], "c1"),
+    "c1": ([{"name": "c"}, {"name": "d"}], "c2"),
+    "c2": ([{"name": "e"}], None),
+}
+
+
+def make_response(payload):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def paginated_request(requested):
+    def request(endpoint, json, method):
+        requested.append(dict(json))
+        datasets, next_cursor = PAGES[json.get("cursor")]
+        return make_response({"datasets": datasets, "next_cursor": next_cursor})
+    return request
+
+
+def test_iter_datasets(mocker):
+    client = DatalakeClientDataset()
+    mocker.patch.object(client.request_inst, "_defaults", {})
+    requested = []
+    mocker.patch.object(client, "_request", side_effect=paginated_request(requested))
+
+    names = [dataset["name"] for dataset in client.iter_datasets(
+        "sales", fields=["name"], page_size=2,
+    )]
+
+    assert names == ["a", "b", "c", "d", "e"]
+    assert [payload.get("cursor") for payload in requested] == [None, "c1", "c2"]
+    assert requested[0] == {"filter": "sales", "limit": 2, "fields": ["name"]}
+
+
+def test_iter_datasets_stops_early(mocker):
+    client = DatalakeClientDataset()
+    mocker.patch.object(client.request_inst, "_defaults", {"typed_responses": True})
+    requested = []
+    mocker.patch.object(client, "_request", side_effect=paginated_request(requested))
+
+    for dataset in client.iter_datasets(page_size=2):
+        assert isinstance(dataset, DatasetRecord)
+        break
+
+    # at most the next page was prefetched
+    assert "c2" not in [payload.get("cursor") for payload in requested]
+
+
+def test_iter_datasets_without_pagination(mocker):
+    client = DatalakeClientDataset()
+    mocker.patch.object(client.request_inst, "_defaults", {})
+    request = mocker.patch.object(
+        client, "_request", return_value=make_response([{"name": "a"}, {"name": "b"}]),
+    )
+
+    assert list(client.iter_datasets(prefetch=False)) == [{"name": "a"}, {"name": "b"}]
+    assert request.call_count == 1
@@ -0,0 +1,91 @@
+import os
+
+from pytest import fixture, importorskip
+
+from c360_client.dataset_cls import table_reader
+
+pa = importorskip("pyarrow")
+pq = importorskip("pyarrow.parquet")
+
+
+@fixture
+def filenames(tmp_path):
+    filenames = []
+    for i in range(3):
+        table = pa.table({
+            "id": list(range(i * 10, i * 10 + 10)),
+            "country": ["SG", "ID"] * 5,
+            "value": [float(x) for x in range(10)],
+        })
+        filename = str(tmp_path / f"test_table.{i}.parquet")
+        pq.write_table(table, filename, row_group_size=5)
+        filenames.append(filename)
+    return filenames
+
+
+def test_read_pandas(filenames):
+    df = table_reader.read_pandas(filenames)
+    assert len(df) == 30
+    assert list(df.index) == list(range(30))
+    assert list(df["id"]) == list(range(30))
+
+
+def test_read_pandas_with_projection_and_filters(filenames):
+    df = table_reader.read_pandas(
+        filenames, columns=["id"], filters=[("country", "=", "SG")]
+    )
+    assert list(df.columns) == ["id"]
+    assert list(df["id"]) == list(range(0, 30, 2))
+
+
+def test_iter_batches_per_row_group(filenames):
+    batches = list(table_reader.iter_batches(filenames, columns=["id", "value"]))
+    assert [batch.num_rows for batch in batches] == [5] * 6
+    assert batches[0].schema.names == ["id", "value"]
+
+
+def test_read_no_parts():
+    assert len(table_reader.read_pandas([])) == 0
+    assert list(table_reader.iter_batches([])) == []
+
+
+def test_load_arrow_and_dataset(filenames):
+    table = table_reader.load_table(filenames, format="arrow", columns=["id"])
+    assert isinstance(table, pa.Table)
+    assert table.column("id").to_pylist() == list(range(30))
+
+    dataset = table_reader.load_table(filenames, format="dataset")
+    assert dataset.count_rows() == 30
+
+
+def test_load_through_ipc(filenames, tmp_path):
+    ipc_path = str(tmp_path / "test_table.arrow")
+    df = table_reader.load_table(
+        filenames, ipc_path=ipc_path, filters=[("country", "=", "ID")],
+    )
+    assert list(df["id"]) == list(range(1, 30, 2))
+
+    # unchanged parts are not converted again
+    mtime = os.stat(ipc_path).st_mtime_ns
+    table_reader.load_table(filenames, format="arrow", ipc_path=ipc_path)
+    assert os.stat(ipc_path).st_mtime_ns == mtime
+
+    # a part downloaded again (a new file) is converted again
+    pq.write_table(pa.table({"id": [0], "country": ["SG"], "value": [0.0]}), filenames[0] + ".new")
+    os.replace(filenames[0] + ".new", filenames[0])
+    table = table_reader.load_table(filenames, format="arrow", ipc_path=ipc_path)
+    assert table.num_rows == 21
+
+
+def test_read_parts_with_evolved_schemas(tmp_path):
+    filenames = [str(tmp_path / f"evolved.{i}.parquet") for i in range(3)]
+    pq.write_table(pa.table({"id": [1, 2], "value": [1, 2]}), filenames[0])
+    # a column added, and another one turned to float
+    pq.write_table(pa.table({"id": [3], "value": [3.5], "country": ["SG"]}), filenames[1])
+    pq.write_table(pa.table({"id": [4], "value": [4]}), filenames[2])
+
+    df = table_reader.read_pandas(filenames)
+
+    assert list(df.columns) == ["id", "value", "country"]
+    assert list(df["value"]) == [1.0, 2.0, 3.5, 4.0]
+    assert list(df["country"].fillna("")) == ["", "", "SG", ""]
@@ -0,0 +1,598 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from c360_client import instrumentation
+from c360_client.request_cls.transport import DEFAULT_TIMEOUT
+from c360_client.filecache import strip_query, is_md5_etag
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024     # parts larger than this are fetched in ranges
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+class DownloadTask:
+    """
+    A single URL to be downloaded to `path`. `size` and `md5` are optional
+    expected values that the downloaded file is verified against.
+    """
+    def __init__(self, url, path, size=None, md5=None):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.md5 = md5
+
+        # filled in when the task is prepared
+        self.total = None
+        self.etag = None
+        self.last_modified = None
+        self.chunks = []
+        self.done_chunks = set()
+        self.skipped = False
+        self.cached = False
+        self.error = None
+
+        # for instrumentation
+        self.timer = None
+        self.downloaded_bytes = 0
+        self.retries = 0
+
+    @property
+    def part_path(self):
+        return f"{self.path}.part"
+
+    @property
+    def state_path(self):
+        return f"{self.path}.part.json"
+
+
+class RateLimiter:
+    """
+    A token bucket shared by all the threads of a download, limiting their
+    combined throughput to `rate` bytes per second (with bursts of up to a
+    second's worth).
+    """
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= nbytes
+            # in debt: wait (holding the lock, so others queue up behind)
+            # until the bucket is back to zero
+            if self._tokens < 0:
+                time.sleep(-self._tokens / self.rate)
+
+
+def file_md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_etag(response):
+    etag = response.headers.get("ETag")
+    if etag:
+        return etag.strip().strip('"')
+    return None
+
+
+def _parse_content_range(response):
+    """
+    Returns `(start, end, total)` from a `Content-Range: bytes a-b/n`
+    header, with None for the parts that are not given.
+    """
+    content_range = response.headers.get("Content-Range", "")
+    if not content_range.startswith("bytes ") or "/" not in content_range:
+        return None, None, None
+    span, total = content_range[len("bytes "):].split("/", 1)
+    total = int(total) if total.isdigit() else None
+    if "-" not in span:
+        return None, None, total
+    start, end = span.split("-", 1)
+    return int(start), int(end), total
+
+
+def version_path(path):
+    # hidden, so that it is left out when reading a folder of parts
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f".{filename}.version.json")
+
+
+def read_version(path):
+    """
+    Returns the `etag`, `last_modified` and `size` of the remote file that
+    the file at `path` was downloaded from, or None if unknown.
+    """
+    try:
+        with open(version_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_version(path, etag, last_modified, size):
+    if not etag and not last_modified:
+        return
+    tmp_path = f"{version_path(path)}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(etag=etag, last_modified=last_modified, size=size), f)
+    os.replace(tmp_path, version_path(path))
+
+
+def is_same_version(version, etag, last_modified):
+    """
+    Whether a file downloaded from the remote `version` (see
+    `read_version`) is still current. Without an ETag nor a modification
+    date to compare, only the size can tell.
+    """
+    if not etag and not last_modified:
+        return True
+    if version is None:
+        return False
+    if etag:
+        return version.get("etag") == etag
+    return version.get("last_modified") == last_modified
+
+
+class ParallelDownloader:
+    """
+    Downloads many URLs concurrently over a bounded worker pool.
+
+    Files larger than `chunk_size` are split into HTTP Range requests that
+    are fetched in parallel into a `<path>.part` file. Completed ranges are
+    recorded in `<path>.part.json`, so an interrupted download resumes where
+    it left off. A file is only moved to its final path once its size and
+    checksum (the given `md5`, if any) have been verified.
+
+    The ETag and modification date of each downloaded file are kept next to
+    it (in a hidden `.<name>.version.json`), and compared to the remote
+    file's before a file already present is kept or a partial download is
+    resumed, so that a file replaced with one of the same size is not
+    taken for the old one.
+
+    With a `FileCache`, downloaded files are also kept in the cache by URL
+    path and ETag, and placed from there whenever the remote file has not
+    changed.
+    """
+    def __init__(
+        self,
+        session=None,
+        max_workers=DEFAULT_MAX_WORKERS,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        timeout=DEFAULT_TIMEOUT,
+        skip_existing=True,
+        progress=None,
+        cache=None,
+        max_bytes_per_second=None,
+        on_complete=None,
+        verify_etag=False,
+    ):
+        """
+        cache - optional `FileCache` of downloaded files.
+        progress - optional callable, called with `(downloaded_bytes,
+            total_bytes)` every time a range or file completes.
+        max_bytes_per_second - optional limit on the combined download rate
+            of all workers.
+        on_complete - optional callable, called with each `DownloadTask` as
+            soon as its file is in place.
+        verify_etag - also verify files without an `md5` against their ETag
+            when it looks like one. Only for objects known to be stored
+            without SSE-KMS or SSE-C encryption, whose ETags are not the MD5
+            of their content.
+        """
+        self.session = session or requests.Session()
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.skip_existing = skip_existing
+        self.progress = progress
+        self.cache = cache
+        self.limiter = RateLimiter(max_bytes_per_second) if max_bytes_per_second else None
+        self.on_complete = on_complete
+        self.verify_etag = verify_etag
+
+    def download(self, url, path, size=None, md5=None):
+        return self.download_many([DownloadTask(url, path, size=size, md5=md5)])[0]
+
+    def download_many(self, tasks, stop=None):
+        """
+        Downloads all the given tasks, which can either be `DownloadTask`s or
+        `(url, path)` tuples. Returns the list of downloaded paths, in the
+        same order as the given tasks.
+
+        stop - optional `threading.Event`. Once it is set, no more requests
+            are started and `DownloadError` is raised as soon as those in
+            flight are done; partial downloads are resumed on the next call.
+        """
+        tasks = [
+            task if isinstance(task, DownloadTask) else DownloadTask(*task)
+            for task in tasks
+        ]
+        self._downloaded_bytes = 0
+        self._total_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {
+                pool.submit(self._prepare, task): (task, "prepare")
+                for task in tasks
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, stage = pending.pop(future)
+                    if task.error is not None:
+                        # another range of this file already failed
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        task.error = e
+                        self._emit(task)
+                        continue
+
+                    if stage == "finalize" or task.skipped:
+                        self._complete(task)
+                        continue
+
+                    if stage == "prepare":
+                        self._total_bytes += task.total or 0
+                        if result:
+                            # the probe's body was one of the chunks
+                            task.downloaded_bytes += result
+                            self._report(result)
+                        for index in self._remaining_chunks(task):
+                            job = pool.submit(self._fetch_chunk, task, index)
+                            pending[job] = (task, index)
+                    else:
+                        task.done_chunks.add(stage)
+                        task.downloaded_bytes += result
+                        self._save_state(task)
+                        self._report(result)
+
+                    if self._is_ready(task):
+                        pending[pool.submit(self._finalize, task)] = (task, "finalize")
+
+                if stop is not None and stop.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise DownloadError("Download stopped")
+
+        failed = [task for task in tasks if task.error is not None]
+        if failed:
+            raise DownloadError(
+                f"Failed to download {len(failed)} of {len(tasks)} files: "
+                + "; ".join(f"{task.path}: {task.error}" for task in failed)
+            )
+
+        return [task.path for task in tasks]
+
+    def _complete(self, task):
+        self._emit(task)
+        if self.on_complete:
+            self.on_complete(task)
+
+    def _emit(self, task):
+        if not instrumentation.has_hooks() or task.timer is None:
+            return
+        instrumentation.emit(instrumentation.RequestEvent(
+            kind="download",
+            method="GET",
+            url=strip_query(task.url),
+            status_code=None if task.error else 200,
+            bytes_received=task.downloaded_bytes,
+            retries=task.retries,
+            started_at=task.timer.started_at,
+            duration=task.timer.elapsed,
+            error=task.error,
+            attributes=dict(
+                path=task.path,
+                size=task.total,
+                chunks=len(task.chunks),
+                skipped=task.skipped,
+                cached=task.cached,
+            ),
+        ))
+
+    def _report(self, nbytes):
+        self._downloaded_bytes += nbytes
+        if self.progress:
+            self.progress(self._downloaded_bytes, self._total_bytes)
+
+    def _remaining_chunks(self, task):
+        if task.skipped:
+            return []
+        return [i for i in range(len(task.chunks)) if i not in task.done_chunks]
+
+    def _is_ready(self, task):
+        return not task.skipped and len(task.done_chunks) == len(task.chunks)
+
+    def _probe(self, task, headers):
+        """
+        Starts the first request of a download, whose headers tell the size,
+        ETag and modification date of the remote file, and whether the
+        server supports Range requests. Returns the streamed response, whose
+        body can then be written as one of the chunks (presigned URLs are
+        only valid for GET, so a HEAD could not tell as much).
+        """
+        response = self.session.get(task.url, headers=headers, stream=True, timeout=self.timeout)
+        if response.status_code not in (200, 206, 304, 416):
+            response.close()
+            raise DownloadError(f"Unexpected status {response.status_code} probing {task.path}")
+        return response
+
+    def _parse_probe(self, task, response):
+        """
+        Fills in the size, ETag and modification date of the remote file,
+        and returns whether the server supports Range requests.
+        """
+        _, _, total = _parse_content_range(response)
+        if response.status_code in (206, 416) and total is not None:
+            # 416 is returned by S3 for ranges over empty objects
+            task.total = total
+            accept_ranges = True
+        elif response.status_code == 200:
+            length = response.headers.get("Content-Length")
+            task.total = int(length) if length is not None else None
+            accept_ranges = False
+        else:
+            raise DownloadError(f"Unexpected status {response.status_code} probing {task.path}")
+        task.etag = _parse_etag(response)
+        task.last_modified = response.headers.get("Last-Modified")
+        return accept_ranges
+
+    def _probe_range(self, task):
+        # the first range left to download, as far as a previous run knows
+        state = self._read_state(task)
+        if state and os.path.exists(task.part_path):
+            done = set(state.get("done", []))
+            for index, chunk in enumerate(state.get("chunks", [])):
+                if index not in done and chunk[1] is not None:
+                    return tuple(chunk)
+        return 0, self.chunk_size - 1
+
+    def _is_present(self, task):
+        if not os.path.exists(task.path):
+            return False
+        expected_size = task.size if task.size is not None else task.total
+        if expected_size is not None and os.path.getsize(task.path) != expected_size:
+            return False
+        if not is_same_version(read_version(task.path), task.etag, task.last_modified):
+            return False
+        if task.md5 and file_md5(task.path) != task.md5:
+            return False
+        return True
+
+    def _is_unchanged(self, task):
+        """
+        Whether the file present at the path is still the remote file it was
+        downloaded from, after the server answered `304 Not Modified`.
+        """
+        version = read_version(task.path)
+        task.etag = version["etag"]
+        task.last_modified = version.get("last_modified")
+        task.total = version.get("size")
+        if self.verify_etag and not task.md5 and is_md5_etag(task.etag):
+            task.md5 = task.etag
+        return self._is_present(task)
+
+    def _prepare(self, task):
+        """
+        Probes the remote file and skips it, restores it from the cache, or
+        plans its chunks. The body of the probe is written as one of the
+        chunks when it is one; returns the number of bytes written.
+        """
+        task.timer = instrumentation.Timer()
+        os.makedirs(os.path.dirname(os.path.abspath(task.path)), exist_ok=True)
+
+        start, end = self._probe_range(task)
+        headers = {"Range": f"bytes={start}-{end}"}
+        version = read_version(task.path) if self.skip_existing else None
+        if version and version.get("etag") and os.path.exists(task.path):
+            # the server answers without a body if the file has not changed
+            headers["If-None-Match"] = f'"{version["etag"]}"'
+
+        response = self._probe(task, headers)
+        if response.status_code == 304:
+            response.close()
+            if self._is_unchanged(task):
+                task.skipped = True
+                return 0
+            del headers["If-None-Match"]
+            response = self._probe(task, headers)
+
+        with response:
+            return self._prepare_from_probe(task, response)
+
+    def _prepare_from_probe(self, task, response):
+        accept_ranges = self._parse_probe(task, response)
+        if self.verify_etag and not task.md5 and is_md5_etag(task.etag):
+            task.md5 = task.etag
+
+        if self.skip_existing and self._is_present(task):
+            task.skipped = True
+            return 0
+        if self.cache is not None and task.etag:
+            if self.cache.restore(strip_query(task.url), task.etag, task.path, size=task.total):
+                write_version(task.path, task.etag, task.last_modified, task.total)
+                task.skipped = task.cached = True
+                return 0
+
+        if accept_ranges and task.total is not None:
+            task.chunks = [
+                (start, min(start + self.chunk_size, task.total) - 1)
+                for start in range(0, task.total, self.chunk_size)
+            ]
+        else:
+            task.chunks = [(0, None)]
+
+        state = self._load_state(task)
+        if state and os.path.exists(task.part_path):
+            task.done_chunks = set(state["done"])
+        else:
+            with open(task.part_path, "wb") as f:
+                if task.total:
+                    f.truncate(task.total)
+            task.done_chunks = set()
+            self._save_state(task)
+
+        index = self._probed_chunk(task, response)
+        if index is None:
+            return 0
+        start, end = task.chunks[index]
+        expected = end - start + 1 if end is not None else task.total
+        try:
+            written = self._write_response(task, response, start, end, expected)
+        except (requests.RequestException, DownloadError, OSError):
+            # fetched again, with retries, like the other chunks
+            return 0
+        task.done_chunks.add(index)
+        self._save_state(task)
+        return written
+
+    def _probed_chunk(self, task, response):
+        """
+        The index of the chunk left to download that the probe's body is,
+        if any.
+        """
+        if response.status_code == 206:
+            start, end, _ = _parse_content_range(response)
+            chunk = (start, end)
+        elif response.status_code == 200:
+            chunk = (0, None)
+        else:
+            return None
+        for index, candidate in enumerate(task.chunks):
+            if candidate == chunk and index not in task.done_chunks:
+                return index
+        return None
+
+    def _state_key(self, task):
+        return dict(
+            etag=task.etag, last_modified=task.last_modified, total=task.total,
+            chunks=task.chunks,
+        )
+
+    def _read_state(self, task):
+        try:
+            with open(task.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_state(self, task):
+        state = self._read_state(task)
+        if state is None:
+            return None
+
+        chunks = [tuple(chunk) for chunk in state.get("chunks", [])]
+        if (
+            (state.get("etag"), state.get("last_modified"), state.get("total"), chunks)
+            != (task.etag, task.last_modified, task.total, task.chunks)
+        ):
+            # the remote file has changed since, start over
+            return None
+        return state
+
+    def _save_state(self, task):
+        state = self._state_key(task)
+        state["done"] = sorted(task.done_chunks)
+        tmp_path = f"{task.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, task.state_path)
+
+    def _fetch_chunk(self, task, index):
+        start, end = task.chunks[index]
+        headers = {}
+        if end is not None:
+            headers["Range"] = f"bytes={start}-{end}"
+            expected = end - start + 1
+        else:
+            expected = task.total
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._fetch_range(task, start, end, headers, expected)
+            except (requests.RequestException, DownloadError, OSError):
+                if attempt == self.max_attempts:
+                    raise
+                task.retries += 1
+                time.sleep(self.backoff_factor * 2 ** (attempt - 1))
+
+    def _fetch_range(self, task, start, end, headers, expected):
+        with self.session.get(
+            task.url, headers=headers, stream=True, timeout=self.timeout,
+        ) as response:
+            return self._write_response(task, response, start, end, expected)
+
+    def _write_response(self, task, response, start, end, expected):
+        if end is not None and response.status_code != 206:
+            raise DownloadError(
+                f"Expected a partial response for {task.path}, got {response.status_code}"
+            )
+        elif response.status_code not in (200, 206):
+            raise DownloadError(
+                f"Unexpected status {response.status_code} downloading {task.path}"
+            )
+
+        written = 0
+        with open(task.part_path, "r+b" if end is not None else "wb") as f:
+            f.seek(start)
+            for block in response.raw.stream(STREAM_BLOCK_SIZE, decode_content=False):
+                if self.limiter:
+                    self.limiter.consume(len(block))
+                f.write(block)
+                written += len(block)
+
+        if expected is not None and written != expected:
+            raise DownloadError(
+                f"Incomplete download for {task.path}: got {written} of {expected} bytes"
+            )
+        return written
+
+    def _finalize(self, task):
+        size = os.path.getsize(task.part_path)
+        expected_size = task.size if task.size is not None else task.total
+
+        error = None
+        if expected_size is not None and size != expected_size:
+            error = f"size mismatch (expected {expected_size}, got {size})"
+        elif task.md5 and file_md5(task.part_path) != task.md5:
+            error = "checksum mismatch"
+
+        if error:
+            # the partial data cannot be trusted, so do not resume from it
+            os.remove(task.part_path)
+            os.remove(task.state_path)
+            raise DownloadError(f"Verification failed for {task.path}: {error}")
+
+        os.replace(task.part_path, task.path)
+        os.remove(task.state_path)
+        write_version(task.path, task.etag, task.last_modified, size)
+
+        if self.cache is not None:
+            self.cache.put(strip_query(task.url), task.etag, task.path)
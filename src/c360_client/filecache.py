@@ -0,0 +1,216 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, where the cache is only safe within a process
+    fcntl = None
+
+
+DEFAULT_CACHE_ROOT = os.path.join("~", ".cache", "c360")
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3    # per namespace
+LOCK_FILENAME = ".lock"
+TMP_PREFIX = ".c360-"
+
+
+def get_cache_root():
+    return os.path.expanduser(os.getenv("C360_FILE_CACHE_DIR", DEFAULT_CACHE_ROOT))
+
+
+def get_cache_max_bytes():
+    return int(os.getenv("C360_FILE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def strip_query(url):
+    # presigned URLs change on every call, the object they point to does not
+    return url.split("?")[0]
+
+
+def is_md5_etag(etag):
+    """
+    Whether `etag` looks like an MD5. S3 ETags are the MD5 of the object,
+    unless it was uploaded in parts (then they look like `<md5>-<number of
+    parts>`) or encrypted with SSE-KMS or SSE-C, whose ETags look the same
+    but are not: only rely on it for objects known not to be encrypted.
+    """
+    if not etag or len(etag) != 32:
+        return False
+    try:
+        int(etag, 16)
+    except ValueError:
+        return False
+    return True
+
+
+class FileCache:
+    """
+    A content-addressed cache of downloaded files on local disk.
+
+    Entries are keyed by the remote object's path (without the presigned
+    query string) and its ETag, so a changed object is a new entry and
+    unchanged objects are never downloaded twice. Files are copied in and
+    out of the cache atomically, so editing a restored file in place does
+    not change the cached one.
+
+    The cache directory can be shared by several processes: reads and
+    writes hold a shared lock on it, and evictions an exclusive one. Once
+    the cache grows over `max_bytes`, the least recently used files are
+    evicted. The size of the cache is only scanned again when the files
+    added since the last scan may have taken it over the limit.
+    """
+    def __init__(self, root=None, namespace="files", max_bytes=None):
+        self.root = os.path.join(root or get_cache_root(), namespace)
+        self.max_bytes = get_cache_max_bytes() if max_bytes is None else max_bytes
+        self._size = None    # as of the last scan, plus the files added since
+        self._size_lock = threading.Lock()
+
+    def key_path(self, key, etag):
+        digest = hashlib.sha256(f"{key}\n{etag}".encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, key, etag, size=None, touch=False):
+        """
+        Returns the path of the cached file, or None if there is none (with
+        the expected `size`, if given). `touch` marks it as recently used.
+        """
+        if not etag:
+            return None
+        path = self.key_path(key, etag)
+        if not os.path.exists(path):
+            return None
+        if size is not None and os.path.getsize(path) != size:
+            return None
+        if touch:
+            # recently used files are evicted last
+            os.utime(path)
+        return path
+
+    def remove(self, key, etag):
+        with self._locked():
+            try:
+                os.remove(self.key_path(key, etag))
+            except FileNotFoundError:
+                pass
+
+    def put(self, key, etag, path):
+        """
+        Adds the file at `path` to the cache, and returns the cached path.
+        """
+        if not etag:
+            return None
+        cached = self.key_path(key, etag)
+        added = 0
+        with self._locked(shared=True):
+            if not os.path.exists(cached):
+                _place(path, cached)
+                added = os.path.getsize(cached)
+
+        if self.max_bytes is not None:
+            with self._size_lock:
+                if self._size is None:
+                    self._size = self.size()
+                else:
+                    self._size += added
+                over_limit = self._size > self.max_bytes
+            if over_limit:
+                self.evict()
+        return cached
+
+    def restore(self, key, etag, target, size=None):
+        """
+        Places the cached file at `target`. Returns False if it is not cached.
+        """
+        with self._locked(shared=True):
+            cached = self.get(key, etag, size=size, touch=True)
+            if cached is None:
+                return False
+            _place(cached, target)
+        return True
+
+    def entries(self):
+        """
+        Returns `(path, size, last_used)` for every cached file.
+        """
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for directory in os.scandir(self.root):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.startswith(TMP_PREFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """
+        Removes the least recently used files until the cache fits in
+        `max_bytes` (by default, the cache's own limit). Returns the number
+        of files removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return 0
+
+        with self._locked():
+            entries = sorted(self.entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for path, size, _ in entries:
+                if total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        with self._size_lock:
+            self._size = total
+        return removed
+
+    def clear(self):
+        return self.evict(max_bytes=0)
+
+    @contextmanager
+    def _locked(self, shared=False):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LOCK_FILENAME), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _place(source, target):
+    """
+    Atomically copies `source` to `target`. Copies rather than hard links,
+    which would make later writes to either file change both.
+    """
+    directory = os.path.dirname(os.path.abspath(target))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TMP_PREFIX)
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
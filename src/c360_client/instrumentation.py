@@ -0,0 +1,326 @@
+import time
+import logging
+import threading
+
+
+logger = logging.getLogger("c360_client")
+
+DEFAULT_DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300,
+)
+
+_hooks = []
+_hooks_lock = threading.Lock()
+_local = threading.local()
+
+
+class RequestEvent:
+    """
+    What happened during one HTTP request, or one file download/upload.
+
+    kind - "api" for API calls, "http" for other requests over the pooled
+        session (e.g. to presigned URLs), "download" and "upload" for
+        whole files.
+    endpoint - the API route, with placeholders for its variable parts
+        (e.g. `models/{name}`), used as a low-cardinality label. The
+        concrete path is in `url`.
+    started_at - the wall-clock time the request started at.
+    duration - the total time, in seconds, including reading the body
+        (except for streamed responses, read by the caller).
+    connect_time - the time spent opening connections (DNS, TCP and TLS,
+        together), 0 when a kept-alive connection was reused.
+    ttfb - the time until the response headers were received.
+    retries - the number of attempts made after the first one.
+    attributes - extra details, e.g. the path of a downloaded file.
+    """
+    __slots__ = (
+        "kind", "method", "endpoint", "url", "status_code", "bytes_sent",
+        "bytes_received", "retries", "started_at", "duration", "connect_time",
+        "ttfb", "error", "attributes",
+    )
+
+    def __init__(
+        self, kind, method=None, endpoint=None, url=None, status_code=None,
+        bytes_sent=0, bytes_received=0, retries=0, started_at=None, duration=None,
+        connect_time=None, ttfb=None, error=None, attributes=None,
+    ):
+        self.kind = kind
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.status_code = status_code
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+        self.started_at = started_at
+        self.duration = duration
+        self.connect_time = connect_time
+        self.ttfb = ttfb
+        self.error = error
+        self.attributes = attributes or {}
+
+    def __repr__(self):
+        return (
+            f"<RequestEvent {self.kind} {self.method} {self.endpoint or self.url}"
+            f" status={self.status_code} duration={self.duration}>"
+        )
+
+    @property
+    def ok(self):
+        return self.error is None and (self.status_code is None or self.status_code < 400)
+
+
+def add_hook(hook):
+    """
+    Registers `hook`, a callable called with every `RequestEvent` of the
+    process. Hooks are called in the thread that made the request, and
+    exceptions they raise are logged, not propagated.
+    """
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def clear_hooks():
+    with _hooks_lock:
+        del _hooks[:]
+
+
+def has_hooks():
+    # checked before measuring anything, so there is no cost without hooks
+    return bool(_hooks)
+
+
+def emit(event):
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("Instrumentation hook %r failed", hook)
+
+
+def record_connect(duration):
+    _local.connect_time = getattr(_local, "connect_time", 0.0) + duration
+
+
+def pop_connect_time():
+    """
+    Returns the time this thread spent opening connections since the last
+    call.
+    """
+    connect_time = getattr(_local, "connect_time", 0.0)
+    _local.connect_time = 0.0
+    return connect_time
+
+
+def body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return len(body)
+    except TypeError:
+        # generators and other unsized bodies
+        return None
+
+
+def response_retries(response):
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+class Timer:
+    """
+    Measures one event, for code that is not a single request.
+    """
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+
+#########
+#  Adapters
+#########
+
+
+class LoggingHook:
+    """
+    Logs one line per event, at `level` (errors at WARNING).
+    """
+    def __init__(self, logger=logger, level=logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def __call__(self, event):
+        level = self.level if event.ok else max(self.level, logging.WARNING)
+        if not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(
+            level,
+            "%s %s %s -> %s in %.3fs (connect %.3fs, ttfb %.3fs),"
+            " %s bytes sent, %s bytes received, %d retries",
+            event.kind,
+            event.method,
+            event.endpoint or event.url,
+            event.error or event.status_code,
+            event.duration or 0,
+            event.connect_time or 0,
+            event.ttfb or 0,
+            event.bytes_sent,
+            event.bytes_received,
+            event.retries,
+        )
+
+
+class MetricsRegistry:
+    """
+    An in-process registry of Prometheus-style metrics, labelled by kind,
+    method, endpoint and status:
+
+    - `c360_requests_total`, `c360_request_retries_total`
+    - `c360_bytes_sent_total`, `c360_bytes_received_total`
+    - `c360_request_duration_seconds` (histogram)
+
+    `render()` returns them in the Prometheus text format, e.g. to be served
+    by an existing metrics endpoint.
+    """
+    def __init__(self, buckets=DEFAULT_DURATION_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters = {}      # name -> {labels: value}
+        self._histograms = {}    # labels -> [bucket counts..., sum, count]
+
+    def __call__(self, event):
+        if event.error is not None:
+            status = "error"
+        else:
+            status = str(event.status_code or "")
+        labels = (
+            ("kind", event.kind),
+            ("method", event.method or ""),
+            ("endpoint", event.endpoint or ""),
+            ("status", status),
+        )
+        with self._lock:
+            self._inc("c360_requests_total", labels, 1)
+            self._inc("c360_request_retries_total", labels, event.retries or 0)
+            self._inc("c360_bytes_sent_total", labels, event.bytes_sent or 0)
+            self._inc("c360_bytes_received_total", labels, event.bytes_received or 0)
+            if event.duration is not None:
+                self._observe(labels, event.duration)
+
+    def _inc(self, name, labels, value):
+        values = self._counters.setdefault(name, {})
+        values[labels] = values.get(labels, 0) + value
+
+    def _observe(self, labels, value):
+        histogram = self._histograms.setdefault(labels, [0] * (len(self.buckets) + 2))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram[i] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def get(self, name, **labels):
+        """
+        Returns the total of the counter `name` over the series matching
+        the given labels.
+        """
+        with self._lock:
+            return sum(
+                value for series, value in self._counters.get(name, {}).items()
+                if all(dict(series).get(key) == str(expected) for key, expected in labels.items())
+            )
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        def format_labels(labels):
+            return ",".join(
+                '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                for key, value in labels
+            )
+
+        lines = []
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(values.items()):
+                    lines.append(f"{name}{{{format_labels(labels)}}} {value}")
+
+            name = "c360_request_duration_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(self.buckets + ("+Inf",), histogram[:-2] + [histogram[-1]]):
+                    bucket_labels = format_labels(labels + (("le", bound),))
+                    lines.append(f"{name}_bucket{{{bucket_labels}}} {count}")
+                lines.append(f"{name}_sum{{{format_labels(labels)}}} {histogram[-2]}")
+                lines.append(f"{name}_count{{{format_labels(labels)}}} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryHook:
+    """
+    Records every event as an OpenTelemetry client span, with its actual
+    start and end times.
+    """
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise RuntimeError(
+                "Error importing required libraries: opentelemetry. Install it"
+                " with `pip install opentelemetry-api`."
+            )
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("c360_client")
+
+    def __call__(self, event):
+        trace = self._trace
+        started_at = event.started_at or time.time()
+        start_time = int(started_at * 1e9)
+
+        attributes = {"c360.kind": event.kind, "c360.retries": event.retries or 0}
+        for key, value in (
+            ("http.method", event.method),
+            ("http.url", event.url),
+            ("http.status_code", event.status_code),
+            ("c360.endpoint", event.endpoint),
+            ("c360.bytes_sent", event.bytes_sent),
+            ("c360.bytes_received", event.bytes_received),
+            ("c360.connect_time", event.connect_time),
+            ("c360.ttfb", event.ttfb),
+        ):
+            if value is not None:
+                attributes[key] = value
+        for key, value in event.attributes.items():
+            if not isinstance(value, (str, bool, int, float)):
+                value = str(value)
+            attributes[f"c360.{key}"] = value
+
+        span = self.tracer.start_span(
+            f"{event.kind} {event.method or ''} {event.endpoint or ''}".strip(),
+            kind=trace.SpanKind.CLIENT,
+            start_time=start_time,
+            attributes=attributes,
+        )
+        if not event.ok:
+            span.set_status(
+                trace.Status(trace.StatusCode.ERROR, str(event.error or event.status_code))
+            )
+        span.end(end_time=start_time + int((event.duration or 0) * 1e9))
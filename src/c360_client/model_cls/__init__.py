@@ -1,14 +1,14 @@
-import os
-import yaml
-import requests
-from time import sleep
-
-from c360_client.request_cls import DatalakeClientRequest
+from c360_client.request_cls import get_default_request
+from c360_client.downloader import ParallelDownloader, DEFAULT_MAX_WORKERS
+from c360_client.filecache import FileCache
+from c360_client.responses import ModelRecord
+from c360_client.model_cls.waiter import ExperimentWaiter
 from c360_client.utils import get_boto_client
 
 class DatalakeClientModel:
     def __init__(self, defaults={}):
-        self.request_inst = DatalakeClientRequest()
+        self.request_inst = get_default_request()
+        self._waiter = None
 
     def _request(self, endpoint, **kwargs):
         return self.request_inst.request(
@@ -18,25 +18,53 @@ class DatalakeClientModel:
     def get(self, name, groups=[]):
         endpoint = f"models/{name}"
         # should we do pipelines/common/** vs pipelines/users/ghosalya/** ??
-        response = self._request(endpoint, method="GET")
-        return response
+        response = self._request(endpoint, method="GET", route="models/{name}")
+        return self.request_inst.typed_response(response, ModelRecord)
+
+    def download(
+        self, name, groups=[], max_workers=DEFAULT_MAX_WORKERS, cache=True, verify_etag=False,
+    ):
+        """
+        Downloads the model's artifacts in parallel into the current
+        directory, and returns their paths. Each file is verified against
+        its size and, with `verify_etag`, against its ETag when it looks
+        like an MD5 (not for buckets encrypted with SSE-KMS or SSE-C, whose
+        ETags are not).
 
-    def download(self, name, groups=[]):
+        With `cache`, artifacts are kept in a local cache (under
+        `C360_FILE_CACHE_DIR`, `~/.cache/c360` by default) by path and ETag,
+        so artifacts that have not changed are not downloaded again.
+        """
         endpoint = f"models/{name}/download"
-        response = self._request(endpoint, method="GET")
+        response = self._request(endpoint, method="GET", route="models/{name}/download")
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to get the artifacts of model {name}"
+                f" (status {response.status_code}): {response.text}"
+            )
 
         urls = response.json()["urls"]
 
+        paths = []
         for url in urls:
             path = url.split("?")[0].split("models/")[-1]
             path = path.replace("/", "--")
+            paths.append(path)
+
+        transport = self.request_inst.transport
+        downloader = ParallelDownloader(
+            session=transport.session,
+            timeout=transport.timeout,
+            max_workers=max_workers,
+            cache=FileCache(namespace="models") if cache else None,
+            verify_etag=verify_etag,
+        )
+        downloader.download_many(zip(urls, paths))
 
-            pkl_res = requests.get(url, stream=True)
-            if response.status_code == 200:
-                with open(path, 'wb') as f:
-                    pkl_res.raw.decode_content = True
-                    shutil.copyfileobj(pkl_res.raw, f)
-                print("written to:", path)
+        for path in paths:
+            print("written to:", path)
+
+        return paths
 
 
     def experiment_train(
@@ -65,14 +93,39 @@ class DatalakeClientModel:
 
     def experiment_status(self, name):
         endpoint = f"model/exp_train/{name}"
-        response = self._request(endpoint, method="GET")
+        response = self._request(endpoint, method="GET", route="model/exp_train/{name}")
         return response
 
-    def experiment_wait(self, name):
-        while True:
-            response = self.experiment_status(name=name)
-            response_json = response.json()
-            if response_json.get("status", "FAILED") != "IN_PROGRESS":
-                return response
-            else:
-                sleep(3)
+    @property
+    def waiter(self):
+        """
+        The shared `ExperimentWaiter`, polling the experiments that are
+        being waited on.
+        """
+        if self._waiter is None:
+            self._waiter = ExperimentWaiter(
+                status_func=lambda name: self.experiment_status(name=name),
+            )
+        return self._waiter
+
+    def experiment_wait(self, name, timeout=None):
+        """
+        Blocks until the experiment is no longer in progress and returns its
+        final status response. Polling backs off exponentially; raises
+        `TimeoutError` if it is still in progress after `timeout` seconds.
+        """
+        return self.waiter.submit(name, timeout=timeout).result()
+
+    def experiment_wait_many(self, names, timeout=None):
+        """
+        Waits for many experiments at once, and returns their final status
+        responses by name.
+        """
+        return self.waiter.wait(names, timeout=timeout)
+
+    def experiment_wait_future(self, name, timeout=None):
+        """
+        Returns a `concurrent.futures.Future` of the final status response,
+        which can be cancelled, or awaited with `asyncio.wrap_future`.
+        """
+        return self.waiter.submit(name, timeout=timeout)
@@ -0,0 +1,28 @@
+import hashlib
+
+from pytest import raises
+
+from c360_client.downloader import DownloadError
+from c360_client.model_cls import DatalakeClientModel
+
+
+def test_download_verifies_etag(file_server, tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("C360_FILE_CACHE_DIR", str(tmp_path / "cache"))
+    (file_server.root / "models" / "model_a").mkdir(parents=True)
+    (file_server.root / "models" / "model_a" / "weights.bin").write_bytes(b"corrupted")
+    # the ETag is the MD5 of the artifact as it was uploaded
+    file_server.set_etag_func(lambda data: hashlib.md5(b"weights").hexdigest())
+
+    client = DatalakeClientModel()
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = {"urls": [file_server.url_for("models/model_a/weights.bin")]}
+    mocker.patch.object(client, "_request", return_value=response)
+
+    with raises(DownloadError):
+        client.download("model_a", verify_etag=True)
+    assert not (tmp_path / "model_a--weights.bin").exists()
+    assert not list((tmp_path / "cache").rglob("*weights*"))
+
+    # only the size is checked by default
+    assert client.download("model_a") == ["model_a--weights.bin"]
@@ -0,0 +1,114 @@
+import time
+import threading
+
+import pytest
+from concurrent.futures import Future
+
+from c360_client.model_cls import waiter as waiter_module
+from c360_client.model_cls.waiter import Backoff, ExperimentWaiter
+
+
+class FakeStatus:
+    def __init__(self, polls_until_done):
+        self.polls_until_done = dict(polls_until_done)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, name):
+        with self.lock:
+            self.calls.append(name)
+            self.polls_until_done[name] -= 1
+            return self.polls_until_done[name] <= 0
+
+
+def make_waiter(status, **kwargs):
+    return ExperimentWaiter(
+        status_func=status,
+        is_done=lambda done: done,
+        initial_interval=0.01,
+        max_interval=0.05,
+        **kwargs,
+    )
+
+
+def test_backoff_grows_up_to_max_interval():
+    backoff = Backoff(initial_interval=1, max_interval=4, multiplier=2)
+    delays = [backoff.next_delay() for _ in range(5)]
+    assert 0.5 <= delays[0] <= 1
+    assert 1 <= delays[1] <= 2
+    assert all(2 <= delay <= 4 for delay in delays[3:])
+
+
+def test_wait_many():
+    status = FakeStatus({"a": 1, "b": 3, "c": 5})
+    results = make_waiter(status).wait(["a", "b", "c"])
+
+    assert results == {"a": True, "b": True, "c": True}
+    assert [status.calls.count(name) for name in "abc"] == [1, 3, 5]
+
+
+def test_timeout_and_cancel():
+    status = FakeStatus({"slow": 1000, "cancelled": 1000})
+    waiter = make_waiter(status)
+
+    cancelled = waiter.submit("cancelled")
+    future = waiter.submit("slow", timeout=0.1)
+    assert cancelled.cancel()
+    with pytest.raises(TimeoutError):
+        future.result()
+
+    # the poller stops once nothing is left to wait for
+    time.sleep(0.1)
+    calls = len(status.calls)
+    time.sleep(0.1)
+    assert len(status.calls) == calls
+
+
+class CancelledBeforeResolved(Future):
+    # a caller cancelling right after the poller checked the future
+    def set_result(self, result):
+        self.cancel()
+        super().set_result(result)
+
+
+def test_cancel_while_polled(monkeypatch):
+    status = FakeStatus({"cancelled": 1, "pending": 3})
+    waiter = make_waiter(status)
+
+    monkeypatch.setattr(waiter_module, "Future", CancelledBeforeResolved)
+    cancelled = waiter.submit("cancelled")
+    monkeypatch.setattr(waiter_module, "Future", Future)
+    pending = waiter.submit("pending")
+
+    # the poller carries on with the other experiments
+    assert pending.result(timeout=5) is True
+    assert cancelled.cancelled()
+
+
+def test_gives_up_after_repeated_errors():
+    def failing(name):
+        raise RuntimeError("unavailable")
+
+    future = make_waiter(failing, max_errors=3).submit("a")
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+
+
+def test_wait_stops_polling_after_a_failure():
+    status = FakeStatus({"failing": 1000, "slow": 1000})
+
+    def failing_status(name):
+        if name == "failing":
+            raise RuntimeError("unavailable")
+        return status(name)
+
+    waiter = make_waiter(failing_status, max_errors=2)
+    with pytest.raises(RuntimeError):
+        waiter.wait(["failing", "slow"])
+
+    # the poller goes idle instead of polling "slow" forever
+    time.sleep(0.2)
+    calls = len(status.calls)
+    time.sleep(0.2)
+    assert len(status.calls) == calls
+    assert waiter._thread is None
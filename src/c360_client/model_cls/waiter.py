@@ -0,0 +1,205 @@
+import time
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from concurrent.futures import InvalidStateError
+except ImportError:
+    # Python 3.7, where resolving a cancelled future does not raise
+    InvalidStateError = RuntimeError
+
+
+DEFAULT_INITIAL_INTERVAL = 3     # seconds
+DEFAULT_MAX_INTERVAL = 60
+DEFAULT_MULTIPLIER = 1.5
+DEFAULT_MAX_ERRORS = 5           # consecutive failed polls before giving up
+DEFAULT_MAX_WORKERS = 8
+
+
+class Backoff:
+    """
+    Exponential backoff with "equal jitter": each delay is picked between
+    half and the whole of the current interval, which then grows by
+    `multiplier` up to `max_interval`.
+    """
+    def __init__(
+        self,
+        initial_interval=DEFAULT_INITIAL_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        multiplier=DEFAULT_MULTIPLIER,
+    ):
+        self.interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+
+    def next_delay(self):
+        delay = random.uniform(self.interval / 2, self.interval)
+        self.interval = min(self.interval * self.multiplier, self.max_interval)
+        return delay
+
+
+def is_experiment_done(response):
+    return response.json().get("status", "FAILED") != "IN_PROGRESS"
+
+
+def _resolve(future, result=None, error=None):
+    # the future may be cancelled by its caller at any time, which must not
+    # stop the poller thread
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class _Waiting:
+    def __init__(self, name, timeout, backoff):
+        self.name = name
+        self.future = Future()
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.backoff = backoff
+        self.next_poll = time.monotonic()
+        self.errors = 0
+
+
+class ExperimentWaiter:
+    """
+    Waits for many experiments with a single background poller.
+
+    Every round, all experiments that are due are polled together over a
+    small thread pool (sharing the client's pooled connections). The API
+    has no endpoint returning the status of several experiments, so each
+    one still takes a request per poll. Each experiment backs off
+    exponentially, with jitter, while it stays in progress, so waiting on
+    many long-running experiments does not turn into a steady stream of
+    requests.
+
+    `submit` returns a `concurrent.futures.Future` per experiment, which
+    can be waited on, cancelled, or awaited with `wait_async`.
+    """
+    def __init__(
+        self,
+        status_func,
+        is_done=is_experiment_done,
+        initial_interval=DEFAULT_INITIAL_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        multiplier=DEFAULT_MULTIPLIER,
+        max_errors=DEFAULT_MAX_ERRORS,
+        max_workers=DEFAULT_MAX_WORKERS,
+    ):
+        """
+        status_func - called with an experiment name, returns its status
+            response.
+        is_done - called with a status response, tells whether the
+            experiment has finished.
+        """
+        self.status_func = status_func
+        self.is_done = is_done
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.max_errors = max_errors
+        self.max_workers = max_workers
+
+        self._waiting = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def submit(self, name, timeout=None):
+        """
+        Starts waiting for the experiment `name`. Returns a future resolving
+        to its final status response, or failing with `TimeoutError` after
+        `timeout` seconds.
+        """
+        waiting = _Waiting(
+            name,
+            timeout,
+            Backoff(self.initial_interval, self.max_interval, self.multiplier),
+        )
+        with self._lock:
+            self._waiting.append(waiting)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="c360-experiment-waiter", daemon=True,
+                )
+                self._thread.start()
+        self._wakeup.set()
+        return waiting.future
+
+    def wait(self, names, timeout=None):
+        """
+        Blocks until all the given experiments are done, and returns their
+        final status responses by name. If one of them fails or times out,
+        the others are no longer waited for.
+        """
+        futures = {name: self.submit(name, timeout=timeout) for name in names}
+        try:
+            return {name: future.result() for name, future in futures.items()}
+        except BaseException:
+            # nobody is left to wait for the others
+            for future in futures.values():
+                future.cancel()
+            raise
+
+    async def wait_async(self, name, timeout=None):
+        import asyncio
+
+        return await asyncio.wrap_future(self.submit(name, timeout=timeout))
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with self._lock:
+                    self._waiting = [w for w in self._waiting if not w.future.done()]
+                    if not self._waiting:
+                        self._thread = None
+                        return
+                    waiting = list(self._waiting)
+
+                now = time.monotonic()
+                for w in waiting:
+                    if w.deadline is not None and now >= w.deadline:
+                        _resolve(w.future, error=TimeoutError(
+                            f"Experiment {w.name} still in progress after the timeout"
+                        ))
+
+                due = [w for w in waiting if not w.future.done() and w.next_poll <= now]
+                for w, outcome in zip(due, pool.map(self._poll, due)):
+                    self._handle(w, *outcome)
+
+                self._sleep_until_next_poll()
+
+    def _poll(self, waiting):
+        try:
+            response = self.status_func(waiting.name)
+            return response, self.is_done(response), None
+        except Exception as e:
+            return None, False, e
+
+    def _handle(self, waiting, response, done, error):
+        if error is not None:
+            waiting.errors += 1
+            if waiting.errors >= self.max_errors:
+                _resolve(waiting.future, error=error)
+                return
+        elif done:
+            _resolve(waiting.future, result=response)
+            return
+        else:
+            waiting.errors = 0
+
+        waiting.next_poll = time.monotonic() + waiting.backoff.next_delay()
+
+    def _sleep_until_next_poll(self):
+        with self._lock:
+            wake_times = [
+                min(w.next_poll, w.deadline) if w.deadline is not None else w.next_poll
+                for w in self._waiting if not w.future.done()
+            ]
+        if wake_times:
+            self._wakeup.wait(max(min(wake_times) - time.monotonic(), 0))
+            self._wakeup.clear()
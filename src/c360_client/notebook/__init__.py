@@ -1,10 +1,5 @@
 import os
 import base64
-from pyathena import connect as athena_connect
-from googleapiclient.discovery import build
-from googleapiclient import errors as g_errors
-import pandas as pd
-import requests
 
 
 from c360_client.utils import (
@@ -13,38 +8,17 @@ from c360_client.utils import (
     set_notebook_mode,
     is_notebook_mode,
 )
+from c360_client.notebook.athena import (
+    get_athena_connection,
+    build_query,
+    run_query,
+)
 
 
-def get_athena_connection():
-
-    sts = get_boto_client('sts')
-    aws_account_id = sts.get_caller_identity().get('Account')
-
-    aws_creds = {}
-
-    if is_notebook_mode():
-        aws_access_key_id, aws_secret_access_key = get_aws_credentials()
-        aws_creds = dict(
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name="ap-southeast-1",
-        )
-
-    pyathena_conn = athena_connect(
-        s3_staging_dir=(
-            "s3://aws-athena-query-results-"
-            "{}-ap-southeast-1/athena".format(aws_account_id)
-        ),
-        **aws_creds
-    )
-
-    return pyathena_conn
-
-
-def download_athena_table(file_name, data):
+def download_athena_table(file_name, data, overwrite=False):
     os.makedirs("data", exist_ok=True)
     file_path = "data/" + file_name
-    if os.path.exists(file_path):
+    if os.path.exists(file_path) and not overwrite:
         print("File exists:", file_path)
         return
 
@@ -52,13 +26,19 @@ def download_athena_table(file_name, data):
     print("Downloaded", file_path)
 
 
+def _get_drive_service():
+    from googleapiclient.discovery import build
+    return build('drive', 'v3')
+
+
 def logout():
     os.remove("/content/adc.json")
     print("Logged out")
 
 
 def update_description(file_id, description):
-    service = build('drive', 'v3')
+    from googleapiclient import errors as g_errors
+    service = _get_drive_service()
     if (file_id):
         if not (description):
             print("Description not found. Set description to default - Example Notebook")
@@ -86,7 +66,8 @@ def update_description(file_id, description):
 
 
 def publish_notebook(file_id):
-    service = build('drive', 'v3')
+    from googleapiclient import errors as g_errors
+    service = _get_drive_service()
     # hardcoded `published` folder_id
     folder_id = "1YXUkwJNFxhIpAXV9beu2fsZTeG15E4uP"
     if (file_id):
@@ -115,7 +96,8 @@ def publish_notebook(file_id):
 
 
 def unpublish_notebook(file_id):
-    service = build('drive', 'v3')
+    from googleapiclient import errors as g_errors
+    service = _get_drive_service()
     # hardcoded `c360-labs` folder_id
     folder_id = "13cz38UKqBVVPoPPYPxmV73J5Jo4auKnI"
     if (file_id):
@@ -152,7 +134,7 @@ def upload_thumbnail(file_id):
             " a colab notebook?"
         )
 
-    service = build('drive', 'v3')
+    service = _get_drive_service()
 
     if (file_id):
         uploaded = files.upload()
@@ -191,22 +173,40 @@ def upload_thumbnail(file_id):
         print("Please provide file_id")
 
 
-def load_table(table_name, limit=500):
+def load_table(
+    table_name, limit=500, dataset="crm_derived_restricted", sector="lake",
+    columns=None, filters=None, unload=None, cache=True, save_csv=True,
+    result_reuse_minutes=0,
+):
+    """
+    Queries the latest version of a lake table through Athena, saves it as
+    `data/<table_name>.csv` and returns it as a pandas DataFrame.
+
+    columns, filters - see `c360_client.notebook.athena.build_query`.
+    unload - have Athena write the results as parquet, which is much faster
+        for large results. Defaults to doing so when there is no `limit`.
+    cache - return the results of the same query from the local query cache
+        (for `C360_QUERY_CACHE_TTL` seconds, an hour by default).
+    save_csv - also save the results as CSV, replacing an older file.
+    result_reuse_minutes - let Athena reuse the results of an identical query
+        run within that many minutes, see
+        `c360_client.notebook.athena.get_athena_connection`.
+    """
     if (table_name):
-        pyathena_conn = get_athena_connection()
-        query = (
-            # TODO: build query from any dataset
-            "SELECT * FROM acme_c360_lake__crm_derived_restricted"
-            f".{table_name}_latest LIMIT {limit}"
+        query, parameters = build_query(
+            table_name, dataset, sector=sector, columns=columns, filters=filters,
+            limit=limit,
         )
         file_name = f"{table_name}.csv"
 
-        data = pd.read_sql(
-            query,
-            pyathena_conn
+        data = run_query(
+            query, parameters, unload=limit is None if unload is None else unload,
+            result_reuse_minutes=result_reuse_minutes, cache=cache,
         )
 
-        download_athena_table(file_name, data)
+        if save_csv:
+            download_athena_table(file_name, data, overwrite=True)
         print("Loaded table name: ", table_name, " as ", file_name)
+        return data
     else:
         print("Please provide table name")
@@ -0,0 +1,172 @@
+import threading
+
+from c360_client.notebook.query_cache import get_query_cache
+from c360_client.utils import (
+    NOTEBOOK_AWS_REGION,
+    _get_boto_session,
+    _get_tenant,
+    get_aws_credentials,
+    get_boto_client,
+    is_notebook_mode,
+)
+
+
+DEFAULT_SECTOR = "lake"
+DEFAULT_RESULT_REUSE_MINUTES = 0     # always run queries again, see get_athena_connection
+FILTER_OPERATORS = ("=", "!=", "<>", "<", "<=", ">", ">=", "in", "not in")
+
+_athena_lock = threading.Lock()
+_account_ids = {}       # credentials -> AWS account id
+_connections = {}       # (credentials, unload, result reuse) -> pyathena connection
+
+
+def _get_credentials():
+    # None stands for boto's default credential chain
+    return get_aws_credentials() if is_notebook_mode() else None
+
+
+def get_aws_account_id():
+    """
+    The AWS account id of the current credentials, looked up once.
+    """
+    credentials = _get_credentials()
+    with _athena_lock:
+        if credentials not in _account_ids:
+            sts = get_boto_client("sts")
+            _account_ids[credentials] = sts.get_caller_identity().get("Account")
+        return _account_ids[credentials]
+
+
+def get_athena_connection(unload=False, result_reuse_minutes=DEFAULT_RESULT_REUSE_MINUTES):
+    """
+    Returns a pyathena connection whose cursors return pandas DataFrames.
+    Connections are cached per credentials and options.
+
+    unload - have Athena `UNLOAD` results to parquet files in S3, which are
+        then read in bulk, instead of fetching large results as CSV.
+    result_reuse_minutes - let Athena reuse the results of an identical
+        query run within that many minutes, instead of running it again.
+        Off by default: reused results do not reflect data written since,
+        and the workgroup must use Athena engine version 3.
+    """
+    from pyathena import connect as athena_connect
+    from pyathena.pandas.cursor import PandasCursor
+
+    credentials = _get_credentials()
+    key = (credentials, unload, result_reuse_minutes)
+    with _athena_lock:
+        connection = _connections.get(key)
+    if connection is not None:
+        return connection
+
+    options = {}
+    if is_notebook_mode():
+        options["region_name"] = NOTEBOOK_AWS_REGION
+    if result_reuse_minutes:
+        options.update(result_reuse_enable=True, result_reuse_minutes=result_reuse_minutes)
+
+    connection = athena_connect(
+        s3_staging_dir=(
+            "s3://aws-athena-query-results-"
+            f"{get_aws_account_id()}-{NOTEBOOK_AWS_REGION}/athena"
+        ),
+        session=_get_boto_session(credentials),
+        cursor_class=PandasCursor,
+        cursor_kwargs=dict(unload=unload),
+        **options
+    )
+    with _athena_lock:
+        return _connections.setdefault(key, connection)
+
+
+def clear_athena_cache():
+    with _athena_lock:
+        _account_ids.clear()
+        _connections.clear()
+
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def get_database_name(dataset, sector=DEFAULT_SECTOR):
+    tenant = _get_tenant().replace("-", "_")
+    return f"{tenant}_c360_{sector}__{dataset}"
+
+
+def build_query(
+    table, dataset, sector=DEFAULT_SECTOR, columns=None, filters=None, limit=None,
+    latest=True,
+):
+    """
+    Builds a query over a lake table, and returns it with its parameters,
+    to be given together to `cursor.execute`.
+
+    columns - only select the given columns.
+    filters - a list of `(column, operator, value)` conditions, all of
+        which must match, e.g. `[("country", "=", "SG"), ("age", ">", 30)]`.
+        Values are passed as query parameters, escaped by pyathena.
+    latest - query the latest version of the table.
+    """
+    table_name = f"{table}_latest" if latest else table
+    selection = ", ".join(map(quote_identifier, columns)) if columns else "*"
+    query = (
+        f"SELECT {selection}"
+        f" FROM {quote_identifier(get_database_name(dataset, sector))}"
+        f".{quote_identifier(table_name)}"
+    )
+
+    parameters = {}
+    conditions = []
+    for index, (column, operator, value) in enumerate(filters or []):
+        operator = operator.lower()
+        if operator == "==":
+            operator = "="
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(
+                f"Unsupported filter operator {operator!r}, expected one of {FILTER_OPERATORS}"
+            )
+
+        if operator in ("in", "not in"):
+            if not value:
+                raise ValueError(f"Empty list of values to filter {column} on")
+            names = [f"p{index}_{i}" for i in range(len(value))]
+            parameters.update(zip(names, value))
+            placeholders = ", ".join(f"%({name})s" for name in names)
+            conditions.append(f"{quote_identifier(column)} {operator.upper()} ({placeholders})")
+        else:
+            parameters[f"p{index}"] = value
+            conditions.append(f"{quote_identifier(column)} {operator} %(p{index})s")
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return query, parameters
+
+
+def run_query(
+    query, parameters=None, unload=False, result_reuse_minutes=DEFAULT_RESULT_REUSE_MINUTES,
+    cache=False,
+):
+    """
+    Runs a query on Athena and returns its results as a pandas DataFrame.
+
+    cache - if set (or given a `QueryCache`), results are kept in the local
+        query cache, and returned from there when the same query is run
+        again, without reaching Athena.
+    """
+    if cache:
+        if cache is True:
+            cache = get_query_cache()
+        data = cache.get(query, parameters)
+        if data is not None:
+            return data
+
+    connection = get_athena_connection(unload=unload, result_reuse_minutes=result_reuse_minutes)
+    with connection.cursor() as cursor:
+        data = cursor.execute(query, parameters or None).as_pandas()
+
+    if cache:
+        cache.put(query, parameters, data)
+    return data
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+
+from c360_client.filecache import FileCache, TMP_PREFIX
+
+
+DEFAULT_QUERY_CACHE_TTL = 3600                  # seconds
+DEFAULT_QUERY_CACHE_MAX_BYTES = 1024 ** 3
+QUERY_METADATA_KEY = b"c360_query"
+ENTRY_VERSION = "parquet-1"
+
+# quoted strings and identifiers, whose whitespace is significant
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+
+def normalize_query(query):
+    """
+    Collapses whitespace outside of quotes and drops trailing semicolons,
+    so that the same query written differently is cached once.
+    """
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    return "".join(
+        part if index % 2 else re.sub(r"\s+", " ", part)
+        for index, part in enumerate(parts)
+    )
+
+
+def query_cache_key(query, parameters=None):
+    # results are never shared between tenants
+    key = json.dumps(
+        [os.getenv("C360_TENANT"), normalize_query(query), parameters or {}],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class QueryCache:
+    """
+    Keeps the results of Athena queries on local disk as parquet files,
+    keyed by the normalized query and its parameters.
+
+    Unlike CSV, parquet keeps the column types and reloads quickly. Each
+    file records its query, parameters and creation time in its metadata;
+    results older than `ttl` seconds are ignored, and the least recently
+    used ones are evicted once the cache grows over `max_bytes`.
+    """
+    def __init__(self, root=None, ttl=None, max_bytes=DEFAULT_QUERY_CACHE_MAX_BYTES):
+        if ttl is None:
+            ttl = float(os.getenv("C360_QUERY_CACHE_TTL", DEFAULT_QUERY_CACHE_TTL))
+        self.ttl = ttl
+        self.files = FileCache(root=root, namespace="queries", max_bytes=max_bytes)
+
+    def get(self, query, parameters=None):
+        """
+        Returns the cached results as a pandas DataFrame, or None.
+        """
+        import pyarrow.parquet as pq
+
+        key = query_cache_key(query, parameters)
+        path = self.files.get(key, ENTRY_VERSION, touch=True)
+        if path is None:
+            return None
+
+        try:
+            metadata = json.loads(pq.read_schema(path).metadata[QUERY_METADATA_KEY])
+            if metadata["created_at"] + self.ttl < time.time():
+                self.files.remove(key, ENTRY_VERSION)
+                return None
+            return pq.read_table(path, memory_map=True).to_pandas()
+        except (OSError, KeyError, ValueError):
+            # evicted meanwhile, or not written by this cache
+            return None
+
+    def put(self, query, parameters, df):
+        """
+        Caches the results of a query. Returns False if they cannot be
+        stored as parquet.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            print("Query results cannot be cached:", e)
+            return False
+
+        metadata = dict(table.schema.metadata or {})
+        metadata[QUERY_METADATA_KEY] = json.dumps(dict(
+            query=normalize_query(query),
+            parameters=parameters or {},
+            created_at=time.time(),
+        ), default=str).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(self.files.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.files.root, prefix=TMP_PREFIX, suffix=".parquet")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            key = query_cache_key(query, parameters)
+            # replace any expired entry
+            self.files.remove(key, ENTRY_VERSION)
+            self.files.put(key, ENTRY_VERSION, tmp_path)
+        finally:
+            os.remove(tmp_path)
+        return True
+
+    def clear(self):
+        return self.files.clear()
+
+
+_query_cache = None
+
+
+def get_query_cache():
+    """
+    The query cache used by default, under `C360_FILE_CACHE_DIR`.
+    """
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = QueryCache()
+    return _query_cache
@@ -0,0 +1,82 @@
+from pytest import fixture, importorskip, raises
+
+from c360_client.notebook import athena
+from c360_client.notebook.query_cache import QueryCache, normalize_query
+
+
+@fixture
+def fake_aws(mocker):
+    athena.clear_athena_cache()
+    sts = mocker.Mock()
+    sts.get_caller_identity.return_value = {"Account": "123456789012"}
+    mocker.patch.object(athena, "get_boto_client", return_value=sts)
+    mocker.patch.object(athena, "_get_boto_session")
+    yield sts
+    athena.clear_athena_cache()
+
+
+def test_build_query():
+    query, parameters = athena.build_query(
+        "customers", "crm", columns=["id", "country"],
+        filters=[("country", "in", ["SG", "ID"]), ("age", ">=", 30)], limit=10,
+    )
+    assert query == (
+        'SELECT "id", "country" FROM "test_c360_lake__crm"."customers_latest"'
+        ' WHERE "country" IN (%(p0_0)s, %(p0_1)s) AND "age" >= %(p1)s LIMIT 10'
+    )
+    assert parameters == {"p0_0": "SG", "p0_1": "ID", "p1": 30}
+
+    with raises(ValueError):
+        athena.build_query("customers", "crm", filters=[("id", "like", "%")])
+
+
+def test_connections_are_cached(fake_aws, mocker):
+    importorskip("pyathena.pandas.cursor")
+    connect = mocker.patch("pyathena.connect", side_effect=lambda **kwargs: mocker.Mock())
+
+    connection = athena.get_athena_connection()
+    assert athena.get_athena_connection() is connection
+    assert athena.get_athena_connection(unload=True) is not connection
+
+    assert fake_aws.get_caller_identity.call_count == 1
+    kwargs = connect.call_args.kwargs
+    assert kwargs["s3_staging_dir"] == (
+        "s3://aws-athena-query-results-123456789012-ap-southeast-1/athena"
+    )
+    assert kwargs["cursor_kwargs"] == {"unload": True}
+    # results are only reused on request, as they may be stale
+    assert "result_reuse_enable" not in kwargs
+
+    athena.get_athena_connection(result_reuse_minutes=30)
+    kwargs = connect.call_args.kwargs
+    assert kwargs["result_reuse_enable"]
+    assert kwargs["result_reuse_minutes"] == 30
+
+
+def test_run_query_from_cache(tmp_path, mocker):
+    pd = importorskip("pandas")
+    importorskip("pyarrow")
+    cache = QueryCache(root=str(tmp_path), ttl=60)
+    cursor = mocker.MagicMock()
+    cursor.__enter__.return_value.execute.return_value.as_pandas.return_value = pd.DataFrame(
+        {"id": [1, 2], "country": ["SG", "ID"]}
+    )
+    connection = mocker.Mock(cursor=mocker.Mock(return_value=cursor))
+    mocker.patch.object(athena, "get_athena_connection", return_value=connection)
+
+    first = athena.run_query("SELECT *\n  FROM t WHERE c = %(p0)s;", {"p0": "a  b"}, cache=cache)
+    second = athena.run_query("SELECT * FROM t WHERE c = %(p0)s", {"p0": "a  b"}, cache=cache)
+    assert connection.cursor.call_count == 1
+    assert second.equals(first)
+    assert second["id"].dtype == first["id"].dtype
+
+    athena.run_query("SELECT * FROM t WHERE c = %(p0)s", {"p0": "other"}, cache=cache)
+    assert connection.cursor.call_count == 2
+
+    cache.ttl = -1
+    athena.run_query("SELECT * FROM t WHERE c = %(p0)s", {"p0": "a  b"}, cache=cache)
+    assert connection.cursor.call_count == 3
+
+
+def test_normalize_query():
+    assert normalize_query("SELECT  *\nFROM t WHERE c = 'a  b' ;") == "SELECT * FROM t WHERE c = 'a  b'"
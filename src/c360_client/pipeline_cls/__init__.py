@@ -1,23 +1,54 @@
 import os
-import yaml
 
-from c360_client.request_cls import DatalakeClientRequest
+from c360_client.request_cls import get_default_request
+from c360_client.uploader import FileSlice, MultipartFormStream
+from c360_client.responses import PipelineRecord
+from c360_client.pipeline_cls.compiler import (
+    PipelineValidationError,
+    load_pipeline,
+    compile_pipelines,
+)
+from c360_client.pipeline_cls.manifest import (
+    MANIFEST_FILENAME,
+    DeployDiff,
+    list_pipeline_files,
+    build_manifest,
+    load_manifest,
+    save_manifest,
+)
 from c360_client.utils import get_boto_client
 
 class DatalakeClientPipeline:
     def __init__(self):
-        self.request_inst = DatalakeClientRequest()
+        self.request_inst = get_default_request()
 
     def _request(self, endpoint, **kwargs):
         return self.request_inst.request(
             endpoint=endpoint, **kwargs,
         )
 
+    def _upload_files(self, method, files):
+        """
+        Sends `{key: local path}` as a multipart form, streamed from disk
+        one file at a time.
+        """
+        fields = [
+            (key, os.path.basename(filepath), FileSlice(filepath), "application/octet-stream")
+            for key, filepath in files.items()
+        ]
+        with MultipartFormStream(fields) as body:
+            return self._request(
+                endpoint="pipelines",
+                method=method,
+                data=body,
+                headers={"Content-Type": body.content_type},
+            )
+
     def get(self, name, groups=[]):
         endpoint = f"pipelines/{name}"
         # should we do pipelines/common/** vs pipelines/users/ghosalya/** ??
-        response = self._request(endpoint, method="GET")
-        return response
+        response = self._request(endpoint, method="GET", route="pipelines/{name}")
+        return self.request_inst.typed_response(response, PipelineRecord)
 
     def create(self, name, groups=[], path=None):
         """
@@ -27,55 +58,81 @@ class DatalakeClientPipeline:
 
         # 1. Read the target file
         path = path or f"pipelines/{name}.yml"
+        pipeline = load_pipeline(path, name=name)
 
-        files = dict()
-        files[f"{name}.yml"] = open(path, "rb")
-
-        # 2. Find and include any separate table query file
-        with open(path, "r") as yamlstream:
-            yaml_dict = yaml.load(yamlstream, Loader=yaml.SafeLoader)
-
-        basepath = os.path.dirname(path)
-
-        for task in yaml_dict.get("tasks", []):
-            for step in task["steps"]:
-                if "query_file" in step:
-                    query_filepath = step["query_file"]
-                    query_fullpath = os.path.join(basepath, query_filepath)
+        # 2. Check it, and find any separate table query file, before
+        # making any request
+        errors = pipeline.errors()
+        if errors:
+            raise PipelineValidationError(errors)
 
-                    files[query_filepath] = open(query_fullpath, "rb")
+        files = dict()
+        files[f"{name}.yml"] = path
+        files.update(pipeline.query_files)
 
         # now that files are settled, make the multi-form-data request
-        return self._request(
-            endpoint="pipelines",
-            method="post",
-            files=files,
-        )
+        return self._upload_files("POST", files)
 
 
     def delete(self, name, groups=[]):
         endpoint = f"pipelines/{name}"
         # should we do pipelines/common/** vs pipelines/users/ghosalya/** ??
-        response = self._request(endpoint, method="DELETE")
+        response = self._request(endpoint, method="DELETE", route="pipelines/{name}")
         return response
 
 
-    def deploy(self, path="pipelines/", groups=[]):
+    def validate(self, path="pipelines/"):
         """
-        Deploy picks up all YAML and SQL files under the path, and attempts to deploy
-        everything.
+        Checks all the pipelines under `path` locally: their structure,
+        query files, task dependencies and cycles. Raises
+        `PipelineValidationError` listing every problem found.
         """
-        uploaded_files = {}
-
-        for root, dirs, files in os.walk(path):
-            for filename in files:
-                if filename.endswith(".yml") or filename.endswith(".sql"):
-                    filepath = os.path.join(root, filename)
-                    key = filepath.replace(path, "")
-                    uploaded_files[key] = open(filepath, "rb")
-
-        return self._request(
-            endpoint="pipelines",
-            method="PUT",
-            files=uploaded_files,
-        )
+        return compile_pipelines(path)
+
+    def deploy(
+        self, path="pipelines/", groups=[], force=False, dry_run=False, manifest_path=None,
+        validate="warn",
+    ):
+        """
+        Deploy picks up all YAML and SQL files under the path, and deploys the
+        ones that changed since the last deploy.
+
+        The SHA-256 of every deployed file is recorded per API in a manifest
+        (`<path>/.c360_deploy_manifest.json` by default, worth keeping in CI
+        caches), which is compared to the local files to only upload the
+        added and changed ones. Removed files are reported, but not deleted.
+
+        force - upload every file, whatever the manifest says.
+        dry_run - only print what would be deployed.
+        validate - check the pipelines first, see `validate`: by default
+            the problems found are printed as warnings, with True they stop
+            the deploy by raising `PipelineValidationError`, and with False
+            the check is skipped.
+
+        Returns the API response, or None if nothing was uploaded.
+        """
+        if validate:
+            try:
+                compile_pipelines(path)
+            except PipelineValidationError as e:
+                if validate != "warn":
+                    raise
+                print(f"Warning: {e}")
+
+        manifest_path = manifest_path or os.path.join(path, MANIFEST_FILENAME)
+        api_url = self.request_inst.url
+
+        files = list_pipeline_files(path)
+        local = build_manifest(files)
+        deployed = {} if force else load_manifest(manifest_path, api_url)
+
+        diff = DeployDiff(local, deployed)
+        print(diff.summary())
+        if dry_run or not diff.to_upload:
+            return None
+
+        response = self._upload_files("PUT", {key: files[key] for key in diff.to_upload})
+        if response.status_code < 400:
+            # removed files are still deployed, so keep them in the manifest
+            save_manifest(manifest_path, api_url, dict(deployed, **local))
+        return response
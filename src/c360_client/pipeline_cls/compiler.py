@@ -0,0 +1,277 @@
+import os
+import threading
+
+import yaml
+
+try:
+    # libyaml's loader is several times faster, when PyYAML was built with it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+from c360_client.pipeline_cls.manifest import list_pipeline_files
+
+
+_parse_lock = threading.Lock()
+_parsed = {}    # absolute path -> (mtime_ns, size, parsed definition)
+
+
+class PipelineValidationError(ValueError):
+    """
+    Raised with every problem found in a set of pipelines, listed in
+    `errors`.
+    """
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__(
+            f"{len(self.errors)} pipeline errors:\n"
+            + "\n".join(f"  {error}" for error in self.errors)
+        )
+
+
+class Pipeline:
+    """
+    A parsed pipeline definition.
+
+    Each of its `tasks` has a list of `steps`, which may reference a
+    `query_file` relative to the pipeline file. Tasks can be given a `name`
+    and `depends_on` other tasks, either of the same pipeline (`task`) or of
+    another one (`pipeline.task`, where a pipeline in a subfolder is named
+    by its relative path, e.g. `sales/daily.load`).
+    """
+    def __init__(self, name, path, definition):
+        self.name = name
+        self.path = path
+        self.definition = definition
+
+    @property
+    def basepath(self):
+        return os.path.dirname(self.path)
+
+    @property
+    def tasks(self):
+        tasks = self.definition.get("tasks") if isinstance(self.definition, dict) else None
+        return tasks if isinstance(tasks, list) else []
+
+    def task_id(self, index, task):
+        name = task.get("name") if isinstance(task, dict) else None
+        return f"{self.name}.{name if name is not None else index}"
+
+    @property
+    def is_pipeline(self):
+        """
+        Whether the file defines a pipeline at all: other YAML files may
+        live alongside pipelines.
+        """
+        return isinstance(self.definition, dict) and "tasks" in self.definition
+
+    @property
+    def query_files(self):
+        """
+        `{query_file: local path}` of every step's query file.
+        """
+        files = {}
+        for task in self.tasks:
+            if not isinstance(task, dict):
+                continue
+            for step in task.get("steps") or []:
+                if isinstance(step, dict) and "query_file" in step:
+                    query_file = step["query_file"]
+                    files[query_file] = os.path.join(self.basepath, query_file)
+        return files
+
+    def dependencies(self):
+        """
+        Returns `{task id: [task ids it depends on]}`.
+        """
+        graph = {}
+        for index, task in enumerate(self.tasks):
+            depends_on = task.get("depends_on", []) if isinstance(task, dict) else []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            graph[self.task_id(index, task)] = [
+                dependency if "." in dependency else f"{self.name}.{dependency}"
+                for dependency in map(str, depends_on)
+            ]
+        return graph
+
+    def errors(self):
+        """
+        Returns the problems found in the pipeline itself, without looking
+        at other pipelines.
+        """
+        if not isinstance(self.definition, dict):
+            return [f"{self.path}: expected a mapping at the top level"]
+        if not isinstance(self.definition.get("tasks", []), list):
+            return [f"{self.path}: `tasks` should be a list"]
+
+        errors = []
+        seen = set()
+        for index, task in enumerate(self.tasks):
+            task_id = self.task_id(index, task)
+            if not isinstance(task, dict) or not isinstance(task.get("steps"), list):
+                errors.append(f"{self.path}: task {task_id} should have a list of `steps`")
+                continue
+            if task_id in seen:
+                errors.append(f"{self.path}: duplicate task {task_id}")
+            seen.add(task_id)
+
+        for query_file, query_path in self.query_files.items():
+            if not os.path.isfile(query_path):
+                errors.append(f"{self.path}: query file {query_file} not found")
+        return errors
+
+
+def load_pipeline(path, name=None):
+    """
+    Parses the pipeline file at `path`. Parsed files are cached until
+    their modification time or size changes.
+    """
+    abspath = os.path.abspath(path)
+    stat = os.stat(abspath)
+    name = name or os.path.splitext(os.path.basename(path))[0]
+
+    with _parse_lock:
+        cached = _parsed.get(abspath)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        definition = cached[2]
+    else:
+        with open(abspath, "rb") as f:
+            try:
+                definition = yaml.load(f, Loader=SafeLoader)
+            except yaml.YAMLError as e:
+                raise PipelineValidationError([f"{path}: invalid YAML: {e}"])
+        with _parse_lock:
+            _parsed[abspath] = (stat.st_mtime_ns, stat.st_size, definition)
+
+    return Pipeline(name, path, definition)
+
+
+def find_cycles(graph):
+    """
+    Returns the cycles of the `{node: [dependencies]}` graph, each as the
+    list of nodes along it.
+    """
+    cycles = []
+    state = {}      # node -> "visiting" or "done"
+
+    for start in graph:
+        if start in state:
+            continue
+        # iterative depth-first search, so deep graphs do not hit the
+        # recursion limit
+        stack = [(start, iter(graph.get(start, [])))]
+        path = [start]
+        state[start] = "visiting"
+        while stack:
+            node, dependencies = stack[-1]
+            for dependency in dependencies:
+                if state.get(dependency) == "visiting":
+                    cycles.append(path[path.index(dependency):] + [dependency])
+                elif dependency not in state and dependency in graph:
+                    state[dependency] = "visiting"
+                    stack.append((dependency, iter(graph[dependency])))
+                    path.append(dependency)
+                    break
+            else:
+                state[node] = "done"
+                stack.pop()
+                path.pop()
+    return cycles
+
+
+def topological_order(graph):
+    """
+    Returns the nodes of an acyclic `{node: [dependencies]}` graph, each
+    after its dependencies.
+    """
+    order = []
+    done = set()
+    for start in sorted(graph):
+        if start in done:
+            continue
+        stack = [(start, iter(sorted(graph[start])))]
+        while stack:
+            node, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency not in done and dependency in graph:
+                    stack.append((dependency, iter(sorted(graph[dependency]))))
+                    break
+            else:
+                stack.pop()
+                if node not in done:
+                    done.add(node)
+                    order.append(node)
+    return order
+
+
+class PipelineSet:
+    """
+    All the pipelines under a folder, with the dependency graph of their
+    tasks.
+    """
+    def __init__(self, pipelines):
+        self.pipelines = pipelines
+
+    @property
+    def graph(self):
+        graph = {}
+        for pipeline in self.pipelines.values():
+            graph.update(pipeline.dependencies())
+        return graph
+
+    def errors(self):
+        errors = []
+        for pipeline in self.pipelines.values():
+            errors.extend(pipeline.errors())
+
+        graph = self.graph
+        for task_id, dependencies in graph.items():
+            for dependency in dependencies:
+                if dependency not in graph:
+                    errors.append(f"task {task_id} depends on unknown task {dependency}")
+        for cycle in find_cycles(graph):
+            errors.append("dependency cycle: " + " -> ".join(cycle))
+        return errors
+
+    def validate(self):
+        errors = self.errors()
+        if errors:
+            raise PipelineValidationError(errors)
+        return self
+
+    def order(self):
+        """
+        The task ids of all pipelines, each after the tasks it depends on.
+        """
+        return topological_order(self.validate().graph)
+
+
+def compile_pipelines(path="pipelines/"):
+    """
+    Parses every pipeline (`.yml`) file under `path` and validates them
+    together: their structure, query files, task dependencies and cycles.
+    Raises `PipelineValidationError` listing every problem found.
+
+    Pipelines are named by their path relative to `path`, without the
+    extension (`sales/daily.yml` is `sales/daily`). YAML files without
+    `tasks` are not pipelines, and are left out.
+    """
+    pipelines = {}
+    errors = []
+    for key, filepath in list_pipeline_files(path).items():
+        if not key.endswith(".yml"):
+            continue
+        try:
+            pipeline = load_pipeline(filepath, name=key[:-len(".yml")])
+        except PipelineValidationError as e:
+            errors.extend(e.errors)
+            continue
+        if pipeline.is_pipeline:
+            pipelines[pipeline.name] = pipeline
+
+    pipeline_set = PipelineSet(pipelines)
+    errors.extend(pipeline_set.errors())
+    if errors:
+        raise PipelineValidationError(errors)
+    return pipeline_set
@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+
+
+MANIFEST_FILENAME = ".c360_deploy_manifest.json"
+PIPELINE_EXTENSIONS = (".yml", ".sql")
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_pipeline_files(path):
+    """
+    Returns `{key: local path}` for every YAML and SQL file under `path`,
+    keyed by their path relative to it.
+    """
+    files = {}
+    for root, dirs, filenames in os.walk(path):
+        dirs.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(PIPELINE_EXTENSIONS):
+                filepath = os.path.join(root, filename)
+                key = os.path.relpath(filepath, path).replace(os.sep, "/")
+                files[key] = filepath
+    return files
+
+
+def build_manifest(files):
+    return {key: hash_file(filepath) for key, filepath in files.items()}
+
+
+def load_manifest(manifest_path, identity):
+    """
+    Returns the manifest of what was last deployed to the API identified by
+    `identity`, or an empty one.
+    """
+    try:
+        with open(manifest_path) as f:
+            manifests = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifests.get(identity, {})
+
+
+def save_manifest(manifest_path, identity, manifest):
+    try:
+        with open(manifest_path) as f:
+            manifests = json.load(f)
+    except (OSError, ValueError):
+        manifests = {}
+    manifests[identity] = manifest
+
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifests, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+class DeployDiff:
+    """
+    The difference between the local pipeline files and the last deployed
+    manifest.
+    """
+    def __init__(self, local, deployed):
+        self.added = sorted(key for key in local if key not in deployed)
+        self.changed = sorted(
+            key for key in local if key in deployed and local[key] != deployed[key]
+        )
+        self.removed = sorted(key for key in deployed if key not in local)
+        self.unchanged = sorted(
+            key for key in local if key in deployed and local[key] == deployed[key]
+        )
+
+    @property
+    def to_upload(self):
+        return self.added + self.changed
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self):
+        lines = [
+            f"{len(self.added)} added, {len(self.changed)} changed,"
+            f" {len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        ]
+        for label, keys in (("+", self.added), ("~", self.changed), ("-", self.removed)):
+            lines.extend(f"  {label} {key}" for key in keys)
+        return "\n".join(lines)
@@ -0,0 +1,104 @@
+from pytest import fixture, raises
+
+from c360_client.pipeline_cls import DatalakeClientPipeline
+from c360_client.pipeline_cls.compiler import (
+    PipelineValidationError,
+    compile_pipelines,
+    find_cycles,
+    load_pipeline,
+)
+
+
+@fixture
+def pipelines(tmp_path):
+    (tmp_path / "queries").mkdir()
+    (tmp_path / "queries" / "daily.sql").write_text("select 1")
+    (tmp_path / "sales.yml").write_text(
+        "tasks:\n"
+        "  - name: extract\n"
+        "    steps: [{query_file: queries/daily.sql}]\n"
+        "  - name: report\n"
+        "    depends_on: [extract, marketing.load]\n"
+        "    steps: []\n"
+    )
+    (tmp_path / "marketing.yml").write_text(
+        "tasks:\n"
+        "  - name: load\n"
+        "    steps: []\n"
+    )
+    return tmp_path
+
+
+def test_compile_pipelines(pipelines):
+    pipeline_set = compile_pipelines(str(pipelines))
+
+    assert sorted(pipeline_set.pipelines) == ["marketing", "sales"]
+    assert pipeline_set.graph["sales.report"] == ["sales.extract", "marketing.load"]
+    order = pipeline_set.order()
+    assert order.index("sales.report") > order.index("marketing.load")
+    assert order.index("sales.report") > order.index("sales.extract")
+
+
+def test_validation_errors(pipelines):
+    (pipelines / "marketing.yml").write_text(
+        "tasks:\n"
+        "  - name: load\n"
+        "    depends_on: sales.report\n"
+        "    steps: [{query_file: missing.sql}]\n"
+        "  - name: orphan\n"
+        "    depends_on: nowhere\n"
+        "    steps: []\n"
+    )
+    with raises(PipelineValidationError) as error:
+        DatalakeClientPipeline().deploy(str(pipelines), validate=True)
+
+    errors = error.value.errors
+    assert any("missing.sql not found" in e for e in errors)
+    assert any("unknown task marketing.nowhere" in e for e in errors)
+    assert any(e.startswith("dependency cycle") for e in errors)
+
+
+def test_pipelines_in_subfolders(pipelines):
+    for team in ["sales", "marketing"]:
+        (pipelines / team).mkdir()
+        (pipelines / team / "daily.yml").write_text(
+            "tasks:\n"
+            "  - name: load\n"
+            "    depends_on: [marketing.load]\n"
+            "    steps: []\n"
+        )
+    # other YAML files are not pipelines
+    (pipelines / "sales" / "settings.yml").write_text("owner: sales\n")
+
+    pipeline_set = compile_pipelines(str(pipelines))
+    assert sorted(pipeline_set.pipelines) == ["marketing", "marketing/daily", "sales", "sales/daily"]
+    assert pipeline_set.graph["sales/daily.load"] == ["marketing.load"]
+
+
+def test_deploy_warns_on_validation_errors(pipelines, mocker, capsys):
+    (pipelines / "marketing.yml").write_text(
+        "tasks:\n"
+        "  - name: load\n"
+        "    steps: [{query_file: missing.sql}]\n"
+    )
+    client = DatalakeClientPipeline()
+    mocker.patch.object(client, "_request", return_value=mocker.Mock(status_code=200))
+
+    assert client.deploy(str(pipelines)).status_code == 200
+    assert "missing.sql not found" in capsys.readouterr().out
+
+
+def test_parsed_files_are_cached(pipelines, mocker):
+    load = mocker.spy(__import__("yaml"), "load")
+    path = str(pipelines / "sales.yml")
+    load_pipeline(path)
+    load_pipeline(path)
+    assert load.call_count == 1
+
+    (pipelines / "sales.yml").write_text("tasks: []\n# changed")
+    assert load_pipeline(path).tasks == []
+
+
+def test_find_cycles():
+    assert find_cycles({"a": ["b"], "b": ["c"], "c": []}) == []
+    assert find_cycles({"a": ["b"], "b": ["a"]}) == [["a", "b", "a"]]
@@ -0,0 +1,46 @@
+import re
+
+from c360_client.pipeline_cls import DatalakeClientPipeline
+
+
+def _deploy(client, mocker, path, **kwargs):
+    uploaded = []
+
+    def fake_request(endpoint, method, data, headers):
+        body = data.read().decode()
+        uploaded.extend(re.findall(r'name="([^"]+)"; filename', body))
+        return mocker.Mock(status_code=200)
+
+    mocker.patch.object(client, "_request", side_effect=fake_request)
+    response = client.deploy(path=path, **kwargs)
+    return response, sorted(uploaded)
+
+
+def test_incremental_deploy(tmp_path, mocker, capsys):
+    (tmp_path / "sales").mkdir()
+    (tmp_path / "sales" / "daily.yml").write_text("tasks: []")
+    (tmp_path / "sales" / "daily.sql").write_text("select 1")
+    (tmp_path / "other.yml").write_text("tasks: []")
+    (tmp_path / "notes.txt").write_text("not deployed")
+    client = DatalakeClientPipeline()
+    path = str(tmp_path)
+
+    _, uploaded = _deploy(client, mocker, path)
+    assert uploaded == ["other.yml", "sales/daily.sql", "sales/daily.yml"]
+
+    response, uploaded = _deploy(client, mocker, path)
+    assert response is None
+    assert uploaded == []
+
+    (tmp_path / "sales" / "daily.sql").write_text("select 2")
+    (tmp_path / "sales" / "weekly.yml").write_text("tasks: []")
+    (tmp_path / "other.yml").unlink()
+    capsys.readouterr()
+    _, uploaded = _deploy(client, mocker, path)
+    assert uploaded == ["sales/daily.sql", "sales/weekly.yml"]
+    assert capsys.readouterr().out.splitlines()[0] == (
+        "1 added, 1 changed, 1 removed, 1 unchanged"
+    )
+
+    _, uploaded = _deploy(client, mocker, path, force=True)
+    assert len(uploaded) == 3
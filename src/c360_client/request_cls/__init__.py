@@ -1,7 +1,10 @@
 import os
-import requests
+import copy
 import getpass
-from c360_client.notebook import deviceauth
+import hashlib
+from c360_client.request_cls.transport import PooledTransport
+from c360_client.cache import MetadataCache
+from c360_client.responses import ApiResponse, Record
 
 
 class Singleton(type):
@@ -17,11 +20,17 @@ class DatalakeClientRequest(metaclass=Singleton):
     The base class for interacting with API.
     """
     def __init__(
-        self, tenant=None, stage="prod", api_url=None, api_key=None, defaults={}
+        self, tenant=None, stage="prod", api_url=None, api_key=None, defaults={},
+        transport_options={}, cache_options={},
     ):
         """
         A configurable client object for hitting c360 dataset endpoints.
         The object `c360_client.dataset` is an instance of this class.
+
+        transport_options - keyword arguments for `PooledTransport`, e.g.
+            `pool_maxsize`, `max_retries`, `backoff_factor` or `timeout`.
+        cache_options - keyword arguments for `MetadataCache`, e.g. `ttl`,
+            `max_entries` or `persist_dir`.
         """
         self.api_key = api_key
         self.auth_creds = None
@@ -29,9 +38,8 @@ class DatalakeClientRequest(metaclass=Singleton):
         self.stage = stage
         self.url = api_url
         self._defaults = defaults
-
-        # options
-        self._cached_user_scope = None
+        self.transport = PooledTransport(**transport_options)
+        self.cache = MetadataCache(**cache_options)
 
     @property
     def _is_user_scoped(self):
@@ -44,6 +52,29 @@ class DatalakeClientRequest(metaclass=Singleton):
         # deprecated, use c360_client.set_default_space instead
         pass
 
+    def configure_transport(self, **transport_options):
+        """
+        Replace the shared HTTP transport, e.g. to change the pool size per
+        host, the retry policy or the default timeout. All client classes
+        pick up the new transport on their next request.
+        """
+        old_transport = self.transport
+        self.transport = PooledTransport(**transport_options)
+        old_transport.close()
+
+    def get_transport_stats(self):
+        """
+        Returns the number of requests made, and how many of them opened a
+        new connection vs reused a kept-alive one.
+        """
+        return self.transport.get_stats()
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def clear_cache(self):
+        self.cache.clear()
+
     def set_api_key(self, api_key=None):
         if api_key:
             self.api_key = api_key
@@ -51,17 +82,34 @@ class DatalakeClientRequest(metaclass=Singleton):
             self.api_key = getpass.getpass("API_KEY:")
 
     def get_groups(self, groups=None):
+        user_scope = self._get_user_scope() if self._is_user_scoped else None
+        return self._merge_groups(user_scope, groups)
+
+    def _merge_groups(self, user_scope, groups=None):
+        """
+        Combines the user scope (if the client is user scoped) with the
+        given groups, or the default space if no groups are given.
+        """
         main_groups = []
         if self._is_user_scoped:
             main_groups.append("users")
-            main_groups.append(self._get_user_scope())
+            main_groups.append(user_scope)
 
         if not groups:
             groups = self._defaults.get("space", [])
 
         return main_groups + groups
 
-    def request(self, endpoint, **kwargs):
+    def request(self, endpoint, route=None, **kwargs):
+        """
+        Makes a request to the API through the pooled transport. Accepts
+        the same keyword arguments as `requests.request`, including a
+        per-call `timeout`.
+
+        route - the endpoint with placeholders for its variable parts (e.g.
+            `models/{name}`), which labels the instrumentation events
+            instead of the endpoint itself. Defaults to `endpoint`.
+        """
 
         # use API key
         if not kwargs.get("headers"):
@@ -70,9 +118,54 @@ class DatalakeClientRequest(metaclass=Singleton):
         if not kwargs["headers"].get("Authorization"):
             kwargs["headers"]["Authorization"] = self._get_auth_header()
 
-        req = requests.request(url=f"{self.url}/{endpoint}", **kwargs)
+        method = kwargs.pop("method")
+        req = self.transport.request(
+            method, f"{self.url}/{endpoint}", endpoint=route or endpoint, **kwargs,
+        )
         return req
 
+    def _get_identity(self):
+        """
+        A hash of the API URL and credentials, so that cached entries are
+        never shared between users or tenants.
+        """
+        creds = self.auth_creds["id_token"] if self.auth_creds else self.api_key
+        key = f"{self.url}|{creds}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    def cached_response(self, cache_key, make_request, refresh=False):
+        """
+        Returns the cached response under `cache_key` (a tuple) for the
+        current user, or calls `make_request()` and caches its response if
+        it is successful.
+        """
+        key = tuple(cache_key) + (self._get_identity(),)
+
+        if not refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = make_request()
+        if getattr(response, "status_code", None) == 200:
+            self.cache.set(key, _detach_response(response))
+        return response
+
+    def typed_response(self, response, record_type=Record, many=False):
+        """
+        Wraps `response` in an `ApiResponse` if typed responses are enabled
+        (see `c360_client.set_typed_responses`), or unwraps it otherwise.
+        """
+        typed = self._defaults.get("typed_responses", False)
+        if isinstance(response, ApiResponse):
+            return response if typed else response.raw
+        if typed and response is not None:
+            return ApiResponse(response, record_type, many=many)
+        return response
+
+    def invalidate_cache(self, *prefix):
+        self.cache.invalidate(*prefix)
+
     def _get_auth_header(self):
         if self.auth_creds:
             return f"Bearer {self.auth_creds['id_token']}"
@@ -84,16 +177,18 @@ class DatalakeClientRequest(metaclass=Singleton):
                 "`c360_client.api.authenticate()` or `c360_client.api.set_api_key()`"
             )
 
-    def _get_user_scope(self, refresh=False):
+    def _user_scope_cache_key(self):
+        return ("entity/user/scope", self._get_identity())
 
-        if (self._cached_user_scope is not None) and (refresh is not False):
-            return self._cached_user_scope
+    def _get_user_scope(self, refresh=False):
+        key = self._user_scope_cache_key()
 
-        endpoint = "entity/user/scope"
-        response = self.request(endpoint, method="GET")
-        self._cached_user_scope = response.json().get("scope")
+        def fetch_user_scope():
+            endpoint = "entity/user/scope"
+            response = self.request(endpoint, method="GET")
+            return response.json().get("scope")
 
-        return self._cached_user_scope
+        return self.cache.get_or_set(key, fetch_user_scope, refresh=refresh)
 
 
     def get_dataspace(self):
@@ -110,5 +205,31 @@ class DatalakeClientRequest(metaclass=Singleton):
         return main_groups
 
     def authenticate(self):
+        from c360_client.notebook import deviceauth
+
         self.auth_creds = deviceauth.authenticate()
         print("Authentication successful; you are now logged in.")
+
+
+def get_default_request():
+    """
+    Returns the shared `DatalakeClientRequest`, configured from the
+    environment (see `c360_client.get_project_config`) the first time it is
+    needed.
+    """
+    import c360_client
+    return c360_client.api
+
+
+def _detach_response(response):
+    """
+    A copy of the response without the request that produced it, so that
+    credentials in the request headers are never kept in the cache.
+    """
+    if isinstance(response, ApiResponse):
+        # keeps the decoded body along
+        return response.detach(_detach_response)
+    detached = copy.copy(response)
+    detached.request = None
+    detached.connection = None
+    return detached
@@ -0,0 +1,44 @@
+from pytest import fixture
+from c360_client.request_cls import DatalakeClientRequest
+from c360_client.request_cls.transport import PooledTransport
+
+
+@fixture
+def request_api(local_server):
+    client = DatalakeClientRequest()
+    old_url, old_key = client.url, client.api_key
+    client.url = local_server.url
+    client.api_key = "test-key"
+    client.configure_transport(max_retries=0, timeout=5)
+    yield client
+    client.url, client.api_key = old_url, old_key
+    client.configure_transport()
+
+
+def test_request_goes_through_transport(request_api):
+    response = request_api.request("dataset/get", method="GET")
+    assert response.status_code == 200
+    assert response.json()["path"] == "/dataset/get"
+    assert response.json()["authorization"] == "test-key"
+
+
+def test_connections_are_reused(request_api):
+    for _ in range(5):
+        request_api.request("dataset/get", method="GET")
+    request_api.request("dataset", method="POST", json={"name": "a"})
+
+    stats = request_api.get_transport_stats()
+    assert stats["requests"] == 6
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 5
+
+
+def test_per_call_timeout_overrides_default(mocker):
+    transport = PooledTransport(timeout=7)
+    send = mocker.patch.object(transport.session, "request")
+
+    transport.request("GET", "http://localhost/a")
+    assert send.call_args.kwargs["timeout"] == 7
+
+    transport.request("GET", "http://localhost/a", timeout=1)
+    assert send.call_args.kwargs["timeout"] == 1
@@ -0,0 +1,206 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from c360_client import instrumentation
+
+
+DEFAULT_POOL_CONNECTIONS = 10    # number of hosts to keep pools for
+DEFAULT_POOL_MAXSIZE = 20        # number of kept-alive connections per host
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_TIMEOUT = (10, 300)      # (connect, read) in seconds
+
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+
+class TransportStats:
+    """
+    Thread-safe counters of the connections made by a `PooledTransport`.
+
+    Every HTTP request sent over the wire either opens a new connection or
+    reuses a kept-alive one, so `connections_reused` is derived from the
+    other two counters.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    @property
+    def connections_reused(self):
+        return max(self.requests - self.connections_opened, 0)
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+
+    def as_dict(self):
+        return dict(
+            requests=self.requests,
+            connections_opened=self.connections_opened,
+            connections_reused=self.connections_reused,
+        )
+
+
+def _counting_pool_cls(base_pool_cls, stats):
+    """
+    Returns a subclass of the given urllib3 connection pool that reports
+    every request made and every connection opened to `stats`.
+    """
+    base_conn_cls = base_pool_cls.ConnectionCls
+
+    class CountingConnection(base_conn_cls):
+        def connect(self):
+            if not instrumentation.has_hooks():
+                super().connect()
+            else:
+                start = time.perf_counter()
+                super().connect()
+                instrumentation.record_connect(time.perf_counter() - start)
+            stats.record_connection()
+
+    class CountingConnectionPool(base_pool_cls):
+        ConnectionCls = CountingConnection
+
+        def _make_request(self, *args, **kwargs):
+            stats.record_request()
+            return super()._make_request(*args, **kwargs)
+
+    return CountingConnectionPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_cls(HTTPConnectionPool, self.stats),
+            "https": _counting_pool_cls(HTTPSConnectionPool, self.stats),
+        }
+
+
+class InstrumentedSession(requests.Session):
+    """
+    A `requests.Session` emitting a `RequestEvent` for every request when
+    instrumentation hooks are registered. Requests can be labelled with an
+    API `endpoint`.
+    """
+    def request(self, method, url, endpoint=None, **kwargs):
+        if not instrumentation.has_hooks():
+            return super().request(method, url, **kwargs)
+
+        timer = instrumentation.Timer()
+        instrumentation.pop_connect_time()
+        event = instrumentation.RequestEvent(
+            kind="api" if endpoint else "http",
+            method=method.upper(),
+            endpoint=endpoint,
+            url=url.split("?")[0],
+            started_at=timer.started_at,
+        )
+        try:
+            response = super().request(method, url, **kwargs)
+        except Exception as e:
+            event.error = e
+            raise
+        else:
+            event.status_code = response.status_code
+            event.ttfb = response.elapsed.total_seconds()
+            event.retries = instrumentation.response_retries(response)
+            event.bytes_sent = instrumentation.body_size(response.request.body)
+            if kwargs.get("stream"):
+                # the body is read later, by the caller
+                event.bytes_received = int(response.headers.get("Content-Length") or 0)
+            else:
+                event.bytes_received = len(response.content)
+            return response
+        finally:
+            event.duration = timer.elapsed
+            event.connect_time = instrumentation.pop_connect_time()
+            instrumentation.emit(event)
+
+
+class PooledTransport:
+    """
+    A keep-alive, connection pooled HTTP transport.
+
+    One instance is owned by `DatalakeClientRequest`, so every client class
+    (dataset, model, pipeline) shares the same pools. Requests that fail
+    with a connection error or a retryable status code are retried with
+    exponential backoff; non-idempotent methods (e.g. POST) are only retried
+    when the connection could not be established.
+    """
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        self.stats = TransportStats()
+        self.session = self._build_session()
+
+    def _build_retry(self):
+        return Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_FORCELIST,
+            # return the last response instead of raising, so callers can
+            # keep inspecting `response.status_code` as before.
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+
+    def _build_session(self):
+        session = InstrumentedSession()
+        adapter = CountingHTTPAdapter(
+            stats=self.stats,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self._build_retry(),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method, url, **kwargs):
+        """
+        Same signature as `requests.request`, plus an `endpoint` label for
+        instrumentation. A per-call `timeout` overrides the transport
+        default.
+        """
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = self.timeout
+        return self.session.request(method=method, url=url, **kwargs)
+
+    def get_stats(self):
+        return self.stats.as_dict()
+
+    def close(self):
+        self.session.close()
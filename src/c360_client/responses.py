@@ -0,0 +1,307 @@
+import json
+import keyword
+import threading
+from collections.abc import Sequence
+
+try:
+    # several times faster than the standard library on large listings
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(content):
+    """
+    Decodes JSON from bytes or str, with orjson when it is installed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # e.g. non-UTF-8 content, which the standard library detects
+            if isinstance(content, str):
+                raise
+    return json.loads(content)
+
+
+def parse_json(response):
+    """
+    The JSON body of a `requests.Response` or `ApiResponse`, decoded with
+    the fastest available backend.
+    """
+    if isinstance(response, ApiResponse):
+        return response.json()
+    return loads(response.content)
+
+
+#########
+#  Records
+#########
+
+
+_record_classes = {}    # (base class, fields) -> record class
+_record_classes_lock = threading.Lock()
+
+
+def _is_slot_name(base, name):
+    return (
+        isinstance(name, str)
+        and name.isidentifier()
+        and not keyword.iskeyword(name)
+        and not name.startswith("_")
+        and not hasattr(base, name)
+    )
+
+
+def _record_class(base, fields):
+    # one class per base and set of fields, as all the items of a listing
+    # usually share the same fields
+    key = (base, fields)
+    cls = _record_classes.get(key)
+    if cls is None:
+        with _record_classes_lock:
+            cls = _record_classes.get(key)
+            if cls is None:
+                cls = type(base.__name__, (base,), {"__slots__": fields, "_fields": fields})
+                _record_classes[key] = cls
+    return cls
+
+
+def _convert(name, value):
+    if isinstance(value, dict):
+        return NESTED_RECORD_TYPES.get(name, Record).from_dict(value)
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return RecordList(value, NESTED_RECORD_TYPES.get(name, Record))
+    return value
+
+
+class Record:
+    """
+    A read-only, compact record of a JSON object.
+
+    Its fields are attributes stored in `__slots__`, which take a fraction
+    of the memory of a dict per object. They can also be read like a dict
+    (`record["name"]`, `record.get("name")`), which is the only way to read
+    fields whose names are not valid attributes. Nested objects are records
+    too, and nested lists `RecordList`s.
+    """
+    __slots__ = ("_extra",)
+    _fields = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = tuple(name for name in data if _is_slot_name(cls, name))
+        record = object.__new__(_record_class(cls, fields))
+        for name in fields:
+            object.__setattr__(record, name, _convert(name, data[name]))
+        extra = {
+            name: _convert(name, value) for name, value in data.items()
+            if name not in fields
+        }
+        object.__setattr__(record, "_extra", extra or None)
+        return record
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getattr__(self, name):
+        # only called for names that are not fields
+        extra = object.__getattribute__(self, "_extra")
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+
+    def keys(self):
+        return list(self._fields) + list(self._extra or ())
+
+    def __getitem__(self, name):
+        if name in self._fields:
+            return getattr(self, name)
+        if self._extra and name in self._extra:
+            return self._extra[name]
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._fields or bool(self._extra and name in self._extra)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {name: _to_plain(self[name]) for name in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return type(self).__mro__[1].from_dict, (self.to_dict(),)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={self[name]!r}" for name in self.keys())
+        return f"{type(self).__name__}({fields})"
+
+
+class DatasetRecord(Record):
+    __slots__ = ()
+
+
+class TableRecord(Record):
+    __slots__ = ()
+
+
+class ModelRecord(Record):
+    __slots__ = ()
+
+
+class PipelineRecord(Record):
+    __slots__ = ()
+
+
+NESTED_RECORD_TYPES = {
+    "dataset": DatasetRecord,
+    "datasets": DatasetRecord,
+    "table": TableRecord,
+    "tables": TableRecord,
+    "model": ModelRecord,
+    "models": ModelRecord,
+    "pipeline": PipelineRecord,
+    "pipelines": PipelineRecord,
+}
+
+
+class RecordList(Sequence):
+    """
+    A list of JSON objects whose records are only made when read. Each
+    object is then replaced by its record, so the decoded dicts are freed
+    as the list is read.
+    """
+    __slots__ = ("_items", "_record_type")
+
+    def __init__(self, items, record_type=Record):
+        self._items = list(items)
+        self._record_type = record_type
+
+    def _record(self, index):
+        item = self._items[index]
+        if isinstance(item, dict):
+            item = self._items[index] = self._record_type.from_dict(item)
+        elif isinstance(item, list):
+            item = self._items[index] = _convert(None, item)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self._items)))]
+        return self._record(index)
+
+    def __len__(self):
+        return len(self._items)
+
+    def to_list(self):
+        return [_to_plain(item) for item in self]
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordList, list)):
+            return self.to_list() == [_to_plain(item) for item in other]
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return RecordList, (self.to_list(), self._record_type)
+
+    def __repr__(self):
+        return f"<RecordList of {len(self._items)} {self._record_type.__name__}>"
+
+
+def _to_plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, RecordList):
+        return value.to_list()
+    return value
+
+
+def to_records(data, record_type=Record, many=False):
+    """
+    Converts decoded JSON to records: an object to a `record_type`, or, if
+    `many`, a list to a `RecordList` of them.
+    """
+    if isinstance(data, list):
+        return RecordList(data, record_type if many else Record)
+    if isinstance(data, dict):
+        return (Record if many else record_type).from_dict(data)
+    return data
+
+
+#########
+#  Responses
+#########
+
+
+class ApiResponse:
+    """
+    Wraps a `requests.Response`, which stays available as `raw`, and is
+    used like one: its other attributes (`status_code`, `text`,
+    `raise_for_status()`...) are the raw response's.
+
+    `json()` decodes the body once, and returns the same object on later
+    calls, so it should not be modified. `data` converts the body to
+    records, see `Record`; it decodes the body separately, freeing the
+    decoded objects as records are made.
+    """
+    __slots__ = ("raw", "record_type", "many", "_json", "_data")
+
+    def __init__(self, raw, record_type=Record, many=False):
+        self.raw = raw
+        self.record_type = record_type
+        self.many = many
+        self._json = None
+        self._data = None
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(object.__getattribute__(self, "raw"), name)
+
+    def __bool__(self):
+        return bool(self.raw)
+
+    def __repr__(self):
+        return f"<ApiResponse [{self.raw.status_code}] {self.record_type.__name__}>"
+
+    def json(self):
+        if self._json is None:
+            self._json = loads(self.raw.content)
+        return self._json
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = to_records(loads(self.raw.content), self.record_type, many=self.many)
+        return self._data
+
+    def detach(self, detach_raw):
+        """
+        A copy for caching, with `detach_raw` applied to the raw response.
+        The decoded body is kept, records are made again.
+        """
+        response = ApiResponse(detach_raw(self.raw), self.record_type, self.many)
+        response._json = self._json
+        return response
+
+    def __getstate__(self):
+        return (self.raw, self.record_type, self.many, self._json)
+
+    def __setstate__(self, state):
+        self.raw, self.record_type, self.many, self._json = state
+        self._data = None
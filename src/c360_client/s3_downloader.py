@@ -0,0 +1,259 @@
+import os
+from urllib.parse import urlsplit, unquote
+
+from c360_client import instrumentation
+from c360_client.downloader import (
+    DownloadError, file_md5, is_same_version, read_version, write_version,
+)
+from c360_client.filecache import is_md5_etag
+
+
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 8 * 1024 * 1024    # larger objects are fetched in ranges
+
+# S3 error codes meaning the current credentials cannot read the bucket
+ACCESS_ERROR_CODES = (
+    "403", "AccessDenied", "AllAccessDisabled", "ExpiredToken", "InvalidAccessKeyId",
+    "InvalidToken", "NoSuchBucket", "SignatureDoesNotMatch",
+)
+
+
+class S3AccessError(RuntimeError):
+    """
+    Raised when objects cannot be read from S3 directly, e.g. without IAM
+    access to the bucket, so that callers can fall back to presigned URLs.
+    """
+    pass
+
+
+def is_data_key(key):
+    # skip folder markers and hidden or marker files (e.g. `_SUCCESS`)
+    name = key.rsplit("/", 1)[-1]
+    return bool(name) and not name.startswith(("_", "."))
+
+
+def key_from_url(url, bucket):
+    """
+    The object key a presigned `url` points to, if it is an object of
+    `bucket` (with a virtual-hosted or a path-style URL), or None.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    path = unquote(parts.path)
+    if host.startswith(f"{bucket}.s3") and host.endswith(".amazonaws.com"):
+        key = path[1:]
+    elif path.startswith(f"/{bucket}/"):
+        key = path[len(bucket) + 2:]
+    else:
+        return None
+    return key or None
+
+
+def _access_error(error, bucket, prefix):
+    from botocore.exceptions import ClientError, NoCredentialsError
+
+    if isinstance(error, NoCredentialsError):
+        return S3AccessError(f"No AWS credentials to read s3://{bucket}/{prefix}")
+    if isinstance(error, ClientError):
+        code = str(error.response.get("Error", {}).get("Code"))
+        if code in ACCESS_ERROR_CODES:
+            return S3AccessError(f"Cannot read s3://{bucket}/{prefix}: {code}")
+    return None
+
+
+class S3Downloader:
+    """
+    Downloads objects straight from S3 with boto3's transfer manager, for
+    callers that have IAM access to the buckets.
+
+    Up to `max_concurrency` requests are made at a time, across objects;
+    objects larger than `multipart_threshold` are fetched with ranged GETs
+    of `multipart_chunksize` bytes. Like `ParallelDownloader`, files already
+    present at their path with the same size and ETag (and MD5, with
+    `verify_etag` and an ETag that looks like one, see `is_md5_etag`) are
+    not downloaded again, and a `FileCache` can be given as `cache`.
+    """
+    def __init__(
+        self, client=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        multipart_chunksize=DEFAULT_MULTIPART_CHUNKSIZE,
+        multipart_threshold=DEFAULT_MULTIPART_THRESHOLD, cache=None, verify_etag=False,
+    ):
+        self._client = client
+        self.max_concurrency = max_concurrency
+        self.multipart_chunksize = multipart_chunksize
+        self.multipart_threshold = multipart_threshold
+        self.cache = cache
+        self.verify_etag = verify_etag
+
+    @property
+    def client(self):
+        if self._client is None:
+            from c360_client.utils import get_boto_client
+            self._client = get_boto_client("s3")
+        return self._client
+
+    def list_objects(self, bucket, prefix, delimiter=None):
+        """
+        Returns the data objects under `prefix`, sorted by key, as dicts of
+        `key`, `size` and `etag`. With a `delimiter` (e.g. "/"), only the
+        objects directly under `prefix` are listed.
+        """
+        objects = []
+        options = dict(Bucket=bucket, Prefix=prefix)
+        if delimiter:
+            options["Delimiter"] = delimiter
+        try:
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(**options):
+                for obj in page.get("Contents", []):
+                    if is_data_key(obj["Key"]):
+                        objects.append(dict(
+                            key=obj["Key"],
+                            size=obj["Size"],
+                            etag=obj["ETag"].strip('"'),
+                        ))
+        except Exception as e:
+            error = _access_error(e, bucket, prefix)
+            if error is not None:
+                raise error from e
+            raise
+        return sorted(objects, key=lambda obj: obj["key"])
+
+    def get_objects(self, bucket, keys):
+        """
+        Returns the objects of `bucket` with the given `keys`, in the same
+        order, like `list_objects`. Each distinct folder of the keys is
+        listed once. Raises `S3AccessError` if some of them cannot be found.
+        """
+        listed = {}
+        for prefix in sorted({key[:key.rfind("/") + 1] for key in keys}):
+            if not prefix:
+                # a top-level key: listing from the root would list the
+                # whole bucket
+                for key in keys:
+                    if "/" not in key:
+                        listed[key] = self._head_object(bucket, key)
+                continue
+            for obj in self.list_objects(bucket, prefix, delimiter="/"):
+                listed[obj["key"]] = obj
+
+        missing = [key for key in keys if listed.get(key) is None]
+        if missing:
+            raise S3AccessError(f"{len(missing)} objects not found in s3://{bucket}")
+        return [listed[key] for key in keys]
+
+    def _head_object(self, bucket, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.head_object(Bucket=bucket, Key=key)
+        except Exception as e:
+            error = _access_error(e, bucket, key)
+            if error is not None:
+                raise error from e
+            if isinstance(e, ClientError):
+                # e.g. 404
+                return None
+            raise
+        return dict(
+            key=key, size=response["ContentLength"], etag=response["ETag"].strip('"'),
+        )
+
+    def _is_present(self, obj, path):
+        if not os.path.exists(path) or os.path.getsize(path) != obj["size"]:
+            return False
+        if not is_same_version(read_version(path), obj["etag"], None):
+            return False
+        if not self.verify_etag or not is_md5_etag(obj["etag"]):
+            return True
+        return file_md5(path) == obj["etag"]
+
+    def _restore(self, bucket, obj, path):
+        if self._is_present(obj, path):
+            return True
+        if self.cache is not None and self.cache.restore(
+            f"s3://{bucket}/{obj['key']}", obj["etag"], path, size=obj["size"],
+        ):
+            write_version(path, obj["etag"], None, obj["size"])
+            return True
+        return False
+
+    def download_many(self, bucket, objects, paths):
+        """
+        Downloads the `objects` of `bucket` (as returned by `list_objects`)
+        to the given paths, and returns the paths.
+        """
+        from boto3.s3.transfer import TransferConfig, create_transfer_manager
+
+        config = TransferConfig(
+            max_concurrency=self.max_concurrency,
+            multipart_chunksize=self.multipart_chunksize,
+            multipart_threshold=self.multipart_threshold,
+        )
+        pending = []
+        with create_transfer_manager(self.client, config) as manager:
+            for obj, path in zip(objects, paths):
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                if self._restore(bucket, obj, path):
+                    continue
+                # the transfer manager writes to a temporary file, renamed
+                # once complete
+                subscriber = _EventSubscriber(bucket, obj, path)
+                future = manager.download(bucket, obj["key"], path, subscribers=[subscriber])
+                pending.append((obj, path, future))
+
+            errors = []
+            for obj, path, future in pending:
+                try:
+                    future.result()
+                except Exception as e:
+                    error = _access_error(e, bucket, obj["key"])
+                    if error is not None:
+                        manager.shutdown(cancel=True)
+                        raise error from e
+                    errors.append(f"s3://{bucket}/{obj['key']}: {e}")
+                else:
+                    write_version(path, obj["etag"], None, obj["size"])
+                    if self.cache is not None:
+                        self.cache.put(f"s3://{bucket}/{obj['key']}", obj["etag"], path)
+
+        if errors:
+            raise DownloadError(f"Failed to download {len(errors)} objects: " + "; ".join(errors))
+        return list(paths)
+
+
+class _EventSubscriber:
+    """
+    A transfer manager subscriber emitting a "download" instrumentation
+    event per object, from the transfer manager's threads.
+    """
+    def __init__(self, bucket, obj, path):
+        self.bucket = bucket
+        self.obj = obj
+        self.path = path
+        self.timer = None
+
+    def on_queued(self, future, **kwargs):
+        if instrumentation.has_hooks():
+            self.timer = instrumentation.Timer()
+
+    def on_done(self, future, **kwargs):
+        if self.timer is None:
+            return
+        try:
+            future.result()
+            error = None
+        except Exception as e:
+            error = e
+        instrumentation.emit(instrumentation.RequestEvent(
+            kind="download",
+            method="GET",
+            url=f"s3://{self.bucket}/{self.obj['key']}",
+            status_code=None if error else 200,
+            bytes_received=0 if error else self.obj["size"],
+            started_at=self.timer.started_at,
+            duration=self.timer.elapsed,
+            error=error,
+            attributes=dict(path=self.path, size=self.obj["size"], direct=True),
+        ))
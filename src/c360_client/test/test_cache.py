@@ -0,0 +1,82 @@
+import time
+from c360_client.cache import MetadataCache
+from c360_client.dataset_cls import DatalakeClientDataset
+
+
+def test_ttl_expiry():
+    cache = MetadataCache(ttl=0.05)
+    cache.set(("a",), 1)
+    assert cache.get(("a",)) == 1
+    time.sleep(0.1)
+    assert cache.get(("a",)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = MetadataCache(max_entries=2)
+    cache.set(("a",), 1)
+    cache.set(("b",), 2)
+    cache.get(("a",))
+    cache.set(("c",), 3)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_by_prefix():
+    cache = MetadataCache()
+    cache.set(("dataset/get", "a", "users"), 1)
+    cache.set(("dataset/get", "b", "users"), 2)
+    cache.set(("dataset/list", ""), 3)
+
+    cache.invalidate("dataset/get", "a")
+    assert cache.get(("dataset/get", "a", "users")) is None
+    assert cache.get(("dataset/get", "b", "users")) == 2
+
+    cache.clear()
+    assert cache.get(("dataset/list", "")) is None
+
+
+def test_persistence_across_instances(tmp_path):
+    MetadataCache(persist_dir=str(tmp_path)).set(("a",), {"name": "a"})
+    other = MetadataCache(persist_dir=str(tmp_path))
+    assert other.get(("a",)) == {"name": "a"}
+
+    other.invalidate("a")
+    assert MetadataCache(persist_dir=str(tmp_path)).get(("a",)) is None
+
+
+def test_user_scope_is_cached(mocker):
+    client = DatalakeClientDataset()
+    request_inst = client.request_inst
+    request_inst.clear_cache()
+
+    response = mocker.Mock()
+    response.json.return_value = {"scope": "test_user"}
+    request = mocker.patch.object(request_inst, "request", return_value=response)
+
+    assert request_inst._get_user_scope() == "test_user"
+    assert request_inst._get_user_scope() == "test_user"
+    assert request.call_count == 1
+
+    request_inst._get_user_scope(refresh=True)
+    assert request.call_count == 2
+
+
+def test_dataset_get_is_cached_and_invalidated(mocker):
+    client = DatalakeClientDataset()
+    client.request_inst.clear_cache()
+    mocker.patch.object(client.request_inst, "_get_user_scope", return_value="test_user")
+
+    response = mocker.Mock(status_code=200)
+    request = mocker.patch.object(client, "_request", return_value=response)
+
+    client.get("test_dataset")
+    client.get("test_dataset")
+    assert request.call_count == 1
+
+    client.register_table("test_dataset", "test_table", "test_s3_path")
+    client.get("test_dataset")
+    assert request.call_count == 3
@@ -0,0 +1,97 @@
+import json
+
+from pytest import fixture, importorskip
+
+click_testing = importorskip("click.testing")
+
+from c360_client.bulk import BulkResult
+from c360_client.cli import cli
+
+
+@fixture
+def runner():
+    try:
+        return click_testing.CliRunner(mix_stderr=False)
+    except TypeError:
+        # stderr is always kept apart since click 8.2
+        return click_testing.CliRunner()
+
+
+@fixture
+def dataset_client(mocker):
+    client = mocker.Mock()
+    mocker.patch("c360_client.cli.get_dataset_client", return_value=client)
+    return client
+
+
+def test_download_many_outputs_json(runner, dataset_client, tmp_path):
+    manifest = tmp_path / "tables.jsonl"
+    manifest.write_text(
+        '{"dataset": "sales", "table": "orders"}\n'
+        '{"dataset": "crm", "table": "users", "target": "out"}\n'
+    )
+
+    def download_tables(tables, **kwargs):
+        print("Table downloaded")
+        return {
+            (table["dataset"], table["table"]): [f"{table['table']}.0.parquet"]
+            for table in tables
+        }
+
+    dataset_client.download_tables.side_effect = download_tables
+
+    result = runner.invoke(cli, ["--json", "dataset", "download-many", str(manifest), "--workers", "4"])
+
+    assert result.exit_code == 0, result.output
+    # what the library prints does not end up in the JSON output
+    assert json.loads(result.stdout) == [
+        {"dataset": "sales", "table": "orders", "files": ["orders.0.parquet"]},
+        {"dataset": "crm", "table": "users", "files": ["users.0.parquet"]},
+    ]
+    _, kwargs = dataset_client.download_tables.call_args
+    assert kwargs["max_workers"] == 4
+
+
+def test_get_single_dataset_outputs_json(runner, dataset_client, mocker):
+    def get(name, **kwargs):
+        print("fetching", name)
+        return mocker.Mock(status_code=200, json=lambda: {"name": name})
+
+    dataset_client.get.side_effect = get
+
+    result = runner.invoke(cli, ["--json", "dataset", "get", "sales"])
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout) == {"name": "sales"}
+    assert "fetching sales" in result.stderr
+
+
+def test_register_many_fails_on_any_error(runner, dataset_client, mocker, tmp_path):
+    manifest = tmp_path / "tables.json"
+    tables = [
+        {"dataset": "sales", "table": "orders", "s3_path": "s3://bucket/orders"},
+        {"dataset": "sales", "table": "items", "s3_path": "s3://bucket/items"},
+    ]
+    manifest.write_text(json.dumps(tables))
+    dataset_client.register_many.return_value = [
+        BulkResult(tables[0], response=mocker.Mock(status_code=200, json=lambda: {})),
+        BulkResult(tables[1], error=RuntimeError("boom")),
+    ]
+
+    result = runner.invoke(cli, ["--json", "dataset", "register-many", str(manifest)])
+
+    assert result.exit_code == 1
+    assert [(item["ok"], item.get("error")) for item in json.loads(result.stdout)] == [
+        (True, None), (False, "boom"),
+    ]
+
+
+def test_manifest_is_checked_before_any_request(runner, dataset_client, tmp_path):
+    manifest = tmp_path / "tables.json"
+    manifest.write_text('[{"dataset": "sales", "tabel": "orders"}]')
+
+    result = runner.invoke(cli, ["dataset", "download-many", str(manifest)])
+
+    assert result.exit_code == 2
+    assert "missing table; unknown tabel" in result.stderr
+    dataset_client.download_tables.assert_not_called()
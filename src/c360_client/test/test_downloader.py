@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import hashlib
+from pytest import fixture, raises
+
+from c360_client.dataset_cls import DatalakeClientDataset
+from c360_client.downloader import ParallelDownloader, DownloadTask, DownloadError, RateLimiter
+from c360_client.filecache import FileCache
+
+
+@fixture
+def parts(file_server):
+    contents = {}
+    for i, size in enumerate([0, 10, 1000, 5000]):
+        data = os.urandom(size)
+        (file_server.root / f"part.{i}.parquet").write_bytes(data)
+        contents[f"part.{i}.parquet"] = data
+    return contents
+
+
+def _ranged_requests(file_server, filename):
+    return [
+        range_header for path, range_header in file_server.requests
+        if path.startswith(f"/{filename}") and range_header != "bytes=0-0"
+    ]
+
+
+def test_download_many_in_ranges(file_server, parts, tmp_path):
+    downloader = ParallelDownloader(max_workers=4, chunk_size=1024)
+    tasks = [
+        (file_server.url_for(name), str(tmp_path / "out" / name)) for name in parts
+    ]
+    paths = downloader.download_many(tasks)
+
+    assert paths == [path for _, path in tasks]
+    for name, data in parts.items():
+        assert (tmp_path / "out" / name).read_bytes() == data
+    for pattern in ["*.part", "*.part.json"]:
+        assert not list((tmp_path / "out").glob(pattern))
+
+    # 5000 bytes with 1024 bytes per range, the first one being the probe
+    assert sorted(_ranged_requests(file_server, "part.3.parquet")) == [
+        "bytes=0-1023", "bytes=1024-2047", "bytes=2048-3071", "bytes=3072-4095",
+        "bytes=4096-4999",
+    ]
+
+
+def test_download_without_range_support(file_server, parts, tmp_path):
+    file_server.set_accept_ranges(False)
+    downloader = ParallelDownloader(chunk_size=1024)
+    path = downloader.download(file_server.url_for("part.3.parquet"), str(tmp_path / "a"))
+
+    with open(path, "rb") as f:
+        assert f.read() == parts["part.3.parquet"]
+
+
+def test_skip_existing_files(file_server, parts, tmp_path):
+    downloader = ParallelDownloader(chunk_size=1024)
+    target = str(tmp_path / "part.3.parquet")
+    downloader.download(file_server.url_for("part.3.parquet"), target)
+
+    file_server.requests.clear()
+    downloader.download(file_server.url_for("part.3.parquet"), target)
+    # only the probe was made, answered with 304 Not Modified
+    assert file_server.requests == [
+        ("/part.3.parquet?X-Amz-Signature=test", "bytes=0-1023")
+    ]
+
+
+def test_replaced_file_of_the_same_size(file_server, parts, tmp_path):
+    downloader = ParallelDownloader(chunk_size=1024)
+    target = str(tmp_path / "part.3.parquet")
+    url = file_server.url_for("part.3.parquet")
+    downloader.download(url, target)
+
+    data = os.urandom(5000)
+    (file_server.root / "part.3.parquet").write_bytes(data)
+    downloader.download(url, target)
+    assert open(target, "rb").read() == data
+
+    # a partial download of the previous version is not resumed
+    new_data = os.urandom(5000)
+    with open(f"{target}.part", "wb") as f:
+        f.write(data[:2048])
+        f.truncate(len(data))
+    with open(f"{target}.part.json", "w") as f:
+        json.dump(dict(
+            etag=hashlib.md5(data).hexdigest(), total=len(data),
+            chunks=[[0, 1023], [1024, 2047], [2048, 3071], [3072, 4095], [4096, 4999]],
+            done=[0, 1],
+        ), f)
+    os.remove(target)
+    (file_server.root / "part.3.parquet").write_bytes(new_data)
+    downloader.download(url, target)
+    assert open(target, "rb").read() == new_data
+
+
+def test_resume_partial_download(file_server, parts, tmp_path):
+    data = parts["part.3.parquet"]
+    target = str(tmp_path / "part.3.parquet")
+    chunks = [[start, min(start + 1024, len(data)) - 1] for start in range(0, len(data), 1024)]
+
+    # pretend the first two ranges were downloaded by an earlier run
+    with open(f"{target}.part", "wb") as f:
+        f.write(data[:2048])
+        f.truncate(len(data))
+    with open(f"{target}.part.json", "w") as f:
+        json.dump(dict(
+            etag=hashlib.md5(data).hexdigest(), total=len(data), chunks=chunks, done=[0, 1]
+        ), f)
+
+    ParallelDownloader(chunk_size=1024).download(file_server.url_for("part.3.parquet"), target)
+
+    assert open(target, "rb").read() == data
+    assert sorted(_ranged_requests(file_server, "part.3.parquet")) == [
+        "bytes=2048-3071", "bytes=3072-4095", "bytes=4096-4999",
+    ]
+
+
+def test_checksum_verification(file_server, parts, tmp_path):
+    downloader = ParallelDownloader(max_attempts=1)
+    target = str(tmp_path / "part.2.parquet")
+    task = DownloadTask(file_server.url_for("part.2.parquet"), target, md5="0" * 32)
+
+    with raises(DownloadError):
+        downloader.download_many([task])
+    assert not os.path.exists(target)
+    assert not os.path.exists(f"{target}.part")
+
+
+def test_etag_not_verified_by_default(file_server, parts, tmp_path):
+    # SSE-KMS and SSE-C objects have ETags that look like an MD5 but are not
+    file_server.set_etag_func(lambda data: hashlib.md5(b"encrypted" + data).hexdigest())
+    target = str(tmp_path / "part.3.parquet")
+
+    ParallelDownloader(chunk_size=1024).download(file_server.url_for("part.3.parquet"), target)
+    assert open(target, "rb").read() == parts["part.3.parquet"]
+
+    os.remove(target)
+    with raises(DownloadError):
+        ParallelDownloader(chunk_size=1024, max_attempts=1, verify_etag=True).download(
+            file_server.url_for("part.3.parquet"), target,
+        )
+
+
+def test_missing_file_fails(file_server, tmp_path):
+    with raises(DownloadError):
+        ParallelDownloader(max_attempts=1).download(
+            file_server.url_for("missing.parquet"), str(tmp_path / "missing")
+        )
+
+
+def test_download_table(file_server, parts, tmp_path, mocker):
+    client = DatalakeClientDataset()
+    urls = [file_server.url_for(name) for name in parts]
+    response = mocker.Mock()
+    response.json.return_value = {"presigned_urls": urls}
+    mocker.patch.object(client, "_request", return_value=response)
+
+    filenames = client.download_table("test_dataset", "test_table", target=str(tmp_path))
+
+    assert filenames == [f"{tmp_path}/test_table.{i}.parquet" for i in range(len(parts))]
+    for filename, data in zip(filenames, parts.values()):
+        assert open(filename, "rb").read() == data
+
+
+def test_file_cache(file_server, parts, tmp_path):
+    cache = FileCache(root=str(tmp_path / "cache"))
+    downloader = ParallelDownloader(chunk_size=1024, cache=cache)
+    url = file_server.url_for("part.3.parquet")
+    downloader.download(url, str(tmp_path / "a"))
+
+    # same object with a fresh signature, to another path: only probed
+    file_server.requests.clear()
+    downloader.download(url.replace("test", "other"), str(tmp_path / "b"))
+    assert len(file_server.requests) == 1
+    assert (tmp_path / "b").read_bytes() == parts["part.3.parquet"]
+
+    # a changed object has a new ETag, so it is downloaded again
+    data = os.urandom(5000)
+    (file_server.root / "part.3.parquet").write_bytes(data)
+    downloader.download(url, str(tmp_path / "b"))
+    assert (tmp_path / "b").read_bytes() == data
+    assert (tmp_path / "a").read_bytes() == parts["part.3.parquet"]
+
+
+def test_download_table_from_cache(file_server, parts, tmp_path, mocker):
+    client = DatalakeClientDataset()
+    urls = [file_server.url_for(name) for name in parts]
+    response = mocker.Mock()
+    response.json.return_value = {"presigned_urls": urls}
+    mocker.patch.object(client, "_request", return_value=response)
+    cache = FileCache(root=str(tmp_path / "cache"))
+
+    client.download_table("test_dataset", "test_table", target=str(tmp_path / "a"), cache=cache)
+    file_server.requests.clear()
+    filenames = client.download_table(
+        "test_dataset", "test_table", target=str(tmp_path / "b"), cache=cache,
+    )
+
+    # only probes, one per part
+    assert len(file_server.requests) == len(parts)
+    for filename, data in zip(filenames, parts.values()):
+        assert open(filename, "rb").read() == data
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(10000)
+    start = time.monotonic()
+    limiter.consume(10000)
+    assert time.monotonic() - start < 0.05
+    limiter.consume(2000)
+    assert time.monotonic() - start >= 0.19
@@ -0,0 +1,73 @@
+import os
+
+from c360_client.filecache import FileCache, is_md5_etag
+
+
+def _cached_file(cache, tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return cache.put(f"s3://bucket/{name}", f"etag-{name}", str(path))
+
+
+def test_restore(tmp_path):
+    cache = FileCache(root=str(tmp_path / "cache"))
+    _cached_file(cache, tmp_path, "a", 100)
+
+    target = tmp_path / "out" / "a"
+    assert cache.restore("s3://bucket/a", "etag-a", str(target), size=100)
+    assert target.read_bytes() == (tmp_path / "a").read_bytes()
+
+    assert not cache.restore("s3://bucket/a", "etag-changed", str(target))
+    assert not cache.restore("s3://bucket/a", "etag-a", str(target), size=99)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = FileCache(root=str(tmp_path / "cache"), max_bytes=250)
+    for i, name in enumerate(["a", "b"]):
+        cached = _cached_file(cache, tmp_path, name, 100)
+        os.utime(cached, (i, i))
+
+    # using "a" makes "b" the least recently used
+    cache.restore("s3://bucket/a", "etag-a", str(tmp_path / "out"))
+    _cached_file(cache, tmp_path, "c", 100)
+
+    assert cache.get("s3://bucket/a", "etag-a")
+    assert cache.get("s3://bucket/b", "etag-b") is None
+    assert cache.get("s3://bucket/c", "etag-c")
+    assert cache.size() == 200
+
+    cache.clear()
+    assert cache.entries() == []
+
+
+def test_is_md5_etag():
+    assert is_md5_etag("d41d8cd98f00b204e9800998ecf8427e")
+    assert not is_md5_etag("d41d8cd98f00b204e9800998ecf8427e-3")
+    assert not is_md5_etag(None)
+
+
+def test_restored_files_are_copies(tmp_path):
+    cache = FileCache(root=str(tmp_path / "cache"))
+    _cached_file(cache, tmp_path, "a", 100)
+    target = tmp_path / "out" / "a"
+    cache.restore("s3://bucket/a", "etag-a", str(target))
+
+    # editing the restored file leaves the cached one as it was
+    with open(target, "r+b") as f:
+        f.truncate(10)
+    assert cache.restore("s3://bucket/a", "etag-a", str(target), size=100)
+    assert target.read_bytes() == (tmp_path / "a").read_bytes()
+
+
+def test_put_scans_the_cache_once(tmp_path, mocker):
+    cache = FileCache(root=str(tmp_path / "cache"), max_bytes=1000)
+    entries = mocker.spy(cache, "entries")
+    for i in range(5):
+        _cached_file(cache, tmp_path, f"file_{i}", 100)
+    assert entries.call_count == 1
+
+    # going over the limit evicts, which scans again
+    for i in range(5, 11):
+        _cached_file(cache, tmp_path, f"file_{i}", 100)
+    assert entries.call_count == 2
+    assert cache.size() <= 1000
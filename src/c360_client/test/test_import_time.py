@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import subprocess
+
+
+HEAVY_MODULES = [
+    "boto3", "botocore", "discreetly", "pandas", "pyarrow", "pyathena",
+    "googleapiclient", "yaml",
+]
+
+# the module-level import of `c360_client` must not load these either
+IMPORT_ONLY_MODULES = ["requests", "urllib3"]
+
+MEASURE_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import c360_client
+import_time = time.perf_counter() - start
+loaded_on_import = sorted(sys.modules)
+c360_client.api
+setup_time = time.perf_counter() - start
+print(json.dumps(dict(
+    import_time=import_time,
+    setup_time=setup_time,
+    loaded_on_import=loaded_on_import,
+    loaded=sorted(sys.modules),
+)))
+"""
+
+
+def _measure():
+    env = dict(os.environ, C360_TENANT=os.getenv("C360_TENANT", "test"))
+    output = subprocess.check_output([sys.executable, "-c", MEASURE_SCRIPT], env=env)
+    return json.loads(output)
+
+
+def test_import_does_not_load_heavy_dependencies():
+    result = _measure()
+    print(
+        f"import c360_client: {result['import_time'] * 1000:.1f}ms,"
+        f" with api: {result['setup_time'] * 1000:.1f}ms"
+    )
+
+    def loaded(modules, names):
+        return [name for name in names if any(
+            module == name or module.startswith(f"{name}.") for module in modules
+        )]
+
+    assert loaded(result["loaded_on_import"], HEAVY_MODULES + IMPORT_ONLY_MODULES) == []
+    assert loaded(result["loaded"], HEAVY_MODULES) == []
+
+
+def test_cli_does_not_load_the_client():
+    env = dict(os.environ, C360_TENANT=os.getenv("C360_TENANT", "test"))
+    output = subprocess.check_output([
+        sys.executable, "-c",
+        "import sys, json\n"
+        "from c360_client.cli import cli\n"
+        "print(json.dumps(sorted(sys.modules)))",
+    ], env=env)
+    modules = json.loads(output)
+    assert [
+        module for module in modules
+        if module.split(".")[0] in HEAVY_MODULES + IMPORT_ONLY_MODULES
+    ] == []
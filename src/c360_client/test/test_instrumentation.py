@@ -0,0 +1,93 @@
+from pytest import fixture, importorskip
+
+from c360_client import instrumentation
+from c360_client.downloader import ParallelDownloader
+from c360_client.request_cls.transport import PooledTransport
+
+
+@fixture
+def events():
+    events = []
+    instrumentation.add_hook(events.append)
+    yield events
+    instrumentation.clear_hooks()
+
+
+def test_request_events(local_server, events):
+    transport = PooledTransport()
+    transport.request("POST", f"{local_server.url}/dataset", endpoint="dataset", data=b"x" * 10)
+    transport.request("GET", f"{local_server.url}/dataset?a=1", endpoint="dataset")
+
+    first, second = events
+    assert (first.kind, first.method, first.endpoint, first.status_code) == (
+        "api", "POST", "dataset", 200
+    )
+    assert first.bytes_sent == 10
+    assert first.bytes_received > 0
+    assert first.connect_time > 0
+    assert first.duration >= first.ttfb > 0
+    # the connection was kept alive
+    assert second.connect_time == 0
+    assert second.url == f"{local_server.url}/dataset"
+
+
+def test_api_events_are_labelled_by_route(local_server, events, mocker):
+    from c360_client.model_cls import DatalakeClientModel
+
+    client = DatalakeClientModel()
+    mocker.patch.object(client.request_inst, "url", local_server.url)
+    mocker.patch.object(client.request_inst, "api_key", "test-api-key")
+    client.experiment_status("experiment_a")
+
+    event, = events
+    assert event.endpoint == "model/exp_train/{name}"
+    assert event.url == f"{local_server.url}/model/exp_train/experiment_a"
+
+
+def test_download_events_and_metrics(file_server, events, tmp_path):
+    registry = instrumentation.add_hook(instrumentation.MetricsRegistry())
+    (file_server.root / "part.parquet").write_bytes(b"x" * 3000)
+
+    ParallelDownloader(chunk_size=1024).download(
+        file_server.url_for("part.parquet"), str(tmp_path / "part.parquet")
+    )
+
+    download = [event for event in events if event.kind == "download"]
+    assert len(download) == 1
+    assert download[0].bytes_received == 3000
+    assert download[0].attributes["chunks"] == 3
+
+    assert registry.get("c360_bytes_received_total", kind="download") == 3000
+    rendered = registry.render()
+    assert 'c360_requests_total{kind="download",method="GET",endpoint="",status="200"} 1' in rendered
+    assert "c360_request_duration_seconds_count" in rendered
+
+
+def test_failing_hooks_are_ignored(local_server, events):
+    def failing(event):
+        raise RuntimeError("broken hook")
+
+    instrumentation.add_hook(failing)
+    response = PooledTransport().request("GET", local_server.url)
+    assert response.status_code == 200
+    assert len(events) == 1
+
+
+def test_opentelemetry_spans():
+    importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    provider = TracerProvider()
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    hook = instrumentation.OpenTelemetryHook(provider.get_tracer("test"))
+
+    hook(instrumentation.RequestEvent(
+        "api", "GET", "dataset", status_code=500, started_at=1000.0, duration=0.5,
+    ))
+    span, = exporter.get_finished_spans()
+    assert span.name == "api GET dataset"
+    assert span.end_time - span.start_time == 500_000_000
+    assert not span.status.is_ok
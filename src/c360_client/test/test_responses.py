@@ -0,0 +1,80 @@
+import sys
+import json
+import pickle
+
+import requests
+
+from c360_client import responses
+from c360_client.dataset_cls import DatalakeClientDataset
+from c360_client.responses import ApiResponse, DatasetRecord, Record, RecordList, TableRecord
+
+
+def make_response(payload, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+DATASET = {
+    "name": "sales",
+    "tables": [{"name": "orders", "rows": 10}, {"name": "items", "rows": 20}],
+    "created-at": "2024-01-01",
+    "keys": ["id"],
+}
+
+
+def test_api_response(mocker):
+    loads = mocker.spy(responses, "loads")
+    response = ApiResponse(make_response(DATASET), DatasetRecord)
+
+    assert response.status_code == 200
+    assert response.ok
+    assert response.json() is response.json()
+    assert loads.call_count == 1
+
+    dataset = response.data
+    assert isinstance(dataset, DatasetRecord)
+    assert dataset.name == "sales"
+    assert isinstance(dataset.tables[1], TableRecord)
+    assert dataset.tables[1].rows == 20
+    # fields that cannot be attributes are read like a dict
+    assert dataset["created-at"] == "2024-01-01"
+    assert dataset["keys"] == ["id"]
+    assert dataset.to_dict() == DATASET
+
+    assert pickle.loads(pickle.dumps(response)).data == DATASET
+    assert pickle.loads(pickle.dumps(dataset)) == dataset
+
+
+def test_record_list_is_lazy_and_compact():
+    items = [dict(name=f"dataset_{i}", owner="team", size=i, public=False) for i in range(1000)]
+    records = RecordList([dict(item) for item in items], DatasetRecord)
+
+    assert records[5].name == "dataset_5"
+    assert sum(isinstance(item, Record) for item in records._items) == 1
+    assert records == items
+    # every record shares its class, and is smaller than a dict
+    assert len({type(record) for record in records}) == 1
+    assert sys.getsizeof(records[0]) < sys.getsizeof(items[0]) / 2
+
+
+def test_typed_dataset_get_is_cached(mocker):
+    client = DatalakeClientDataset()
+    request_inst = client.request_inst
+    request_inst.clear_cache()
+    mocker.patch.object(request_inst, "_get_user_scope", return_value="test_user")
+    mocker.patch.object(request_inst, "_defaults", {"typed_responses": True})
+    request = mocker.patch.object(client, "_request", return_value=make_response(DATASET))
+
+    first = client.get("sales")
+    second = client.get("sales")
+    third = client.get("sales")
+
+    assert request.call_count == 1
+    assert isinstance(first.data, DatasetRecord)
+    assert second.json() is third.json()
+
+    # cached typed responses are unwrapped once typed responses are off
+    request_inst._defaults["typed_responses"] = False
+    assert isinstance(client.get("sales"), requests.Response)
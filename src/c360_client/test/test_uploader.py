@@ -0,0 +1,213 @@
+import os
+import json
+import hashlib
+from email.parser import BytesParser
+from pytest import fixture, raises
+import requests
+
+from conftest import LocalServer, LocalRequestHandler
+from c360_client.uploader import (
+    ChunkedUploader, DirectoryUploader, FileSlice, MultipartFormStream, UploadError
+)
+
+
+class ChunkedUploadHandler(LocalRequestHandler):
+    """
+    A stand-in for the upload API: `initiate` hands out part URLs on this
+    same server, parts are PUT and kept in memory, and `complete`
+    assembles them.
+    """
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self._read_body())
+        if self.path.endswith("/initiate"):
+            upload_id = payload.get("upload_id") or "upload-1"
+            server.initiated.append(payload)
+            self._send_json(200, {
+                "upload_id": upload_id,
+                "urls": {
+                    str(number): f"http://{self.headers['Host']}/parts/{upload_id}/{number}"
+                    for number in payload["part_numbers"]
+                },
+            })
+        elif self.path.endswith("/complete"):
+            data = b"".join(
+                server.parts[part["part_number"]] for part in payload["parts"]
+            )
+            server.completed = data
+            self._send_json(200, {"size": len(data)})
+        else:
+            self._send_json(404, {})
+
+    def do_PUT(self):
+        server = self.server
+        number = int(self.path.rsplit("/", 1)[-1])
+        body = self._read_body()
+        if number in server.fail_parts:
+            server.fail_parts.remove(number)
+            return self._send_json(403, {"error": "expired"})
+
+        server.parts[number] = body
+        self.send_response(200)
+        self.send_header("ETag", f'"{hashlib.md5(body).hexdigest()}"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@fixture
+def upload_server():
+    server = LocalServer(ChunkedUploadHandler)
+    server.httpd.initiated = []
+    server.httpd.parts = {}
+    server.httpd.fail_parts = set()
+    server.httpd.completed = None
+    server.start()
+    yield server
+    server.stop()
+
+
+@fixture
+def local_file(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_bytes(os.urandom(10000))
+    return str(path)
+
+
+def _uploader(server, **kwargs):
+    session = requests.Session()
+
+    def request_func(endpoint, **kwargs):
+        return session.request(url=f"{server.url}/{endpoint}", **kwargs)
+
+    return ChunkedUploader(request_func, session=session, part_size=3000, **kwargs)
+
+
+def test_file_slice(local_file):
+    data = open(local_file, "rb").read()
+    with FileSlice(local_file, offset=100, length=50) as body:
+        assert len(body) == 50
+        assert body.read(20) == data[100:120]
+        assert body.read() == data[120:150]
+        body.seek(0)
+        assert body.read() == data[100:150]
+
+
+def test_multipart_form_stream(local_file, local_server):
+    fields = [
+        ("json", None, json.dumps({"a": 1}), "application/json"),
+        ("file", "table.csv", FileSlice(local_file), "application/octet-stream"),
+    ]
+    with MultipartFormStream(fields) as body:
+        raw = body.read()
+        assert len(raw) == len(body)
+
+    message = BytesParser().parsebytes(
+        f"Content-Type: {body.content_type}\r\n\r\n".encode() + raw
+    )
+    json_part, file_part = message.get_payload()
+    assert json.loads(json_part.get_payload()) == {"a": 1}
+    assert file_part.get_filename() == "table.csv"
+    assert file_part.get_payload(decode=True) == open(local_file, "rb").read()
+
+    with MultipartFormStream(fields) as body:
+        response = requests.post(
+            f"{local_server.url}/upload", data=body,
+            headers={"Content-Type": body.content_type},
+        )
+    assert response.json()["body_size"] == len(raw)
+
+
+def test_chunked_upload(upload_server, local_file):
+    response = _uploader(upload_server).upload(local_file, {"dataset_name": "a"})
+
+    assert response.json() == {"size": 10000}
+    assert upload_server.httpd.completed == open(local_file, "rb").read()
+    assert upload_server.httpd.initiated[0]["part_count"] == 4
+    assert not os.path.exists(f"{local_file}.c360upload")
+
+
+def test_chunked_upload_resumes(upload_server, local_file):
+    upload_server.httpd.fail_parts.add(2)
+    with raises(UploadError):
+        _uploader(upload_server, max_attempts=1).upload(local_file, {})
+    assert os.path.exists(f"{local_file}.c360upload")
+
+    _uploader(upload_server).upload(local_file, {})
+    resumed = upload_server.httpd.initiated[-1]
+    assert resumed["upload_id"] == "upload-1"
+    assert resumed["part_numbers"] == [2]
+    assert upload_server.httpd.completed == open(local_file, "rb").read()
+
+
+@fixture
+def local_dir(tmp_path):
+    root = tmp_path / "dataset"
+    (root / "table_a").mkdir(parents=True)
+    (root / "table_b").mkdir()
+    for i in range(5):
+        (root / "table_a" / f"part.{i}.csv").write_bytes(b"a" * 10)
+    (root / "table_b" / "large.csv").write_bytes(b"b" * 1000)
+    return str(root)
+
+
+class RecordingRequest:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.requests = []
+
+    def __call__(self, endpoint, method, data, headers):
+        message = BytesParser().parsebytes(
+            f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + data.read()
+        )
+        json_part, *file_parts = message.get_payload()
+        names = [part.get_param("name", header="content-disposition") for part in file_parts]
+        self.requests.append((json.loads(json_part.get_payload()), names))
+
+        response = requests.Response()
+        response.status_code = 500 if self.fail.intersection(names) else 200
+        return response
+
+
+def test_directory_upload_single_request(local_dir):
+    request_func = RecordingRequest(fail=["table_b/large.csv"])
+    uploader = DirectoryUploader(request_func, "dataset/initialize")
+    response = uploader.upload(local_dir, {"name": "test"})
+
+    # a failed request is returned as is, and not sent again
+    assert response.status_code == 500
+    assert request_func.requests == [({"name": "test"}, [
+        "table_a/part.0.csv", "table_a/part.1.csv", "table_a/part.2.csv",
+        "table_a/part.3.csv", "table_a/part.4.csv", "table_b/large.csv",
+    ])]
+
+
+def test_directory_upload_batches(local_dir):
+    request_func = RecordingRequest()
+    uploader = DirectoryUploader(
+        request_func, "dataset/initialize", batched=True, batch_files=2, batch_bytes=500,
+    )
+    uploader.upload(local_dir, {"name": "test"})
+
+    batches = sorted(names for _, names in request_func.requests)
+    assert batches == [
+        ["table_a/part.0.csv", "table_a/part.1.csv"],
+        ["table_a/part.2.csv", "table_a/part.3.csv"],
+        ["table_a/part.4.csv"],
+        ["table_b/large.csv"],
+    ]
+    first_payload = request_func.requests[0][0]
+    assert first_payload["batch"] == {"index": 0, "count": 4}
+
+
+def test_directory_upload_resends_only_failed_files(local_dir):
+    request_func = RecordingRequest(fail=["table_b/large.csv"])
+    uploader = DirectoryUploader(request_func, "dataset/initialize", batched=True, batch_bytes=500)
+    with raises(UploadError) as error:
+        uploader.upload(local_dir, {"name": "test"})
+    assert error.value.failed == ["table_b/large.csv"]
+    assert len(request_func.requests) == 2
+
+    request_func = RecordingRequest()
+    uploader = DirectoryUploader(request_func, "dataset/initialize", batched=True)
+    uploader.upload(local_dir, {"name": "test"}, only=error.value.failed)
+    assert request_func.requests == [({"name": "test"}, ["table_b/large.csv"])]
@@ -0,0 +1,55 @@
+import json
+import time
+from datetime import datetime, timezone, timedelta
+from pytest import fixture
+
+from c360_client import utils
+
+
+@fixture
+def notebook_mode(mocker):
+    utils.clear_boto_cache()
+    mocker.patch.object(utils, "is_notebook_mode", return_value=True)
+    secrets = []
+
+    def get_secret(path):
+        secrets.append(path)
+        return json.dumps(dict(
+            aws_access_key_id=f"key-{len(secrets)}",
+            aws_secret_access_key="secret",
+        ))
+
+    session = mocker.Mock()
+    session.get.side_effect = get_secret
+    mocker.patch("discreetly.Session.create", return_value=session)
+    yield secrets
+    utils.clear_boto_cache()
+
+
+def test_boto_clients_are_cached(notebook_mode):
+    client = utils.get_boto_client("s3")
+    assert utils.get_boto_client("s3") is client
+    assert utils.get_boto_client("sts") is not client
+    assert utils.get_boto_client("s3", region_name="us-east-1") is not client
+    assert client.meta.region_name == "ap-southeast-1"
+    assert len(notebook_mode) == 1
+
+
+def test_credentials_are_refreshed_when_expired(notebook_mode, mocker):
+    client = utils.get_boto_client("s3")
+    assert utils.get_aws_credentials() == ("key-1", "secret")
+
+    expires_at = time.time() + 10000
+    mocker.patch.object(utils.time, "time", return_value=expires_at)
+
+    assert utils.get_aws_credentials() == ("key-2", "secret")
+    assert utils.get_boto_client("s3") is not client
+    assert len(notebook_mode) == 2
+
+
+def test_credentials_expiry():
+    now = datetime.now(timezone.utc)
+    expiry = utils._get_credentials_expiry(
+        {"expiration": (now + timedelta(hours=1)).isoformat()}
+    )
+    assert abs(expiry - (now.timestamp() + 3600 - utils.CREDENTIALS_EXPIRY_MARGIN)) < 5
@@ -0,0 +1,531 @@
+import io
+import os
+import json
+import time
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from c360_client import instrumentation
+from c360_client.request_cls.transport import DEFAULT_TIMEOUT
+
+
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_BATCH_FILES = 100                     # max files per request
+DEFAULT_BATCH_BYTES = 32 * 1024 * 1024        # files larger than this get their own request
+
+
+class UploadError(RuntimeError):
+    """
+    `failed` lists the files that could not be uploaded, if any.
+    """
+    def __init__(self, message, failed=()):
+        super().__init__(message)
+        self.failed = list(failed)
+
+
+class FileSlice(io.RawIOBase):
+    """
+    A read-only, seekable view over `length` bytes of a file starting at
+    `offset`. The file is only opened when first read, so many slices can
+    be created without holding file handles.
+    """
+    def __init__(self, path, offset=0, length=None):
+        self.path = path
+        self.offset = offset
+        self.length = os.path.getsize(path) - offset if length is None else length
+        self._position = 0
+        self._file = None
+
+    def __len__(self):
+        return self.length
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self.length
+        self._position = min(max(position, 0), self.length)
+        return self._position
+
+    def read(self, size=-1):
+        remaining = self.length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size == 0:
+            return b""
+
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        self._file.seek(self.offset + self._position)
+        data = self._file.read(size)
+        self._position += len(data)
+        return data
+
+    def release(self):
+        """
+        Closes the underlying file handle; it is reopened if read again.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.release()
+        super().close()
+
+
+class MultipartFormStream(io.RawIOBase):
+    """
+    A `multipart/form-data` request body that is read from disk as it is
+    sent, instead of being built in memory like `requests(files=...)` does.
+
+    `fields` is a list of `(name, filename, content, content_type)`, where
+    `content` is either bytes, str or a `FileSlice` over a local file. Only
+    one file is open at a time, whichever is currently being sent.
+    """
+    def __init__(self, fields):
+        self.boundary = uuid.uuid4().hex
+        self._segments = []
+        for name, filename, content, content_type in fields:
+            disposition = f'form-data; name="{name}"'
+            if filename:
+                disposition += f'; filename="{filename}"'
+            header = (
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: {disposition}\r\n"
+                f"Content-Type: {content_type}\r\n\r\n"
+            )
+            self._segments.append(header.encode())
+            if isinstance(content, str):
+                content = content.encode()
+            self._segments.append(content)
+            self._segments.append(b"\r\n")
+        self._segments.append(f"--{self.boundary}--\r\n".encode())
+
+        self.length = sum(len(segment) for segment in self._segments)
+        self._position = 0
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self.length
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self.length
+        self._position = min(max(position, 0), self.length)
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self._position
+
+        chunks = []
+        start = 0
+        for segment in self._segments:
+            end = start + len(segment)
+            if size <= 0:
+                break
+            if self._position < end:
+                offset = self._position - start
+                count = min(size, end - self._position)
+                if isinstance(segment, bytes):
+                    data = segment[offset:offset + count]
+                else:
+                    segment.seek(offset)
+                    data = segment.read(count)
+                    if self._position + len(data) >= end:
+                        # done with this file, release its handle
+                        segment.release()
+                if not data:
+                    raise UploadError("File changed size while it was being uploaded")
+                chunks.append(data)
+                self._position += len(data)
+                size -= len(data)
+            start = end
+
+        return b"".join(chunks)
+
+    def close(self):
+        for segment in self._segments:
+            if isinstance(segment, FileSlice):
+                segment.close()
+        super().close()
+
+
+class ChunkedUploader:
+    """
+    Uploads a large local file in parts to server-issued presigned URLs.
+
+    1. `<endpoint>/initiate` returns an `upload_id` and a presigned URL per
+       part number.
+    2. The parts are PUT concurrently, streamed from disk.
+    3. `<endpoint>/complete` is called with the ETag of every part.
+
+    Progress is recorded in `<local_path>.c360upload`, so if an upload is
+    interrupted, calling `upload` again only sends the missing parts.
+    """
+    def __init__(
+        self,
+        request_func,
+        session=None,
+        endpoint="dataset/table/upload",
+        part_size=DEFAULT_PART_SIZE,
+        max_workers=DEFAULT_MAX_WORKERS,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        """
+        request_func - a callable making authenticated API requests, with
+            the signature of `DatalakeClientRequest.request`.
+        session - the session used to PUT the parts to the presigned URLs.
+        """
+        self.request_func = request_func
+        self.session = session or requests.Session()
+        self.endpoint = endpoint
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+    def _state_path(self, local_path):
+        return f"{local_path}.c360upload"
+
+    def _load_state(self, local_path):
+        try:
+            with open(self._state_path(local_path)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        stat = os.stat(local_path)
+        if (state.get("size"), state.get("mtime"), state.get("part_size")) != (
+            stat.st_size, stat.st_mtime, self.part_size
+        ):
+            # the file has changed since, start over
+            return None
+        return state
+
+    def _save_state(self, local_path, state):
+        path = self._state_path(local_path)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _api_call(self, action, payload):
+        response = self.request_func(
+            f"{self.endpoint}/{action}", method="POST", json=payload,
+        )
+        if response.status_code != 200:
+            raise UploadError(
+                f"Upload {action} failed with status {response.status_code}: {response.text}"
+            )
+        return response
+
+    def upload(self, local_path, payload):
+        """
+        Uploads `local_path`, sending `payload` (the same metadata as a
+        single-request upload) along. Returns the response of the final
+        `complete` call.
+        """
+        if not instrumentation.has_hooks():
+            return self._upload(local_path, payload)
+
+        timer = instrumentation.Timer()
+        event = instrumentation.RequestEvent(
+            kind="upload",
+            method="PUT",
+            endpoint=self.endpoint,
+            started_at=timer.started_at,
+            attributes=dict(path=local_path),
+        )
+        try:
+            response = self._upload(local_path, payload)
+            event.status_code = response.status_code
+            return response
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.bytes_sent = self._sent_bytes
+            event.retries = self._retries
+            event.duration = timer.elapsed
+            instrumentation.emit(event)
+
+    def _upload(self, local_path, payload):
+        self._sent_bytes = 0
+        self._retries = 0
+        stat = os.stat(local_path)
+        part_count = max(1, -(-stat.st_size // self.part_size))
+
+        state = self._load_state(local_path)
+        if state is None:
+            state = dict(
+                upload_id=None,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                part_size=self.part_size,
+                parts={},
+            )
+
+        missing = [
+            number for number in range(1, part_count + 1)
+            if str(number) not in state["parts"]
+        ]
+
+        initiate_payload = dict(
+            payload,
+            filename=os.path.basename(local_path),
+            size=stat.st_size,
+            part_size=self.part_size,
+            part_count=part_count,
+            part_numbers=missing,
+        )
+        if state["upload_id"]:
+            initiate_payload["upload_id"] = state["upload_id"]
+
+        initiated = self._api_call("initiate", initiate_payload).json()
+        state["upload_id"] = initiated["upload_id"]
+        urls = {int(number): url for number, url in initiated["urls"].items()}
+        self._save_state(local_path, state)
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._upload_part, local_path, number, urls[number]): number
+                for number in missing
+            }
+            for future in as_completed(futures):
+                number = futures[future]
+                try:
+                    state["parts"][str(number)] = future.result()
+                    self._sent_bytes += min(
+                        self.part_size, stat.st_size - (number - 1) * self.part_size
+                    )
+                    self._save_state(local_path, state)
+                except Exception as e:
+                    errors.append(f"part {number}: {e}")
+
+        if errors:
+            raise UploadError(
+                f"Failed to upload {len(errors)} of {part_count} parts of {local_path}"
+                " (call again to resume): " + "; ".join(errors)
+            )
+
+        response = self._api_call("complete", dict(
+            payload,
+            upload_id=state["upload_id"],
+            parts=[
+                dict(part_number=int(number), etag=etag)
+                for number, etag in sorted(state["parts"].items(), key=lambda x: int(x[0]))
+            ],
+        ))
+        os.remove(self._state_path(local_path))
+        return response
+
+    def _upload_part(self, local_path, number, url):
+        offset = (number - 1) * self.part_size
+        length = min(self.part_size, os.path.getsize(local_path) - offset)
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with FileSlice(local_path, offset, length) as body:
+                    response = self.session.put(url, data=body, timeout=self.timeout)
+                if response.status_code != 200:
+                    raise UploadError(f"status {response.status_code}")
+                return (response.headers.get("ETag") or "").strip('"')
+            except (requests.RequestException, UploadError, OSError):
+                if attempt == self.max_attempts:
+                    raise
+                self._retries += 1
+                time.sleep(self.backoff_factor * 2 ** (attempt - 1))
+
+
+class DirectoryUploader:
+    """
+    Uploads the files of a local directory as a `multipart/form-data`
+    request to `endpoint`, streamed from disk with at most one file open.
+
+    By default all the files go in a single request, whose response is
+    returned whatever its status. With `batched=True`, small files are
+    grouped (up to `batch_files` files or `batch_bytes` bytes per request)
+    and large files are sent in a request of their own: the first batch is
+    sent on its own (it creates the dataset), the rest `max_workers` at a
+    time, and the JSON payload of every request carries `batch: {index,
+    count}` for the server to tell them apart. Only use it against servers
+    that accept that field.
+
+    Requests are never retried, as the endpoint may not be idempotent.
+    """
+    def __init__(
+        self,
+        request_func,
+        endpoint,
+        max_workers=DEFAULT_MAX_WORKERS,
+        batched=False,
+        batch_files=DEFAULT_BATCH_FILES,
+        batch_bytes=DEFAULT_BATCH_BYTES,
+        progress=None,
+    ):
+        """
+        progress - optional callable, called with `(uploaded_files,
+            total_files, uploaded_bytes, total_bytes)` after each request.
+        """
+        self.request_func = request_func
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        self.batched = batched
+        self.batch_files = batch_files
+        self.batch_bytes = batch_bytes
+        self.progress = progress
+
+    def list_files(self, local_dir, only=None):
+        """
+        Returns `(rel_path, abspath, size)` for the files under `local_dir`,
+        restricted to the relative paths in `only` if given.
+        """
+        local_dir_abspath = os.path.abspath(local_dir)
+        only = set(only) if only is not None else None
+
+        files = []
+        for root, dirs, filenames in os.walk(local_dir_abspath):
+            dirs.sort()
+            for filename in sorted(filenames):
+                abspath = os.path.join(root, filename)
+                rel_path = os.path.relpath(abspath, local_dir_abspath).replace(os.sep, "/")
+                if only is None or rel_path in only:
+                    files.append((rel_path, abspath, os.path.getsize(abspath)))
+        return files
+
+    def make_batches(self, files):
+        """
+        Groups small files into batches, followed by one batch per large
+        file, so that the first request (which creates the dataset) is a
+        cheap one. Without `batched`, all the files are a single batch.
+        """
+        if not self.batched:
+            return [files]
+
+        batches, large_batches = [], []
+        current, current_bytes = [], 0
+        for file in files:
+            size = file[2]
+            if size >= self.batch_bytes:
+                large_batches.append([file])
+                continue
+            if current and (
+                len(current) >= self.batch_files or current_bytes + size > self.batch_bytes
+            ):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(file)
+            current_bytes += size
+        if current:
+            batches.append(current)
+
+        return (batches + large_batches) or [[]]
+
+    def upload(self, local_dir, payload, only=None):
+        """
+        Uploads the directory and returns the response of the first
+        request.
+
+        When `batched`, raises `UploadError` listing the files whose
+        requests failed; pass them as `only` to send just those again.
+        """
+        files = self.list_files(local_dir, only=only)
+        batches = self.make_batches(files)
+        self._uploaded = [0, len(files), 0, sum(file[2] for file in files)]
+
+        first_response = self._send_batch(batches[0], payload, 0, len(batches))
+        if not self.batched:
+            if self._is_successful(first_response):
+                self._report(batches[0])
+            return first_response
+
+        if not self._is_successful(first_response):
+            raise UploadError(
+                f"Upload failed with status {first_response.status_code}: {first_response.text}",
+                failed=[file[0] for file in files],
+            )
+        self._report(batches[0])
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._send_batch, batch, payload, index, len(batches)): batch
+                for index, batch in enumerate(batches[1:], start=1)
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    response = future.result()
+                except Exception:
+                    response = None
+                if self._is_successful(response):
+                    self._report(batch)
+                else:
+                    failed.extend(file[0] for file in batch)
+
+        if failed:
+            raise UploadError(
+                f"Failed to upload {len(failed)} of {len(files)} files", failed=sorted(failed),
+            )
+
+        return first_response
+
+    def _is_successful(self, response):
+        return response is not None and response.status_code < 400
+
+    def _report(self, batch):
+        self._uploaded[0] += len(batch)
+        self._uploaded[2] += sum(file[2] for file in batch)
+        if self.progress:
+            self.progress(*self._uploaded)
+
+    def _send_batch(self, batch, payload, index, count):
+        if count > 1:
+            payload = dict(payload, batch=dict(index=index, count=count))
+
+        # for requests with files, the payload has to be one of the files
+        # named 'json'
+        # see https://stackoverflow.com/a/35946962
+        fields = [("json", None, json.dumps(payload), "application/json")]
+        for rel_path, abspath, size in batch:
+            fields.append((
+                rel_path, os.path.basename(abspath), FileSlice(abspath), "application/octet-stream"
+            ))
+
+        with MultipartFormStream(fields) as body:
+            return self.request_func(
+                self.endpoint, method="POST", data=body,
+                headers={"Content-Type": body.content_type},
+            )
@@ -1,7 +1,19 @@
 import os
-import boto3
-import discreetly
 import json
+import time
+import threading
+from datetime import datetime, timezone
+
+
+NOTEBOOK_AWS_REGION = "ap-southeast-1"
+DEFAULT_CREDENTIALS_TTL = 3600       # seconds, if the secret has no expiration
+CREDENTIALS_EXPIRY_MARGIN = 300      # refresh this many seconds before expiring
+
+_boto_lock = threading.RLock()
+_secret_sessions = {}       # tenant -> discreetly session
+_aws_credentials = {}       # tenant -> (expires_at, credentials)
+_boto_sessions = {}         # credentials -> boto3 Session
+_boto_clients = {}          # (name, credentials, kwargs) -> boto3 client
 
 
 def get_boto_client(name, **kwargs):
@@ -9,38 +21,140 @@ def get_boto_client(name, **kwargs):
     Get a boto client. If you are within Colab and you have logged in,
     use the project's stored AWS credentials. Otherwise, create boto
     client as per normal.
+
+    Clients are cached per service, credentials and arguments, so repeated
+    calls return the same (thread-safe) client. When the stored
+    credentials expire they are fetched again, along with new clients.
     """
+    credentials = None
     if is_notebook_mode():
-        aws_access_key_id, aws_secret_access_key = get_aws_credentials()
-        aws_creds = dict(
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name="ap-southeast-1",
-        )
-        return boto3.client(name, **aws_creds, **kwargs)
-    else:
-        return boto3.client(name, **kwargs)
+        credentials = get_aws_credentials()
+        kwargs.setdefault("region_name", NOTEBOOK_AWS_REGION)
+
+    key = (name, credentials, _hashable_kwargs(kwargs))
+    with _boto_lock:
+        client = _boto_clients.get(key)
+        if client is None:
+            client = _get_boto_session(credentials).client(name, **kwargs)
+            _boto_clients[key] = client
+        return client
+
+
+def _hashable_kwargs(kwargs):
+    items = []
+    for key, value in sorted(kwargs.items()):
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        items.append((key, value))
+    return tuple(items)
+
+
+def _get_boto_session(credentials=None):
+    """
+    boto3 sessions are not thread-safe to create, so they are created once
+    per set of credentials (None being the default credential chain).
+    """
+    import boto3
+
+    with _boto_lock:
+        session = _boto_sessions.get(credentials)
+        if session is None:
+            if credentials is None:
+                session = boto3.session.Session()
+            else:
+                aws_access_key_id, aws_secret_access_key = credentials
+                session = boto3.session.Session(
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key,
+                )
+            _boto_sessions[credentials] = session
+        return session
+
+
+def clear_boto_cache():
+    """
+    Forget the cached AWS credentials, boto sessions and clients.
+    """
+    with _boto_lock:
+        _secret_sessions.clear()
+        _aws_credentials.clear()
+        _boto_sessions.clear()
+        _boto_clients.clear()
 
 
 def get_secret_session():
-    cfg = {
-        "default": {
-            "type": "gcp",
-            "datastore_project": f"{_get_tenant()}-c360",
-            "keyid": (
-                f"projects/{_get_tenant()}-c360-kms/locations/"
-                "global/keyRings/dev/cryptoKeys/default"
-            )
-        }
-    }
-    return discreetly.Session.create(config=cfg)
+    import discreetly
 
+    tenant = _get_tenant()
+    with _boto_lock:
+        if tenant in _secret_sessions:
+            return _secret_sessions[tenant]
+
+        cfg = {
+            "default": {
+                "type": "gcp",
+                "datastore_project": f"{tenant}-c360",
+                "keyid": (
+                    f"projects/{tenant}-c360-kms/locations/"
+                    "global/keyRings/dev/cryptoKeys/default"
+                )
+            }
+        }
+        session = discreetly.Session.create(config=cfg)
+        _secret_sessions[tenant] = session
+        return session
 
-def get_aws_credentials():
-    session = get_secret_session()
-    creds = json.loads(session.get(f"/{_get_tenant()}/dev/api/aws_credentials"))
 
-    return creds["aws_access_key_id"], creds["aws_secret_access_key"]
+def get_aws_credentials(refresh=False):
+    """
+    Returns the project's stored AWS credentials, as `(aws_access_key_id,
+    aws_secret_access_key)`. They are only fetched again (which requires
+    a KMS decrypt) once they are about to expire, or if `refresh` is set.
+    """
+    tenant = _get_tenant()
+    with _boto_lock:
+        cached = _aws_credentials.get(tenant)
+        if cached is not None and not refresh and cached[0] > time.time():
+            return cached[1]
+
+        session = get_secret_session()
+        creds = json.loads(session.get(f"/{tenant}/dev/api/aws_credentials"))
+        credentials = (creds["aws_access_key_id"], creds["aws_secret_access_key"])
+
+        if cached is not None and cached[1] != credentials:
+            _forget_credentials(cached[1])
+        _aws_credentials[tenant] = (_get_credentials_expiry(creds), credentials)
+
+        return credentials
+
+
+def _get_credentials_expiry(creds):
+    ttl = float(os.getenv("C360_AWS_CREDENTIALS_TTL", DEFAULT_CREDENTIALS_TTL))
+    expires_at = time.time() + ttl
+
+    expiration = creds.get("expiration") or creds.get("Expiration")
+    if expiration:
+        try:
+            expiration = datetime.fromisoformat(expiration.replace("Z", "+00:00"))
+            if expiration.tzinfo is None:
+                expiration = expiration.replace(tzinfo=timezone.utc)
+            expires_at = min(expires_at, expiration.timestamp())
+        except (AttributeError, ValueError):
+            pass
+
+    # refresh a bit early, unless the credentials are short-lived anyway
+    if expires_at - time.time() > 2 * CREDENTIALS_EXPIRY_MARGIN:
+        expires_at -= CREDENTIALS_EXPIRY_MARGIN
+    return expires_at
+
+
+def _forget_credentials(credentials):
+    # drop the sessions and clients made with rotated credentials
+    _boto_sessions.pop(credentials, None)
+    for key in [key for key in _boto_clients if key[1] == credentials]:
+        del _boto_clients[key]
 
 
 def set_notebook_mode(mode=True):